@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ContextAgent throughput on a replayed sensor trace
+
+Replays a trace recorded with RecordingSensor (or the agent's record_path /
+sensor_record_path option) through ContextAgent.get_state with no sensor
+delay, so the numbers cover parsing, change detection and event emission
+only. Without --trace a synthetic trace is recorded from the native sensor.
+
+Usage:
+    python benchmarks/bench_replay.py [--trace FILE] [--records N] [--rounds R]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.agent import ContextAgent, SensorError  # noqa: E402
+from src.events import EventType  # noqa: E402
+from src.replay import RecordingSensor, ReplaySensor  # noqa: E402
+from src.sensors import NativeSensor  # noqa: E402
+
+
+def record_synthetic_trace(path, records):
+    """Record a trace of a session whose token usage grows steadily"""
+    recorder = RecordingSensor(NativeSensor(), path)
+    try:
+        for i in range(records):
+            # Repeat each reading a few times, as polling does between updates
+            tokens = (i // 4) * 500
+            recorder.execute({
+                "model": "claude-sonnet-4",
+                "context_window": {"max_tokens": 200000, "tokens_used": tokens},
+            })
+    finally:
+        recorder.close()
+
+
+def replay(path, rounds):
+    """Replay the trace `rounds` times and report agent throughput"""
+    sensor = ReplaySensor(path, speed=None, loop=True)
+    agent = ContextAgent(sensor=sensor, breaker_failure_threshold=0)
+    events = []
+    for event_type in EventType:
+        agent.on(event_type, events.append)
+
+    polls = len(sensor.records) * rounds
+    started = time.perf_counter()
+    for _ in range(polls):
+        try:
+            agent.get_state()
+        except SensorError:
+            pass
+    elapsed = time.perf_counter() - started
+
+    stats = agent.get_stats()
+    print(f"records:             {len(sensor.records)} x {rounds} rounds")
+    print(f"polls/s:             {polls / elapsed:10.0f}")
+    print(f"us/poll:             {elapsed / polls * 1e6:10.2f}")
+    print(f"unchanged outputs:   {stats['unchanged_outputs']:10d}")
+    print(f"events emitted:      {len(events):10d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--trace", help="trace file to replay (default: synthetic)")
+    parser.add_argument("--records", type=int, default=2000, help="synthetic trace length")
+    parser.add_argument("--rounds", type=int, default=5, help="times to replay the trace")
+    args = parser.parse_args()
+
+    if args.trace:
+        replay(args.trace, args.rounds)
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "trace.ndjson.gz")
+        record_synthetic_trace(path, args.records)
+        replay(path, args.rounds)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
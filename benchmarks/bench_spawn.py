@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sensor process creation with a large agent process
+
+Compares the cost of launching a short-lived command with plain
+subprocess.Popen, os.posix_spawn and the SensorSpawner helper while the
+benchmark process holds a configurable amount of touched memory (standing
+in for a long-running agent with a large heap).
+
+Popen is measured twice: as-is (CPython 3.10+ on Linux uses vfork, whose
+cost does not depend on memory size) and on its fork() path, which it takes
+whenever a preexec_fn is given and on older interpreters. The script exits
+non-zero if the helper is not faster than the fork() path.
+
+Usage:
+    python benchmarks/bench_spawn.py [--ballast-mb MB] [--number N] [--command CMD ...]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.spawner import SensorSpawner  # noqa: E402
+
+
+def make_ballast(megabytes):
+    """Allocate and touch memory so it is resident (and copied on fork)"""
+    ballast = [bytearray(1024 * 1024) for _ in range(megabytes)]
+    for block in ballast:
+        for offset in range(0, len(block), 4096):
+            block[offset] = 1
+    return ballast
+
+
+def run_popen(command, preexec_fn=None):
+    process = subprocess.Popen(
+        command,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        preexec_fn=preexec_fn
+    )
+    process.communicate(b"{}")
+    return process.returncode
+
+
+def run_posix_spawn(command):
+    pid = os.posix_spawn(command[0], command, os.environ)
+    return os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1])
+
+
+def bench(label, func, number):
+    """Run func `number` times and report the mean latency"""
+    func()  # warm up
+    started = time.perf_counter()
+    for _ in range(number):
+        func()
+    per_call = (time.perf_counter() - started) / number * 1e3
+    print(f"{label:<26} {per_call:8.3f} ms/spawn")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ballast-mb", type=int, default=1024, help="resident memory to hold")
+    parser.add_argument("--number", type=int, default=200, help="spawns per method")
+    parser.add_argument("--command", nargs="+", default=[shutil.which("true") or "/bin/true"])
+    args = parser.parse_args()
+
+    command = args.command
+    cwd = os.getcwd()
+
+    with SensorSpawner() as spawner:
+        spawner.start()
+        ballast = make_ballast(args.ballast_mb)  # noqa: F841
+        print(f"agent RSS ballast: {args.ballast_mb} MB, command: {' '.join(command)}")
+
+        bench("subprocess.Popen", lambda: run_popen(command), args.number)
+        popen = bench(
+            "subprocess.Popen (fork)",
+            lambda: run_popen(command, preexec_fn=lambda: None),
+            args.number
+        )
+        bench("os.posix_spawn", lambda: run_posix_spawn(command), args.number)
+        helper = bench(
+            "SensorSpawner",
+            lambda: spawner.run(command, b"{}", cwd, timeout=5.0),
+            args.number
+        )
+
+    print(f"{'speedup vs fork()':<26} {popen / helper:8.2f}x")
+    return 0 if helper < popen else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
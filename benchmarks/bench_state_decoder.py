@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark: schema-compiled AgentState decoder vs the hand-written path
+
+Compares src.schema.decode_agent_state with the nested dict.get decoder
+that AgentState.from_sensor_output used before the schema decoder.
+
+Usage:
+    python benchmarks/bench_state_decoder.py [--number N]
+"""
+
+import argparse
+import sys
+import timeit
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.schema import decode_agent_state  # noqa: E402
+from src.state import AgentState, WorkspaceInfo, GitInfo, ContextWindowInfo  # noqa: E402
+
+
+SENSOR_DATA = {
+    "version": "1.0.0",
+    "model": "Claude",
+    "workspace": {
+        "path": "/home/user/project",
+        "name": "project",
+        "git": {"is_repo": True, "branch": "main"},
+    },
+    "context_window": {"max_tokens": 200000, "tokens_used": 50000, "usage_pct": 25},
+}
+DISPLAY = "[Claude] 📁 project 🌿 main | 📊 25%"
+
+
+def handwritten_decode(sensor_data, display_string):
+    """The previous AgentState.from_sensor_output implementation"""
+    workspace_data = sensor_data.get("workspace", {})
+    git_data = workspace_data.get("git", {})
+    context_data = sensor_data.get("context_window", {})
+
+    return AgentState(
+        model=sensor_data.get("model", "Claude"),
+        workspace=WorkspaceInfo(
+            path=workspace_data.get("path", ""),
+            name=workspace_data.get("name", ""),
+            git=GitInfo(
+                is_repo=git_data.get("is_repo", False),
+                branch=git_data.get("branch", "")
+            )
+        ),
+        context_window=ContextWindowInfo(
+            max_tokens=context_data.get("max_tokens", 200000),
+            tokens_used=context_data.get("tokens_used", 0),
+            usage_pct=context_data.get("usage_pct", 0)
+        ),
+        display=display_string.strip(),
+        last_updated=datetime.utcnow().isoformat(),
+        sensor_version=sensor_data.get("version", "1.0.0")
+    )
+
+
+def bench(label, func, number, repeat=5):
+    """Run func `number` times per round and report the best round"""
+    best = min(timeit.repeat(lambda: func(SENSOR_DATA, DISPLAY), number=number, repeat=repeat))
+    per_call = best / number * 1e6
+    print(f"{label:<24} {per_call:8.2f} us/decode")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=50000, help="decodes per round")
+    args = parser.parse_args()
+
+    assert decode_agent_state(SENSOR_DATA, DISPLAY)[0].to_dict() | {"last_updated": None} == \
+        handwritten_decode(SENSOR_DATA, DISPLAY).to_dict() | {"last_updated": None}
+
+    handwritten = bench("hand-written dict.get", handwritten_decode, args.number)
+    compiled = bench("schema-compiled", decode_agent_state, args.number)
+
+    print(f"{'speedup':<24} {handwritten / compiled:8.2f}x")
+    return 0 if compiled < handwritten else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
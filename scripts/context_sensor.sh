@@ -4,6 +4,9 @@
 #
 # This script is the canonical source of truth for context information.
 # It reads JSON from STDIN and emits a single-line status string.
+# With --coprocess it stays alive and answers line-delimited JSON requests.
+# With --batch it reads one JSON input per line and emits one frame per input.
+# With --framed <protocol> it emits a single result frame on STDOUT.
 #
 # Dependencies: jq, git
 # Exit codes: 0 = success, non-zero = error (gracefully handled)
@@ -16,6 +19,7 @@ set -euo pipefail
 
 readonly SCRIPT_VERSION="1.0.0"
 readonly DEFAULT_MAX_TOKENS=200000
+readonly PROTOCOL_VERSION=1
 
 # ============================================================================
 # Utility Functions
@@ -69,30 +73,20 @@ calculate_percentage() {
 # Main Sensor Logic
 # ============================================================================
 
-main() {
-    # Read JSON from STDIN
-    if [[ -t 0 ]]; then
-        # STDIN is a terminal (not piped), use empty JSON
-        readonly INPUT_JSON='{}'
-    else
-        readonly INPUT_JSON=$(cat)
-    fi
-
-    # Extract context information
-    local model
-    local workspace_path
+# Compute context for the given input values
+# Usage: sense <model> <workspace_path> <max_tokens> <tokens_used>
+# Sets SENSOR_DISPLAY (status string) and SENSOR_DATA (structured JSON)
+sense() {
+    local model="$1"
+    local workspace_path="$2"
+    local max_tokens="$3"
+    local tokens_used="$4"
     local workspace_name
     local git_branch
     local is_repo
-    local max_tokens
-    local tokens_used
     local usage_pct
 
-    # Model identification
-    model=$(json_get "model" "Claude")
-
     # Workspace detection
-    workspace_path=$(json_get "workspace_path" "$PWD")
     workspace_name=$(get_workspace_name "$workspace_path")
 
     # Git repository detection
@@ -105,12 +99,10 @@ main() {
     fi
 
     # Context window calculation
-    max_tokens=$(json_get "context_window.max_tokens" "$DEFAULT_MAX_TOKENS")
-    tokens_used=$(json_get "context_window.tokens_used" "0")
     usage_pct=$(calculate_percentage "$tokens_used" "$max_tokens")
 
     # ========================================================================
-    # Emit Status String (Single Line, Deterministic)
+    # Status String (Single Line, Deterministic)
     # ========================================================================
 
     local status=""
@@ -133,23 +125,22 @@ main() {
         status="${status} | 📊 ${usage_pct}%"
     fi
 
-    # Emit final status
-    echo "$status"
+    SENSOR_DISPLAY="$status"
 
     # ========================================================================
-    # Emit Structured Data (JSON) to STDERR for agent consumption
+    # Structured Data (JSON) for agent consumption
     # ========================================================================
 
-    cat >&2 <<EOF
+    SENSOR_DATA=$(cat <<EOF
 {
   "version": "${SCRIPT_VERSION}",
-  "model": "${model}",
+  "model": "$(json_escape "$model")",
   "workspace": {
-    "path": "${workspace_path}",
-    "name": "${workspace_name}",
+    "path": "$(json_escape "$workspace_path")",
+    "name": "$(json_escape "$workspace_name")",
     "git": {
       "is_repo": ${is_repo},
-      "branch": "${git_branch}"
+      "branch": "$(json_escape "$git_branch")"
     }
   },
   "context_window": {
@@ -159,6 +150,193 @@ main() {
   }
 }
 EOF
+)
+}
+
+# ============================================================================
+# Coprocess Mode
+# ============================================================================
+#
+# Long-lived mode used by the agent's coprocess backend. Reads one JSON
+# message per line on STDIN and answers each with one JSON line on STDOUT:
+#
+#   {"type":"hello","protocol":1}          -> {"type":"hello","protocol":1,"version":"1.0.0"}
+#   {"type":"sense","id":7,"input":{...}}  -> {"type":"result","id":7,"display":"...","data":{...}}
+#                                          or {"type":"error","id":7,"error":"..."}
+
+# Escape a string for embedding in a JSON string literal
+json_escape() {
+    local value="$1"
+    local char
+    local code
+    local i
+    value=${value//\\/\\\\}
+    value=${value//\"/\\\"}
+    value=${value//$'\n'/\\n}
+    value=${value//$'\r'/\\r}
+    value=${value//$'\t'/\\t}
+    # Remaining control characters below 0x20 as \u00XX
+    if [[ "$value" == *[[:cntrl:]]* ]]; then
+        for ((i = 1; i < 32; i++)); do
+            printf -v char "\\$(printf '%03o' "$i")"
+            printf -v code '\\u%04x' "$i"
+            value=${value//"$char"/"$code"}
+        done
+    fi
+    printf '%s' "$value"
+}
+
+# Emit an error frame
+emit_error() {
+    printf '{"type":"error","id":%s,"error":"%s"}\n' "$1" "$(json_escape "$2")"
+}
+
+# Emit the response frame for a single request line
+# Usage: handle_request <line> [fallback_id]
+handle_request() {
+    local line="$1"
+    local fallback_id="${2:-0}"
+    local type
+    local protocol
+    local id
+    local model
+    local workspace_path
+    local max_tokens
+    local tokens_used
+
+    # A single jq call extracts the envelope and all sensor inputs
+    # (same defaults as json_get in one-shot mode), NUL-terminated so
+    # values may contain newlines
+    if ! {
+        IFS= read -r -d '' type &&
+        IFS= read -r -d '' protocol &&
+        IFS= read -r -d '' id &&
+        IFS= read -r -d '' model &&
+        IFS= read -r -d '' workspace_path &&
+        IFS= read -r -d '' max_tokens &&
+        IFS= read -r -d '' tokens_used
+    } < <(echo "$line" | jq -j \
+            --arg pwd "$PWD" --arg max_tokens "$DEFAULT_MAX_TOKENS" \
+            '(.type // "sense"), (.protocol // 0), (.id // 0),
+             (.input.model // "Claude"), (.input.workspace_path // $pwd),
+             (.input.context_window.max_tokens // $max_tokens),
+             (.input.context_window.tokens_used // "0")
+             | tostring + "\u0000"' 2>/dev/null); then
+        emit_error "$fallback_id" "Invalid request"
+        return
+    fi
+
+    case "$type" in
+        hello)
+            if [[ "$protocol" != "$PROTOCOL_VERSION" ]]; then
+                emit_error 0 "Unsupported protocol version: ${protocol}"
+                return
+            fi
+            printf '{"type":"hello","protocol":%s,"version":"%s"}\n' \
+                "$PROTOCOL_VERSION" "$SCRIPT_VERSION"
+            ;;
+        sense)
+            # Build the frame in a subshell with errexit active, so a failing
+            # request yields an error frame instead of ending the coprocess
+            local frame
+            local status
+            set +e
+            frame=$(
+                set -e
+                sense "$model" "$workspace_path" "$max_tokens" "$tokens_used"
+                printf '{"type":"result","id":%s,"display":"%s","data":%s}' \
+                    "$id" "$(json_escape "$SENSOR_DISPLAY")" "${SENSOR_DATA//$'\n'/}"
+            )
+            status=$?
+            set -e
+
+            if [[ $status -eq 0 ]]; then
+                printf '%s\n' "$frame"
+            else
+                emit_error "$id" "Sensor failed"
+            fi
+            ;;
+        *)
+            emit_error "$id" "Unknown request type: ${type}"
+            ;;
+    esac
+}
+
+serve() {
+    local line
+    while IFS= read -r line; do
+        [[ -z "$line" ]] && continue
+        handle_request "$line"
+    done
+}
+
+# Batch mode: one JSON input payload per line, answered in order with
+# result/error frames whose id is the 1-based input line number
+serve_batch() {
+    local line
+    local id=0
+    while IFS= read -r line || [[ -n "$line" ]]; do
+        [[ -z "$line" ]] && continue
+        id=$((id + 1))
+        handle_request "{\"type\":\"sense\",\"id\":${id},\"input\":${line}}" "$id"
+    done
+}
+
+# Framed one-shot mode: one input document on STDIN, one frame on STDOUT
+# (id 1). STDERR carries diagnostics only.
+# Usage: serve_framed <protocol>
+serve_framed() {
+    local protocol="$1"
+    local input='{}'
+
+    if [[ "$protocol" != "$PROTOCOL_VERSION" ]]; then
+        emit_error 1 "Unsupported protocol version: ${protocol}"
+        return
+    fi
+
+    if [[ ! -t 0 ]]; then
+        input=$(cat)
+        [[ -z "${input//[[:space:]]/}" ]] && input='{}'
+    fi
+
+    handle_request "{\"type\":\"sense\",\"id\":1,\"input\":${input}}" 1
+}
+
+main() {
+    if [[ "${1:-}" == "--framed" ]]; then
+        serve_framed "${2:-}"
+        return
+    fi
+
+    if [[ "${1:-}" == "--coprocess" ]]; then
+        serve
+        return
+    fi
+
+    if [[ "${1:-}" == "--batch" ]]; then
+        serve_batch
+        return
+    fi
+
+    # Read JSON from STDIN
+    if [[ -t 0 ]]; then
+        # STDIN is a terminal (not piped), use empty JSON
+        INPUT_JSON='{}'
+    else
+        INPUT_JSON=$(cat)
+    fi
+
+    sense \
+        "$(json_get "model" "Claude")" \
+        "$(json_get "workspace_path" "$PWD")" \
+        "$(json_get "context_window.max_tokens" "$DEFAULT_MAX_TOKENS")" \
+        "$(json_get "context_window.tokens_used" "0")"
+
+    # Emit final status
+    echo "$SENSOR_DISPLAY"
+
+    # Emit structured data to STDERR
+    echo "$SENSOR_DATA" >&2
 }
 
 # ============================================================================
@@ -7,6 +7,21 @@ __version__ = "1.0.0"
 __agent_type__ = "context"
 
 from .agent import ContextAgent
+from .sensors import Sensor, SubprocessSensor, NativeSensor, SensorError
+from .coprocess import CoprocessSensor
+from .cache import SensorResultCache
+from .breaker import CircuitBreaker, BreakerState
+from .pool import SensorPool
+from .registry import SensorRegistry, FieldSensor
+from .spawner import SensorSpawner
+from .replay import RecordingSensor, ReplaySensor
+from .priority import SensorPriority
+from .polling import AdaptiveInterval
+from .watcher import ChangeWatcher, InotifyWatcher, StatWatcher
+from .scheduler import PollScheduler, shared_scheduler
+from .coordination import HostSensorLock
+from .pressure import PressureMonitor
+from .async_sensor import AsyncSensorRunner
 from .state import AgentState, WorkspaceInfo, GitInfo, ContextWindowInfo
 from .events import EventType, StateChangeEvent
 from .config import AgentConfig
@@ -15,6 +30,30 @@ from .zerodb_integration import ZeroDBPersistence
 
 __all__ = [
     "ContextAgent",
+    "Sensor",
+    "SubprocessSensor",
+    "NativeSensor",
+    "CoprocessSensor",
+    "SensorError",
+    "SensorResultCache",
+    "CircuitBreaker",
+    "BreakerState",
+    "SensorPool",
+    "SensorRegistry",
+    "FieldSensor",
+    "SensorSpawner",
+    "RecordingSensor",
+    "ReplaySensor",
+    "SensorPriority",
+    "AdaptiveInterval",
+    "ChangeWatcher",
+    "InotifyWatcher",
+    "StatWatcher",
+    "PollScheduler",
+    "shared_scheduler",
+    "HostSensorLock",
+    "PressureMonitor",
+    "AsyncSensorRunner",
     "ContextAgentWithZeroDB",
     "create_context_agent",
     "AgentState",
@@ -5,26 +5,105 @@ This module implements the main ContextAgent class that orchestrates
 sensor execution, output parsing, and state management.
 """
 
-import subprocess
 import json
 import logging
 import threading
 import time
 from pathlib import Path
-from typing import Optional, Dict, Any, Tuple
+from typing import (
+    Optional, Dict, Any, Tuple, Callable, List, Sequence, Set, Union, AbstractSet
+)
 from datetime import datetime
 
 from .state import AgentState
 from .events import EventEmitter, EventType, StateChangeEvent
+from .sensors import Sensor, SubprocessSensor, SensorError, SensorData, BatchResult, create_sensor
+from .registry import GroupDocument
+from .schema import decode_partial_state
+from .cache import SensorResultCache, input_digest, sensor_fingerprint
+from .metrics import LatencyHistogram, AdaptiveTimeout, ResourceAccounting
+from .breaker import CircuitBreaker, BreakerState
+from .pool import SensorPool
+from .spawner import SensorSpawner
+from .replay import RecordingSensor
+from .priority import SensorPriority
+from .polling import AdaptiveInterval, PollTimer, POLL_POLICIES, THRESHOLD_MARGIN
+from .watcher import ChangeWatcher, create_watcher, watch_targets
+from .scheduler import PollScheduler, ScheduledPoll
+from .coordination import HostSensorLock, poll_phase
+from .pressure import PressureMonitor
 
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Scheduler re-check delay of a suspended agent (reads wake it earlier)
+SUSPENDED_RECHECK = 3600.0
 
-class SensorError(Exception):
-    """Raised when sensor execution fails"""
-    pass
+
+def default_sensor_path() -> Path:
+    """Bundled sensor script (scripts/context_sensor.sh relative to project root)"""
+    return Path(__file__).parent.parent / "scripts" / "context_sensor.sh"
+
+
+def parse_sensor_output(stdout: str, stderr: SensorData) -> AgentState:
+    """
+    Parse sensor output and convert to AgentState
+
+    Shared by ContextAgent and AsyncSensorRunner. Malformed output never
+    raises: missing fields result in a partial state, not a failure.
+
+    Args:
+        stdout: Display string from sensor (STDOUT)
+        stderr: JSON data from sensor (STDERR), or the data object already
+            decoded from a protocol frame
+
+    Returns:
+        Normalized AgentState
+    """
+    try:
+        # Parse JSON data from STDERR (frame-based backends pass it decoded)
+        if isinstance(stderr, str):
+            sensor_data = json.loads(stderr) if stderr else {}
+        else:
+            sensor_data = stderr
+
+        # Display string from STDOUT
+        display_string = stdout if stdout else ""
+
+        # Convert to AgentState using the factory method
+        state = AgentState.from_sensor_output(sensor_data, display_string)
+
+        logger.debug(f"Parsed sensor output: {state.to_dict()}")
+
+        return state
+
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse sensor JSON output: {e}")
+        logger.error(f"Raw stderr: {stderr}")
+
+        # Return partial state with error indication
+        return AgentState(
+            display=stdout if stdout else "Error parsing sensor output",
+            last_updated=datetime.utcnow().isoformat()
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error parsing sensor output: {e}")
+
+        # Return minimal valid state
+        return AgentState(
+            display="Sensor parsing error",
+            last_updated=datetime.utcnow().isoformat()
+        )
+
+
+class _InFlight:
+    """A sensor execution shared by concurrent get_state callers"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.state: Optional[AgentState] = None
+        self.error: Optional[BaseException] = None
 
 
 class ContextAgent:
@@ -40,7 +119,41 @@ class ContextAgent:
         sensor_path: Optional[str] = None,
         sensor_timeout: float = 5.0,
         context_threshold: int = 80,
-        enable_events: bool = True
+        enable_events: bool = True,
+        sensor_backend: str = "subprocess",
+        sensor: Optional[Sensor] = None,
+        min_refresh_interval: float = 0.0,
+        result_cache_size: int = 0,
+        adaptive_timeout: bool = False,
+        min_sensor_timeout: float = 0.5,
+        adaptive_timeout_factor: float = 3.0,
+        breaker_failure_threshold: int = 3,
+        breaker_base_delay: float = 10.0,
+        breaker_max_delay: float = 300.0,
+        pool: Optional[SensorPool] = None,
+        pool_key: Optional[str] = None,
+        use_spawner: bool = False,
+        record_path: Optional[str] = None,
+        sensor_nice: int = 0,
+        sensor_io_class: str = "none",
+        sensor_cpu_quota: float = 0.0,
+        adaptive_polling: bool = False,
+        min_polling_interval: float = 1.0,
+        max_polling_interval: float = 60.0,
+        watch_workspace: bool = False,
+        watch_polling_interval: float = 300.0,
+        scheduler: Optional[PollScheduler] = None,
+        fixed_rate_polling: bool = False,
+        missed_poll_policy: str = "skip",
+        idle_timeout: float = 0.0,
+        poll_phase_spread: bool = False,
+        poll_jitter: float = 0.0,
+        sensor_lock_path: Optional[str] = None,
+        sensor_lock_slots: int = 1,
+        pressure_throttling: bool = False,
+        pressure_cpu_limit: float = 40.0,
+        pressure_io_limit: float = 40.0,
+        pressure_max_stretch: float = 4.0
     ):
         """
         Initialize ContextAgent
@@ -50,12 +163,90 @@ class ContextAgent:
             sensor_timeout: Timeout for sensor execution in seconds (default: 5.0)
             context_threshold: Context window usage percentage threshold for alerts (default: 80)
             enable_events: Whether to enable event emission (default: True)
+            sensor_backend: Built-in sensor backend, "subprocess" runs the sensor
+                script, "native" computes the same state in-process, "coprocess"
+                keeps one sensor process alive across polls, "registry" refreshes
+                each field group on its own interval (default: "subprocess")
+            sensor: Optional custom Sensor instance (overrides sensor_backend)
+            min_refresh_interval: Default max_age for get_state; refreshes
+                within this many seconds of the last one return the cached
+                state (default: 0.0, always refresh)
+            result_cache_size: Number of sensor results to cache, keyed on the
+                input and stat() fingerprints of the workspace and git state;
+                unchanged polls skip the sensor (default: 0, disabled)
+            adaptive_timeout: Derive the sensor timeout from observed latency
+                (p99 × adaptive_timeout_factor, clamped to
+                [min_sensor_timeout, sensor_timeout]) (default: False)
+            min_sensor_timeout: Lower bound of the adaptive timeout in seconds
+            adaptive_timeout_factor: Multiplier applied to the p99 latency
+            breaker_failure_threshold: Consecutive sensor failures after which
+                polling backs off (0 disables the circuit breaker)
+            breaker_base_delay: First backoff delay in seconds (doubles per
+                failed half-open probe, with jitter)
+            breaker_max_delay: Maximum backoff delay in seconds
+            pool: Optional SensorPool shared with other agents; sensor runs
+                are queued on it instead of running on the calling thread
+            pool_key: Fairness key on the pool (defaults to the sensor's
+                working directory, i.e. one queue per workspace)
+            use_spawner: Launch subprocess/framed sensor scripts from a small
+                pre-started helper process instead of forking the agent, so
+                spawn cost does not grow with the agent's memory (default: False)
+            record_path: Record every sensor execution to this trace file
+                (see RecordingSensor; replay it with ReplaySensor)
+            sensor_nice: Niceness increment for sensor processes (0-19)
+            sensor_io_class: I/O scheduling class for sensor processes
+                ("none", "best-effort" or "idle")
+            sensor_cpu_quota: Total CPU quota of sensor processes as a
+                fraction of one CPU, enforced with a cgroup v2 when one can
+                be created (0 disables)
+            adaptive_polling: Poll at min_polling_interval after changes or
+                near the context threshold and back off towards
+                max_polling_interval while the state is stable; start()'s
+                polling_interval is the starting point (default: False)
+            min_polling_interval: Shortest adaptive polling interval in seconds
+            max_polling_interval: Longest adaptive polling interval in seconds
+            watch_workspace: While polling, watch .git (HEAD, refs) and the
+                workspace directory (inotify, or a stat() fallback) and poll
+                immediately when they change (default: False)
+            watch_polling_interval: Polling interval used as a safety net
+                while the watcher is active (a longer polling_interval wins)
+            scheduler: Optional PollScheduler shared with other agents; polls
+                run on its threads instead of a poller thread per agent
+            fixed_rate_polling: Poll on a fixed-rate grid anchored to the
+                monotonic clock instead of waiting the interval after each
+                poll, so sensor and handler time do not stretch the period
+                (default: False)
+            missed_poll_policy: What fixed-rate polling does after an
+                overrun: "skip" missed ticks, "catch_up" on them back to
+                back, or "coalesce" them into one immediate poll
+            idle_timeout: Suspend background polling once nobody has read
+                the state (get_state, get_state_dict, get_display_header, ...)
+                for this many seconds and no event handlers are registered;
+                the next read or subscription resumes it (0 disables)
+            poll_phase_spread: Delay the first background poll by an offset
+                derived from the workspace path (the same in every process),
+                so agents started together poll at different points of the
+                interval (default: False)
+            poll_jitter: Random offset of every poll as a fraction of the
+                interval, e.g. 0.1 for up to ±10% (default: 0.0)
+            sensor_lock_path: Lock file prefix shared by agents on the host;
+                at most sensor_lock_slots sensors run at once host-wide
+                (flock-based, default: None = no limit)
+            sensor_lock_slots: Concurrent sensor runs allowed host-wide
+            pressure_throttling: Stretch polling intervals while the host is
+                under CPU or I/O pressure (Linux PSI, falling back to the
+                load average); polls close to the context threshold keep
+                their rate (default: False)
+            pressure_cpu_limit: CPU pressure in percent above which polling
+                is stretched (default: 40.0)
+            pressure_io_limit: I/O pressure in percent above which polling
+                is stretched (default: 40.0)
+            pressure_max_stretch: Interval multiplier at full pressure
+                (default: 4.0)
         """
         # Resolve sensor script path
         if sensor_path is None:
-            # Default to scripts/context_sensor.sh relative to project root
-            project_root = Path(__file__).parent.parent
-            self._sensor_path = project_root / "scripts" / "context_sensor.sh"
+            self._sensor_path = default_sensor_path()
         else:
             self._sensor_path = Path(sensor_path)
 
@@ -66,35 +257,151 @@ class ContextAgent:
         if not self._sensor_path.is_file():
             raise ValueError(f"Sensor path is not a file: {self._sensor_path}")
 
+        # Sensor backend (the native backend inspects the same directory
+        # the sensor script would run in)
+        self._spawner = SensorSpawner() if use_spawner and sensor is None else None
+        priority = (
+            SensorPriority.from_settings(sensor_nice, sensor_io_class, sensor_cpu_quota)
+            if sensor is None else None
+        )
+        self._sensor = sensor or create_sensor(
+            sensor_backend, str(self._sensor_path), spawner=self._spawner, priority=priority
+        )
+        if record_path is not None:
+            self._sensor = RecordingSensor(self._sensor, record_path)
+
         # Configuration
         self._sensor_timeout = sensor_timeout
         self._context_threshold = context_threshold
         self._enable_events = enable_events
+        self._min_refresh_interval = min_refresh_interval
+        self._result_cache = (
+            SensorResultCache(result_cache_size) if result_cache_size > 0 else None
+        )
+
+        # Sensor latency (always recorded) and the timeout derived from it
+        self._latency = LatencyHistogram()
+        self._adaptive_timeout = (
+            AdaptiveTimeout(
+                self._latency,
+                minimum=min(min_sensor_timeout, sensor_timeout),
+                maximum=sensor_timeout,
+                factor=adaptive_timeout_factor
+            )
+            if adaptive_timeout else None
+        )
 
         # State management
         self._current_state: Optional[AgentState] = None
         self._previous_state: Optional[AgentState] = None
         self._state_lock = threading.Lock()
 
+        # Freshness tracking (monotonic clock)
+        self._last_refresh: Optional[float] = None
+        self._last_refresh_key: Optional[str] = None
+
+        # Raw output behind _current_state (byte-identical short-circuit)
+        self._last_output: Optional[Tuple[str, SensorData]] = None
+
         # Event system
         self._event_emitter = EventEmitter() if enable_events else None
 
+        # Shared execution pool
+        self._pool = pool
+        self._pool_key = pool_key or str(self._sensor.cwd)
+
+        # Host-wide sensor concurrency limit
+        self._host_lock = (
+            HostSensorLock(sensor_lock_path, slots=sensor_lock_slots, key=self._pool_key)
+            if sensor_lock_path else None
+        )
+
+        # Circuit breaker for the poll loop
+        self._breaker = (
+            CircuitBreaker(
+                failure_threshold=breaker_failure_threshold,
+                base_delay=breaker_base_delay,
+                max_delay=breaker_max_delay,
+                on_transition=self._on_breaker_transition
+            )
+            if breaker_failure_threshold > 0 else None
+        )
+
         # Polling mechanism
         self._polling = False
+        self._adaptive_polling = adaptive_polling
+        self._min_polling_interval = min_polling_interval
+        self._max_polling_interval = max_polling_interval
+        self._polling_interval: Optional[float] = None
+        self._adaptive_interval: Optional[AdaptiveInterval] = None
+        if not 0 <= poll_jitter < 1:
+            raise ValueError(f"poll_jitter must be in [0, 1), got {poll_jitter}")
+        if missed_poll_policy not in POLL_POLICIES:
+            raise ValueError(
+                f"missed_poll_policy must be one of {list(POLL_POLICIES)}, got {missed_poll_policy}"
+            )
+        self._fixed_rate_polling = fixed_rate_polling
+        self._missed_poll_policy = missed_poll_policy
+        self._poll_timer: Optional[PollTimer] = None
+        self._poll_phase_spread = poll_phase_spread
+        self._poll_jitter = poll_jitter
+        self._pressure = (
+            PressureMonitor(
+                cpu_limit=pressure_cpu_limit,
+                io_limit=pressure_io_limit,
+                max_stretch=pressure_max_stretch
+            )
+            if pressure_throttling else None
+        )
+        # Set to poll before the current interval elapses (and on stop)
+        self._wake_event = threading.Event()
+
+        # Change watcher (active while polling)
+        self._watch_workspace = watch_workspace
+        self._watch_polling_interval = watch_polling_interval
+        self._watcher: Optional[ChangeWatcher] = None
+
+        # Demand-driven polling: reads and subscriptions keep it running
+        self._idle_timeout = idle_timeout
+        self._last_read = time.monotonic()
+        self._suspended = False
+        self._suspensions = 0
+        # Marks the poller's own get_state calls, which are not reads
+        self._poll_context = threading.local()
+
+        # Shared scheduler (replaces the poller thread when given)
+        self._scheduler = scheduler
+        self._scheduled_poll: Optional[ScheduledPoll] = None
         self._poll_thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
 
         # Threshold tracking (to emit only once per crossing)
         self._threshold_exceeded = False
 
+        # Single-flight sensor execution and statistics
+        self._flight_lock = threading.Lock()
+        self._in_flight: Dict[str, _InFlight] = {}
+        self._stats: Dict[str, int] = {
+            "refresh_requests": 0,
+            "sensor_executions": 0,
+            "coalesced_refreshes": 0,
+            "unchanged_outputs": 0,
+            "batch_executions": 0,
+            "batched_inputs": 0,
+        }
+
         logger.info(
-            f"ContextAgent initialized: sensor={self._sensor_path}, "
+            f"ContextAgent initialized: sensor={self._sensor_path} "
+            f"({self._sensor.name}), "
             f"timeout={sensor_timeout}s, threshold={context_threshold}%"
         )
 
-    def _execute_sensor(self, input_data: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+    def _execute_sensor(
+        self,
+        input_data: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, SensorData]:
         """
-        Execute sensor script via subprocess
+        Execute sensor via the configured sensor backend
 
         Args:
             input_data: Optional JSON data to pass to sensor via STDIN
@@ -105,115 +412,88 @@ class ContextAgent:
         Raises:
             SensorError: If sensor execution fails or times out
         """
-        try:
-            # Prepare input JSON
-            stdin_input = json.dumps(input_data or {})
-
-            logger.debug(f"Executing sensor: {self._sensor_path}")
-            logger.debug(f"Sensor input: {stdin_input}")
-
-            # Execute sensor script
-            process = subprocess.Popen(
-                [str(self._sensor_path)],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                cwd=str(self._sensor_path.parent)
+        execute = self._sensor.execute
+        if self._host_lock is not None:
+            execute = self._host_lock.wrap(execute)
+
+        if self._pool is not None:
+            return self._pool.run(
+                self._pool_key, execute, input_data, timeout=self.sensor_timeout
             )
+        return execute(input_data, timeout=self.sensor_timeout)
 
-            # Communicate with timeout
-            try:
-                stdout, stderr = process.communicate(
-                    input=stdin_input,
-                    timeout=self._sensor_timeout
-                )
-            except subprocess.TimeoutExpired:
-                process.kill()
-                stdout, stderr = process.communicate()
-                raise SensorError(
-                    f"Sensor execution timed out after {self._sensor_timeout}s"
-                )
+    def _execute_sensor_batch(
+        self,
+        inputs: Sequence[Optional[Dict[str, Any]]]
+    ) -> List[BatchResult]:
+        """
+        Execute the sensor for several inputs in one backend invocation
 
-            # Check return code
-            if process.returncode != 0:
-                logger.warning(
-                    f"Sensor exited with non-zero code: {process.returncode}"
-                )
-                logger.warning(f"Sensor stderr: {stderr}")
-                raise SensorError(
-                    f"Sensor failed with exit code {process.returncode}: {stderr}"
-                )
+        Args:
+            inputs: Input data for each evaluation
 
-            logger.debug(f"Sensor stdout: {stdout}")
-            logger.debug(f"Sensor stderr: {stderr}")
+        Returns:
+            One (stdout, stderr) tuple or SensorError per input, in order
 
-            return stdout.strip(), stderr.strip()
+        Raises:
+            SensorError: If the batch as a whole fails
+        """
+        execute_batch = self._sensor.execute_batch
+        if self._host_lock is not None:
+            execute_batch = self._host_lock.wrap(execute_batch)
 
-        except FileNotFoundError as e:
-            raise SensorError(f"Sensor script not found: {e}")
-        except PermissionError as e:
-            raise SensorError(f"Permission denied executing sensor: {e}")
-        except Exception as e:
-            if isinstance(e, SensorError):
-                raise
-            raise SensorError(f"Unexpected error executing sensor: {e}")
+        if self._pool is not None:
+            return self._pool.run(
+                self._pool_key, execute_batch, inputs, timeout=self.sensor_timeout
+            )
+        return execute_batch(inputs, timeout=self.sensor_timeout)
 
     def _parse_sensor_output(
         self,
         stdout: str,
-        stderr: str
+        stderr: SensorData
     ) -> AgentState:
         """
         Parse sensor output and convert to AgentState
 
         Args:
             stdout: Display string from sensor (STDOUT)
-            stderr: JSON data from sensor (STDERR)
+            stderr: JSON data from sensor (STDERR) or its decoded object
 
         Returns:
-            Normalized AgentState
-
-        Raises:
-            SensorError: If parsing fails
+            Normalized AgentState (see parse_sensor_output)
         """
-        try:
-            # Parse JSON data from STDERR
-            sensor_data = json.loads(stderr) if stderr else {}
-
-            # Display string from STDOUT
-            display_string = stdout if stdout else ""
+        return parse_sensor_output(stdout, stderr)
 
-            # Convert to AgentState using the factory method
-            state = AgentState.from_sensor_output(sensor_data, display_string)
-
-            logger.debug(f"Parsed sensor output: {state.to_dict()}")
-
-            return state
-
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse sensor JSON output: {e}")
-            logger.error(f"Raw stderr: {stderr}")
+    def _parse_partial_output(
+        self,
+        stdout: str,
+        document: GroupDocument,
+        previous: AgentState,
+        keys: AbstractSet[str]
+    ) -> AgentState:
+        """
+        Rebuild only the parts of the state a registry document refreshed
 
-            # Return partial state with error indication
-            # This satisfies "missing fields result in partial state, not failure"
-            return AgentState(
-                display=stdout if stdout else "Error parsing sensor output",
-                last_updated=datetime.utcnow().isoformat()
-            )
-        except Exception as e:
-            logger.error(f"Unexpected error parsing sensor output: {e}")
+        Args:
+            stdout: Display string from sensor
+            document: Sensor data derived from the one behind ``previous``
+            previous: Current state the other parts are carried over from
+            keys: Top-level keys recollected since ``previous``
 
-            # Return minimal valid state
-            return AgentState(
-                display="Sensor parsing error",
-                last_updated=datetime.utcnow().isoformat()
-            )
+        Returns:
+            Normalized AgentState
+        """
+        state, errors = decode_partial_state(document, stdout or "", previous, keys)
+        for error in errors:
+            logger.warning(f"Invalid sensor field {error}")
+        return state
 
     def _emit_state_change_events(
         self,
         new_state: AgentState,
-        old_state: Optional[AgentState]
+        old_state: Optional[AgentState],
+        keys: Optional[AbstractSet[str]] = None
     ) -> None:
         """
         Emit state change events based on state differences
@@ -221,6 +501,7 @@ class ContextAgent:
         Args:
             new_state: New agent state
             old_state: Previous agent state (may be None)
+            keys: Top-level sensor keys that can differ (None = all)
         """
         if not self._enable_events or not self._event_emitter:
             return
@@ -237,7 +518,7 @@ class ContextAgent:
             return
 
         # Check for specific changes
-        changes = new_state.get_changes(old_state)
+        changes = new_state.get_changes(old_state, keys)
 
         # Model changed
         if "model" in changes:
@@ -312,7 +593,8 @@ class ContextAgent:
     def get_state(
         self,
         input_data: Optional[Dict[str, Any]] = None,
-        force_refresh: bool = True
+        force_refresh: bool = True,
+        max_age: Optional[float] = None
     ) -> AgentState:
         """
         Get current agent state
@@ -320,6 +602,10 @@ class ContextAgent:
         Args:
             input_data: Optional input data to pass to sensor
             force_refresh: Whether to force sensor execution (default: True)
+            max_age: Maximum acceptable state age in seconds. When the cached
+                state was refreshed with the same input no longer than max_age
+                ago it is returned without running the sensor. Defaults to the
+                agent's min_refresh_interval.
 
         Returns:
             Current AgentState
@@ -327,55 +613,389 @@ class ContextAgent:
         Raises:
             SensorError: If sensor execution fails and no previous state exists
         """
+        self._touch()
+        key = self._input_key(input_data)
+
+        if max_age is None and self._min_refresh_interval > 0:
+            max_age = self._min_refresh_interval
+
         with self._state_lock:
             if not force_refresh and self._current_state:
                 logger.debug("Returning cached state (force_refresh=False)")
                 return self._current_state
 
+            if max_age is not None and self._is_fresh(key, max_age):
+                logger.debug(f"Returning cached state (fresher than {max_age}s)")
+                return self._current_state
+
+        # Single-flight: concurrent refreshes with the same input share one
+        # sensor execution instead of spawning one sensor per caller
+        with self._flight_lock:
+            self._stats["refresh_requests"] += 1
+            flight = self._in_flight.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = _InFlight()
+                self._in_flight[key] = flight
+            else:
+                self._stats["coalesced_refreshes"] += 1
+
+        if not is_leader:
+            logger.debug("Joining in-flight sensor execution")
+            flight.done.wait()
+            if flight.error is None:
+                return flight.state
+            if isinstance(flight.error, SensorError):
+                return self._fallback_state(flight.error)
+            raise flight.error
+
         try:
+            flight.state = self._refresh_state(input_data, key)
+            return flight.state
+        except SensorError as e:
+            flight.error = e
+            logger.error(f"Sensor execution failed: {e}")
+            return self._fallback_state(e)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._flight_lock:
+                del self._in_flight[key]
+            flight.done.set()
+
+    def _refresh_state(self, input_data: Optional[Dict[str, Any]], key: str) -> AgentState:
+        """
+        Execute the sensor, update cached state and emit change events
+
+        Args:
+            input_data: Optional input data to pass to sensor
+            key: Canonical input key (see _input_key)
+
+        Returns:
+            Newly parsed AgentState
+
+        Raises:
+            SensorError: If sensor execution fails
+        """
+        # Reuse a cached result when input and filesystem state are unchanged
+        # (not for a half-open probe, which has to run the sensor)
+        cache_key = None
+        result = None
+        if self._result_cache is not None:
+            cache_key = self._result_cache_key(input_data, key)
+            if self._breaker is None or self._breaker.state is not BreakerState.HALF_OPEN:
+                result = self._result_cache.get(cache_key)
+
+        if result is None:
             # Execute sensor (outside lock to avoid blocking polling)
-            stdout, stderr = self._execute_sensor(input_data)
+            with self._flight_lock:
+                self._stats["sensor_executions"] += 1
+
+            # Failed and timed-out runs are recorded too: a sensor that
+            # starts hitting the adaptive timeout pushes it back up
+            started = time.monotonic()
+            try:
+                result = self._execute_sensor(input_data)
+            except Exception:
+                # Any failure resolves a half-open probe
+                if self._breaker is not None:
+                    self._breaker.record_failure()
+                raise
+            finally:
+                self._latency.record(time.monotonic() - started)
+
+            if self._breaker is not None:
+                self._breaker.record_success()
+
+            if cache_key is not None:
+                self._result_cache.put(cache_key, result)
+
+        # Byte-identical output: the state cannot have changed, so skip
+        # parsing, allocation and diffing and only confirm freshness
+        with self._state_lock:
+            base_output = self._last_output
+            base_state = self._current_state
+            if result == base_output and base_state is not None:
+                self._last_refresh = time.monotonic()
+                self._last_refresh_key = key
+                unchanged_state = base_state
+            else:
+                unchanged_state = None
 
-            # Parse output
+        if unchanged_state is not None:
+            with self._flight_lock:
+                self._stats["unchanged_outputs"] += 1
+            return unchanged_state
+
+        stdout, stderr = result
+
+        # A registry document derived from the one behind the current state
+        # only needs its recollected keys rebuilt and diffed
+        refreshed = None
+        if isinstance(stderr, GroupDocument) and base_state is not None:
+            refreshed = stderr.refreshed_since(base_output[1] if base_output else None)
+
+        # Parse output
+        if refreshed is not None:
+            new_state = self._parse_partial_output(stdout, stderr, base_state, refreshed)
+        else:
             new_state = self._parse_sensor_output(stdout, stderr)
 
-            # Update state tracking with lock
-            with self._state_lock:
-                self._previous_state = self._current_state
-                self._current_state = new_state
+        # Update state tracking with lock
+        with self._state_lock:
+            # Another refresh may have replaced the base state meanwhile
+            keys = refreshed if self._current_state is base_state else None
+            self._previous_state = self._current_state
+            self._current_state = new_state
+            self._last_output = result
+            self._last_refresh = time.monotonic()
+            self._last_refresh_key = key
 
-                # Emit events if state changed
-                if new_state.has_changed(self._previous_state):
-                    self._emit_state_change_events(new_state, self._previous_state)
+            # Emit events if state changed
+            if new_state.has_changed(self._previous_state, keys):
+                self._emit_state_change_events(new_state, self._previous_state, keys)
 
-            return new_state
+        return new_state
 
-        except SensorError as e:
-            logger.error(f"Sensor execution failed: {e}")
+    def _fallback_state(self, error: SensorError) -> AgentState:
+        """
+        Return the cached state after a sensor failure
 
-            # If we have previous state, return it as fallback
-            with self._state_lock:
-                if self._current_state:
-                    logger.warning("Returning cached state due to sensor failure")
-                    return self._current_state
+        Raises:
+            SensorError: If no previous state exists
+        """
+        # If we have previous state, return it as fallback
+        with self._state_lock:
+            if self._current_state:
+                logger.warning("Returning cached state due to sensor failure")
+                return self._current_state
 
-            # No previous state - raise error
-            raise
+        # No previous state - raise error
+        raise error
+
+    def _is_fresh(self, key: str, max_age: float) -> bool:
+        """Whether the cached state was refreshed with this input within max_age (lock held)"""
+        return (
+            self._current_state is not None
+            and self._last_refresh is not None
+            and self._last_refresh_key == key
+            and time.monotonic() - self._last_refresh <= max_age
+        )
+
+    @property
+    def last_refreshed_at(self) -> Optional[float]:
+        """
+        Monotonic time (time.monotonic()) the state was last confirmed
+
+        Updated by every successful refresh, including refreshes whose
+        output was identical to the previous one.
+        """
+        return self._last_refresh
+
+    def get_state_age(self) -> Optional[float]:
+        """
+        Get the age of the cached state
+
+        Returns:
+            Seconds since the last successful sensor refresh (monotonic clock),
+            or None if the state has never been refreshed
+        """
+        last_refresh = self._last_refresh
+        if last_refresh is None:
+            return None
+        return time.monotonic() - last_refresh
+
+    @staticmethod
+    def _input_key(input_data: Optional[Dict[str, Any]]) -> str:
+        """Canonical key identifying sensor input (used to coalesce refreshes)"""
+        return json.dumps(input_data or {}, sort_keys=True, default=str)
+
+    def _result_cache_key(self, input_data: Optional[Dict[str, Any]], key: str) -> Tuple[Any, ...]:
+        """Result cache key: input digest plus filesystem fingerprints"""
+        workspace_path = (input_data or {}).get("workspace_path")
+        sensor_path = getattr(self._sensor, "path", None)
+
+        return (
+            input_digest(key),
+            sensor_fingerprint(
+                self._sensor.cwd,
+                workspace_path if isinstance(workspace_path, str) else None,
+                extra_paths=[sensor_path] if sensor_path is not None else ()
+            )
+        )
+
+    @property
+    def sensor_timeout(self) -> float:
+        """
+        Effective sensor timeout in seconds
+
+        The configured sensor_timeout, or the latency-derived value when
+        adaptive_timeout is enabled.
+        """
+        if self._adaptive_timeout is not None:
+            return self._adaptive_timeout.value
+        return self._sensor_timeout
+
+    @property
+    def polling_interval(self) -> Optional[float]:
+        """
+        Current polling interval in seconds
+
+        The interval passed to start(), or the adaptive interval when
+        adaptive_polling is enabled; None before the agent was started.
+        """
+        if self._adaptive_interval is not None:
+            return self._adaptive_interval.value
+        return self._polling_interval
+
+    @property
+    def under_pressure(self) -> bool:
+        """
+        Whether the host is under CPU or I/O pressure
+
+        Always False unless pressure_throttling is enabled. Deferrable
+        background work (e.g. persistence) should wait while True.
+        """
+        return self._pressure is not None and self._pressure.under_pressure
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get sensor execution statistics
+
+        Returns:
+            Dictionary of counters:
+            - refresh_requests: get_state calls that requested a refresh
+            - sensor_executions: sensor runs actually performed
+            - coalesced_refreshes: refreshes served by another caller's
+              in-flight sensor execution
+            - unchanged_outputs: refreshes whose raw output was byte-identical
+              to the previous one (state reused without parsing)
+            - batch_executions / batched_inputs: get_states calls and the
+              number of inputs they evaluated
+            - result_cache: result cache statistics (only when enabled)
+            - latency: sensor run latency percentiles in seconds and the
+              effective sensor timeout
+            - breaker: circuit breaker state (only when enabled)
+            - pool: shared pool statistics (only when a pool is used)
+            - resources: CPU seconds and peak RSS of sensor child processes,
+              in total and per workspace (process-based backends only)
+            - polling: current interval, schedule mode, achieved poll rate
+              and lag behind the due times, idle suspension state, plus the
+              adaptive interval state when enabled (only once started)
+            - watcher: change watcher backend and event counts (only while
+              watching)
+            - scheduler: shared poll scheduler statistics (only when a
+              scheduler is used)
+            - host_lock: host-wide sensor lock slots and contention (only
+              when sensor_lock_path is set)
+            - pressure: host pressure readings and the current interval
+              stretch (only when pressure_throttling is enabled)
+        """
+        with self._flight_lock:
+            stats: Dict[str, Any] = dict(self._stats)
+
+        stats["latency"] = self._latency.snapshot()
+        stats["latency"]["timeout"] = self.sensor_timeout
+
+        if self._breaker is not None:
+            stats["breaker"] = self._breaker.snapshot()
+
+        if self._result_cache is not None:
+            stats["result_cache"] = self._result_cache.stats()
+
+        if self._pool is not None:
+            stats["pool"] = self._pool.stats()
+
+        usage = getattr(self._sensor, "usage", None)
+        if isinstance(usage, ResourceAccounting):
+            stats["resources"] = usage.snapshot()
+
+        if self._poll_timer is not None:
+            polling = self._poll_timer.snapshot()
+            polling["interval"] = self.polling_interval
+            polling["suspended"] = self._suspended
+            polling["suspensions"] = self._suspensions
+            if self._adaptive_interval is not None:
+                polling.update(self._adaptive_interval.snapshot())
+            stats["polling"] = polling
+
+        watcher = self._watcher
+        if watcher is not None:
+            stats["watcher"] = watcher.stats()
+
+        if self._scheduler is not None:
+            stats["scheduler"] = self._scheduler.stats()
+
+        if self._host_lock is not None:
+            stats["host_lock"] = self._host_lock.stats()
+
+        if self._pressure is not None:
+            stats["pressure"] = self._pressure.snapshot()
+
+        return stats
+
+    def get_states(
+        self,
+        inputs: Sequence[Optional[Dict[str, Any]]],
+        return_exceptions: bool = False
+    ) -> List[Union[AgentState, SensorError]]:
+        """
+        Compute states for many inputs with a single sensor invocation
+
+        The subprocess backend evaluates the whole batch in one process
+        (``--batch`` mode), so the spawn cost is shared by all inputs. Batch
+        results are independent of the agent's own state: they do not
+        update get_state()'s cached state or emit events.
+
+        Args:
+            inputs: Input data for each state (e.g. one per IDE session)
+            return_exceptions: Return a SensorError in place of each failed
+                input instead of raising the first failure
+
+        Returns:
+            AgentStates in input order
+
+        Raises:
+            SensorError: If the batch fails, or an input fails and
+                return_exceptions is False
+        """
+        inputs = list(inputs)
+
+        self._touch()
+        with self._flight_lock:
+            self._stats["batch_executions"] += 1
+            self._stats["batched_inputs"] += len(inputs)
+
+        results = self._execute_sensor_batch(inputs) if inputs else []
+
+        states: List[Union[AgentState, SensorError]] = []
+        for result in results:
+            if isinstance(result, SensorError):
+                if not return_exceptions:
+                    raise result
+                states.append(result)
+            else:
+                states.append(self._parse_sensor_output(*result))
+
+        return states
 
     def get_display_string(
         self,
-        input_data: Optional[Dict[str, Any]] = None
+        input_data: Optional[Dict[str, Any]] = None,
+        max_age: Optional[float] = None
     ) -> str:
         """
         Get display string from sensor
 
         Args:
             input_data: Optional input data to pass to sensor
+            max_age: Maximum acceptable state age in seconds (see get_state)
 
         Returns:
             Display string from sensor STDOUT
         """
-        state = self.get_state(input_data)
+        state = self.get_state(input_data, max_age=max_age)
         return state.display
 
     @property
@@ -393,6 +1013,22 @@ class ContextAgent:
         """Get event emitter instance"""
         return self._event_emitter
 
+    @property
+    def sensor(self) -> Sensor:
+        """Get the sensor backend instance"""
+        return self._sensor
+
+    @property
+    def _sensor_path(self) -> Path:
+        """Sensor script path (kept in sync with the subprocess backend)"""
+        return self._script_path
+
+    @_sensor_path.setter
+    def _sensor_path(self, value) -> None:
+        self._script_path = Path(value)
+        if isinstance(getattr(self, "_sensor", None), SubprocessSensor):
+            self._sensor.path = self._script_path
+
     def on(self, event_type: EventType, callback) -> None:
         """
         Register event handler
@@ -403,6 +1039,7 @@ class ContextAgent:
         """
         if self._event_emitter:
             self._event_emitter.on(event_type, callback)
+            self._touch()
         else:
             logger.warning("Event emitter not enabled - cannot register handler")
 
@@ -421,14 +1058,16 @@ class ContextAgent:
         """
         Start background polling
 
-        Starts a background thread that polls the sensor at regular intervals
-        and emits events when state changes are detected.
+        Starts a background thread (or registers with the shared scheduler)
+        that polls the sensor at regular intervals and emits events when
+        state changes are detected.
 
         Executes the sensor once immediately to initialize state before
         starting the background polling thread.
 
         Args:
-            polling_interval: Seconds between sensor executions (default: 5.0)
+            polling_interval: Seconds between sensor executions (default: 5.0);
+                the starting interval when adaptive polling is enabled
 
         Raises:
             RuntimeError: If agent is already running
@@ -447,12 +1086,60 @@ class ContextAgent:
             logger.error(f"Failed to initialize state: {e}")
             raise
 
+        self._polling_interval = polling_interval
+        max_interval = max(self._max_polling_interval, polling_interval)
+        if self._watch_workspace:
+            # File changes wake the poller; polls are only a safety net
+            max_interval = max(max_interval, self._watch_polling_interval)
+            self._watcher = create_watcher(
+                watch_targets(self._sensor.cwd), self._on_workspace_change
+            )
+            self._watcher.start()
+            logger.info(f"Watching workspace changes ({self._watcher.backend})")
+
+        if self._adaptive_polling:
+            self._adaptive_interval = AdaptiveInterval(
+                minimum=min(self._min_polling_interval, polling_interval),
+                maximum=max_interval,
+                initial=polling_interval,
+                threshold=self._context_threshold
+            )
+
+        # The grid of fixed-rate polls is anchored at the initial run
+        self._poll_timer = PollTimer(
+            fixed_rate=self._fixed_rate_polling,
+            policy=self._missed_poll_policy,
+            jitter=self._poll_jitter
+        )
+
+        # Phase of this workspace within the interval
+        first_delay: Optional[float] = None
+        if self._poll_phase_spread:
+            first_delay = poll_phase(self._pool_key, polling_interval)
+            self._poll_timer.defer(first_delay)
+
+        self._last_read = time.monotonic()
+        self._suspended = False
+
         self._polling = True
         self._stop_event.clear()
+        self._wake_event.clear()
+
+        if self._scheduler is not None:
+            self._scheduled_poll = self._scheduler.schedule(
+                lambda: self._run_scheduled_poll(polling_interval),
+                delay=(
+                    first_delay if first_delay is not None
+                    else self._next_poll_delay(polling_interval)
+                ),
+                name=f"ContextAgent({self._pool_key})"
+            )
+            logger.info("Agent started successfully (shared scheduler)")
+            return
 
         self._poll_thread = threading.Thread(
             target=self._poll_loop,
-            args=(polling_interval,),
+            args=(polling_interval, first_delay or 0.0),
             daemon=False,
             name="ContextAgent-Poller"
         )
@@ -475,11 +1162,22 @@ class ContextAgent:
 
         self._polling = False
         self._stop_event.set()
+        self._wake_event.set()
+
+        watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            watcher.stop()
+
+        # Waits for a poll in progress on the scheduler
+        scheduled, self._scheduled_poll = self._scheduled_poll, None
+        if scheduled is not None:
+            scheduled.cancel()
+            logger.info("Agent stopped successfully")
 
         # Wait for poll thread to finish
         if self._poll_thread and self._poll_thread.is_alive():
             # Wait for sensor timeout + buffer
-            timeout = self._sensor_timeout + 2
+            timeout = self.sensor_timeout + 2
             self._poll_thread.join(timeout=timeout)
 
             if self._poll_thread.is_alive():
@@ -489,7 +1187,7 @@ class ContextAgent:
             else:
                 logger.info("Agent stopped successfully")
 
-    def _poll_loop(self, interval: float) -> None:
+    def _poll_loop(self, interval: float, first_delay: float = 0.0) -> None:
         """
         Internal polling loop
 
@@ -497,35 +1195,237 @@ class ContextAgent:
 
         Args:
             interval: Polling interval in seconds
+            first_delay: Seconds to wait before the first poll (phase offset)
         """
         logger.debug(f"Poll loop started with interval: {interval}s")
 
+        if first_delay > 0:
+            self._wake_event.wait(timeout=first_delay)
+            self._wake_event.clear()
+
         while self._polling and not self._stop_event.is_set():
-            try:
-                # Execute sensor and update state
-                # This will automatically emit events via get_state
-                self.get_state(force_refresh=True)
+            if self._suspend_if_idle():
+                # Until a read, subscription, workspace change or stop
+                self._wake_event.wait()
+                self._wake_event.clear()
+                continue
 
-            except SensorError as e:
-                logger.error(f"Sensor execution failed in poll loop: {e}")
-            except Exception as e:
-                logger.error(f"Unexpected error in poll loop: {e}")
+            self._poll_once()
 
-            # Wait for next poll (or until stop signal)
-            self._stop_event.wait(timeout=interval)
+            # Wait for next poll (or until woken by a change or stop)
+            self._wake_event.wait(timeout=self._next_poll_delay(interval))
+            self._wake_event.clear()
 
         logger.debug("Poll loop exited")
 
+    def _run_scheduled_poll(self, interval: float) -> Optional[float]:
+        """
+        Shared scheduler callback: one poll iteration
+
+        Args:
+            interval: Polling interval in seconds
+
+        Returns:
+            Seconds until the next poll, or None once stopped
+        """
+        if not self._polling:
+            return None
+        if self._suspend_if_idle():
+            # Resumed early through wake()
+            return SUSPENDED_RECHECK
+        self._poll_once()
+        return self._next_poll_delay(interval)
+
+    @property
+    def is_suspended(self) -> bool:
+        """Whether background polling is suspended for lack of readers"""
+        return self._suspended
+
+    def _is_idle(self) -> bool:
+        """No reads within idle_timeout and no event handlers"""
+        if self._idle_timeout <= 0:
+            return False
+        if self._event_emitter is not None and self._event_emitter.handler_count() > 0:
+            return False
+        return time.monotonic() - self._last_read >= self._idle_timeout
+
+    def _suspend_if_idle(self) -> bool:
+        """
+        Enter (or stay in) idle suspension
+
+        Returns:
+            True if the poll should be skipped
+        """
+        if not self._is_idle():
+            return False
+
+        if not self._suspended:
+            self._suspended = True
+            # A read between the check and the flag did not see it set
+            if not self._is_idle():
+                self._suspended = False
+                return False
+            self._suspensions += 1
+            logger.info(
+                f"No state readers or subscribers for {self._idle_timeout}s, "
+                f"suspending polling"
+            )
+        return True
+
+    def _touch(self) -> None:
+        """Record a state read or subscription; resumes suspended polling"""
+        if getattr(self._poll_context, "active", False):
+            return
+
+        self._last_read = time.monotonic()
+        if not self._suspended:
+            return
+
+        self._suspended = False
+        logger.info("State read, resuming polling")
+        if self._poll_timer is not None:
+            # Restart the fixed-rate grid instead of catching up on the pause
+            self._poll_timer.defer(0.0)
+        self._wake_event.set()
+        scheduled = self._scheduled_poll
+        if scheduled is not None:
+            scheduled.wake()
+
+    def _poll_once(self) -> None:
+        """Run one poll iteration (skipped while the circuit breaker is open)"""
+        if self._breaker is not None and not self._breaker.allow():
+            logger.debug("Sensor circuit open, skipping poll")
+            return
+
+        if self._poll_timer is not None:
+            self._poll_timer.poll_started()
+
+        try:
+            # Execute sensor and update state
+            # This will automatically emit events via get_state
+            previous = self._current_state
+            self._poll_context.active = True
+            try:
+                state = self.get_state(force_refresh=True)
+            finally:
+                self._poll_context.active = False
+
+            if self._adaptive_interval is not None:
+                self._adaptive_interval.observe(
+                    changed=bool(state.get_changes(previous)),
+                    usage_pct=state.context_window.usage_pct
+                )
+
+        except SensorError as e:
+            logger.error(f"Sensor execution failed in poll loop: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error in poll loop: {e}")
+
+    def _next_poll_delay(self, interval: float) -> float:
+        """
+        Seconds to wait before the next poll
+
+        Args:
+            interval: Configured polling interval
+
+        Returns:
+            The interval (the adaptive interval when enabled, stretched
+            under host pressure), the time to the next grid tick with
+            fixed-rate polling, or the remaining backoff while the circuit
+            is open
+        """
+        if self._adaptive_interval is not None:
+            interval = self._adaptive_interval.value
+        elif self._watcher is not None:
+            interval = max(interval, self._watch_polling_interval)
+
+        if self._pressure is not None and not self._near_threshold():
+            # Yield to real work; threshold crossings are still caught promptly
+            interval *= self._pressure.stretch()
+
+        timer = self._poll_timer
+        delay = timer.next_delay(interval) if timer is not None else interval
+
+        if self._breaker is not None:
+            remaining = self._breaker.remaining()
+            if remaining > delay:
+                # Backoff restarts the grid; missed ticks are not caught up
+                delay = remaining
+                if timer is not None:
+                    timer.defer(remaining)
+        return delay
+
+    def _near_threshold(self) -> bool:
+        """Context usage is within THRESHOLD_MARGIN below the threshold"""
+        state = self._current_state
+        if state is None:
+            return False
+        usage_pct = state.context_window.usage_pct
+        return self._context_threshold - THRESHOLD_MARGIN <= usage_pct < self._context_threshold
+
+    def _on_workspace_change(self, groups: Set[str]) -> None:
+        """
+        Change watcher callback: refresh the changed groups right away
+
+        Args:
+            groups: Changed state groups ("git", "workspace")
+        """
+        logger.debug(f"Workspace change detected: {sorted(groups)}")
+
+        # Per-field sensors only re-collect the groups that changed
+        invalidate = getattr(self._sensor, "invalidate", None)
+        if callable(invalidate):
+            for group in groups:
+                invalidate(group)
+
+        if self._adaptive_interval is not None:
+            self._adaptive_interval.reset()
+        self._wake_event.set()
+
+        scheduled = self._scheduled_poll
+        if scheduled is not None:
+            scheduled.wake()
+
+    def _on_breaker_transition(
+        self,
+        old_state: BreakerState,
+        new_state: BreakerState,
+        info: Dict[str, Any]
+    ) -> None:
+        """Log circuit breaker transitions and emit them as events"""
+        if new_state is BreakerState.OPEN:
+            logger.warning(
+                f"Sensor failed {info['consecutive_failures']} times in a row, "
+                f"backing off for {info['retry_in']:.1f}s"
+            )
+        else:
+            logger.info(f"Sensor circuit {old_state.value} -> {new_state.value}")
+
+        if not self._enable_events or not self._event_emitter:
+            return
+
+        self._event_emitter.emit(StateChangeEvent(
+            event_type=EventType.SENSOR_CIRCUIT_CHANGED,
+            timestamp=datetime.utcnow().isoformat(),
+            old_value=old_state.value,
+            new_value=new_state.value,
+            metadata=info
+        ))
+
     def is_running(self) -> bool:
         """
         Check if agent is currently polling
 
         Returns:
-            True if polling thread is active
+            True if the polling thread is alive, or the poll is scheduled
+            on a PollScheduler
         """
-        return self._polling and (
-            self._poll_thread is not None and self._poll_thread.is_alive()
-        )
+        if not self._polling:
+            return False
+        scheduled = self._scheduled_poll
+        if scheduled is not None:
+            return not scheduled.cancelled
+        return self._poll_thread is not None and self._poll_thread.is_alive()
 
     def __enter__(self):
         """Context manager entry"""
@@ -533,9 +1433,20 @@ class ContextAgent:
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit - ensures cleanup"""
-        self.stop()
+        self.close()
         return False
 
+    def close(self) -> None:
+        """
+        Stop polling and release sensor resources
+
+        Terminates long-lived sensor processes (coprocess backend).
+        """
+        self.stop()
+        self._sensor.close()
+        if self._spawner is not None:
+            self._spawner.close()
+
     # ========================================================================
     # Public API Methods (Issue #4)
     # ========================================================================
@@ -605,6 +1516,7 @@ class ContextAgent:
             - Call start() to initialize and begin monitoring
             - State is updated automatically during polling
         """
+        self._touch()
         with self._state_lock:
             if self._current_state is None:
                 raise RuntimeError(
@@ -661,6 +1573,7 @@ class ContextAgent:
             The display string is cached from the last sensor execution. It
             reflects the state at the time of the last update.
         """
+        self._touch()
         with self._state_lock:
             if self._current_state is None:
                 raise RuntimeError(
@@ -7,7 +7,9 @@ This module extends the base ContextAgent with optional ZeroDB persistence.
 import logging
 import asyncio
 import threading
-from typing import Optional, Dict, Any, List
+import concurrent.futures
+from collections import deque
+from typing import Optional, Dict, Any, List, Deque
 from pathlib import Path
 
 from .agent import ContextAgent, SensorError
@@ -15,11 +17,19 @@ from .state import AgentState
 from .events import EventType, StateChangeEvent
 from .config import AgentConfig
 from .zerodb_integration import ZeroDBPersistence
+from .scheduler import shared_scheduler, shared_event_loop
 
 
 logger = logging.getLogger(__name__)
 
 
+# Event logs kept while writes are deferred under host pressure (oldest dropped)
+MAX_DEFERRED_EVENTS = 1000
+
+# Seconds shutdown waits for deferred writes to complete
+DEFERRED_FLUSH_TIMEOUT = 5.0
+
+
 class ContextAgentWithZeroDB(ContextAgent):
     """
     Context Agent with ZeroDB persistence support.
@@ -34,7 +44,9 @@ class ContextAgentWithZeroDB(ContextAgent):
         sensor_timeout: float = 5.0,
         context_threshold: int = 80,
         enable_events: bool = True,
-        config: Optional[AgentConfig] = None
+        config: Optional[AgentConfig] = None,
+        sensor_backend: Optional[str] = None,
+        min_refresh_interval: Optional[float] = None
     ):
         """
         Initialize ContextAgent with ZeroDB support.
@@ -45,23 +57,67 @@ class ContextAgentWithZeroDB(ContextAgent):
             context_threshold: Context usage alert threshold
             enable_events: Enable event emission
             config: Optional AgentConfig (enables ZeroDB if configured)
+            sensor_backend: Sensor backend (defaults to config.sensor_backend)
+            min_refresh_interval: Default state max_age in seconds
+                (defaults to config.min_refresh_interval)
         """
+        # Store config
+        self._config = config or AgentConfig()
+
         # Initialize base agent
         super().__init__(
             sensor_path=sensor_path,
             sensor_timeout=sensor_timeout,
             context_threshold=context_threshold,
-            enable_events=enable_events
+            enable_events=enable_events,
+            sensor_backend=sensor_backend or self._config.sensor_backend,
+            min_refresh_interval=(
+                min_refresh_interval
+                if min_refresh_interval is not None
+                else self._config.min_refresh_interval
+            ),
+            result_cache_size=self._config.result_cache_size,
+            adaptive_timeout=self._config.adaptive_timeout,
+            min_sensor_timeout=self._config.min_sensor_timeout,
+            adaptive_timeout_factor=self._config.adaptive_timeout_factor,
+            breaker_failure_threshold=self._config.breaker_failure_threshold,
+            breaker_base_delay=self._config.breaker_base_delay,
+            breaker_max_delay=self._config.breaker_max_delay,
+            use_spawner=self._config.use_spawner,
+            record_path=self._config.sensor_record_path,
+            sensor_nice=self._config.sensor_nice,
+            sensor_io_class=self._config.sensor_io_class,
+            sensor_cpu_quota=self._config.sensor_cpu_quota,
+            adaptive_polling=self._config.adaptive_polling,
+            min_polling_interval=self._config.min_polling_interval,
+            max_polling_interval=self._config.max_polling_interval,
+            watch_workspace=self._config.watch_workspace,
+            watch_polling_interval=self._config.watch_polling_interval,
+            scheduler=shared_scheduler() if self._config.shared_scheduler else None,
+            fixed_rate_polling=self._config.fixed_rate_polling,
+            missed_poll_policy=self._config.missed_poll_policy,
+            idle_timeout=self._config.idle_timeout,
+            poll_phase_spread=self._config.poll_phase_spread,
+            poll_jitter=self._config.poll_jitter,
+            sensor_lock_path=self._config.sensor_lock_path,
+            sensor_lock_slots=self._config.sensor_lock_slots,
+            pressure_throttling=self._config.pressure_throttling,
+            pressure_cpu_limit=self._config.pressure_cpu_limit,
+            pressure_io_limit=self._config.pressure_io_limit,
+            pressure_max_stretch=self._config.pressure_max_stretch
         )
 
-        # Store config
-        self._config = config or AgentConfig()
-
         # ZeroDB integration
         self._zerodb_persistence: Optional[ZeroDBPersistence] = None
         self._zerodb_loop: Optional[asyncio.AbstractEventLoop] = None
         self._zerodb_thread: Optional[threading.Thread] = None
         self._zerodb_ready = threading.Event()
+        # The process-wide loop is used (and never stopped) with shared_scheduler
+        self._zerodb_shared_loop = self._config.shared_scheduler
+        self._last_persisted_state: Optional[AgentState] = None
+        # Writes held back while the host is under pressure
+        self._deferred_events: Deque[StateChangeEvent] = deque(maxlen=MAX_DEFERRED_EVENTS)
+        self._state_deferred = False
 
         # Initialize ZeroDB if enabled
         if self._config.enable_zerodb:
@@ -81,16 +137,29 @@ class ContextAgentWithZeroDB(ContextAgent):
                 enabled=self._config.enable_zerodb
             )
 
-            # Start async event loop in background thread
-            self._zerodb_thread = threading.Thread(
-                target=self._run_zerodb_loop,
-                daemon=True,
-                name="ZeroDBWorker"
-            )
-            self._zerodb_thread.start()
+            if self._zerodb_shared_loop:
+                # Initialize on the process-wide event loop
+                self._zerodb_loop = shared_event_loop()
+                future = asyncio.run_coroutine_threadsafe(
+                    self._zerodb_persistence.initialize(),
+                    self._zerodb_loop
+                )
+                try:
+                    future.result(timeout=5.0)
+                except Exception as e:
+                    logger.error(f"ZeroDB initialization error: {e}")
+                self._zerodb_ready.set()
+            else:
+                # Start async event loop in background thread
+                self._zerodb_thread = threading.Thread(
+                    target=self._run_zerodb_loop,
+                    daemon=True,
+                    name="ZeroDBWorker"
+                )
+                self._zerodb_thread.start()
 
-            # Wait for initialization
-            self._zerodb_ready.wait(timeout=5.0)
+                # Wait for initialization
+                self._zerodb_ready.wait(timeout=5.0)
 
             if self._zerodb_persistence.is_available():
                 logger.info("ZeroDB persistence initialized successfully")
@@ -138,6 +207,10 @@ class ContextAgentWithZeroDB(ContextAgent):
         # Log all state change events to ZeroDB
         def log_to_zerodb(event: StateChangeEvent):
             if self._zerodb_loop and self._zerodb_persistence.is_available():
+                if self.under_pressure:
+                    self._deferred_events.append(event)
+                    return
+                self._flush_deferred()
                 # Schedule async task in ZeroDB event loop
                 asyncio.run_coroutine_threadsafe(
                     self._zerodb_persistence.log_event(event),
@@ -152,7 +225,8 @@ class ContextAgentWithZeroDB(ContextAgent):
         self,
         input_data: Optional[Dict[str, Any]] = None,
         force_refresh: bool = True,
-        persist: bool = True
+        persist: bool = True,
+        max_age: Optional[float] = None
     ) -> AgentState:
         """
         Get current agent state with optional ZeroDB persistence.
@@ -161,24 +235,67 @@ class ContextAgentWithZeroDB(ContextAgent):
             input_data: Optional input data for sensor
             force_refresh: Force sensor execution
             persist: Persist state to ZeroDB (default: True)
+            max_age: Maximum acceptable state age in seconds (see ContextAgent.get_state)
 
         Returns:
             Current AgentState
         """
         # Get state from base implementation
-        state = super().get_state(input_data, force_refresh)
-
-        # Persist to ZeroDB if enabled
-        if persist and self._zerodb_persistence and self._zerodb_loop:
-            if self._zerodb_persistence.is_available():
-                # Schedule async persistence task
-                asyncio.run_coroutine_threadsafe(
-                    self._zerodb_persistence.store_state(state),
-                    self._zerodb_loop
-                )
+        state = super().get_state(input_data, force_refresh, max_age=max_age)
+
+        if not self._zerodb_persistence or not self._zerodb_loop:
+            return state
+        if not self._zerodb_persistence.is_available():
+            return state
+
+        under_pressure = self.under_pressure
+        if not under_pressure:
+            self._flush_deferred()
+
+        # Persist to ZeroDB if enabled (a cached state is only stored once)
+        if persist and state is not self._last_persisted_state:
+            if under_pressure:
+                # Only the latest state is stored once pressure clears
+                self._state_deferred = True
+                return state
+            self._state_deferred = False
+            self._last_persisted_state = state
+            # Schedule async persistence task
+            asyncio.run_coroutine_threadsafe(
+                self._zerodb_persistence.store_state(state),
+                self._zerodb_loop
+            )
 
         return state
 
+    def _flush_deferred(self) -> List[concurrent.futures.Future]:
+        """
+        Submit writes deferred under host pressure (oldest first)
+
+        Returns:
+            Futures of the submitted writes
+        """
+        futures = []
+        while self._deferred_events:
+            try:
+                event = self._deferred_events.popleft()
+            except IndexError:
+                break
+            futures.append(asyncio.run_coroutine_threadsafe(
+                self._zerodb_persistence.log_event(event),
+                self._zerodb_loop
+            ))
+
+        state = self._current_state
+        if self._state_deferred and state is not None:
+            self._state_deferred = False
+            self._last_persisted_state = state
+            futures.append(asyncio.run_coroutine_threadsafe(
+                self._zerodb_persistence.store_state(state),
+                self._zerodb_loop
+            ))
+        return futures
+
     async def get_state_history(
         self,
         limit: int = 100,
@@ -259,12 +376,40 @@ class ContextAgentWithZeroDB(ContextAgent):
                 "reason": "ZeroDB not configured"
             }
 
-        return self._zerodb_persistence.get_status()
+        status = self._zerodb_persistence.get_status()
+        status["deferred_events"] = len(self._deferred_events)
+        status["state_deferred"] = self._state_deferred
+        return status
 
     def shutdown(self) -> None:
         """Shutdown agent and cleanup ZeroDB resources."""
         logger.info("Shutting down ContextAgent with ZeroDB...")
 
+        # Stop polling and release the sensor
+        self.close()
+
+        # Deferred writes and the client close complete before the loop stops
+        if self._zerodb_persistence and self._zerodb_loop and self._zerodb_loop.is_running():
+            futures = []
+            if self._zerodb_persistence.is_available():
+                futures = self._flush_deferred()
+            if futures:
+                _, pending = concurrent.futures.wait(futures, timeout=DEFERRED_FLUSH_TIMEOUT)
+                if pending:
+                    logger.warning(f"{len(pending)} deferred ZeroDB writes did not complete")
+
+            closing = asyncio.run_coroutine_threadsafe(
+                self._zerodb_persistence.close(),
+                self._zerodb_loop
+            )
+            if not self._zerodb_shared_loop:
+                concurrent.futures.wait([closing], timeout=DEFERRED_FLUSH_TIMEOUT)
+
+        # The shared event loop keeps serving other agents
+        if self._zerodb_shared_loop:
+            logger.info("ContextAgent shutdown complete")
+            return
+
         # Stop ZeroDB event loop
         if self._zerodb_loop and self._zerodb_loop.is_running():
             self._zerodb_loop.call_soon_threadsafe(self._zerodb_loop.stop)
@@ -273,13 +418,6 @@ class ContextAgentWithZeroDB(ContextAgent):
         if self._zerodb_thread and self._zerodb_thread.is_alive():
             self._zerodb_thread.join(timeout=5.0)
 
-        # Close ZeroDB client
-        if self._zerodb_persistence and self._zerodb_loop:
-            asyncio.run_coroutine_threadsafe(
-                self._zerodb_persistence.close(),
-                self._zerodb_loop
-            )
-
         logger.info("ContextAgent shutdown complete")
 
     def __enter__(self):
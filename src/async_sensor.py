@@ -0,0 +1,207 @@
+"""
+Asyncio Sensor Runner
+
+Runs the sensor script with ``asyncio.create_subprocess_exec`` so that a
+single event loop can drive many concurrent sensor executions without a
+thread per poll. Execution errors and parsing match ContextAgent's
+subprocess backend exactly (same SensorError messages, same AgentState).
+"""
+
+import asyncio
+import json
+import logging
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple, List, Iterable
+
+from .agent import default_sensor_path, parse_sensor_output
+from .sensors import SensorError
+from .state import AgentState
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSensorRunner:
+    """
+    Asyncio-native sensor execution
+
+    Each execution is one child process awaited on the running event loop.
+    Timeouts and cancellation kill the child process before returning.
+
+    Example:
+        >>> runner = AsyncSensorRunner()
+        >>> state = asyncio.run(runner.get_state({"model": "Claude"}))
+    """
+
+    def __init__(
+        self,
+        sensor_path: Optional[str] = None,
+        sensor_timeout: float = 5.0,
+        cwd: Optional[str] = None,
+        max_concurrency: Optional[int] = None
+    ):
+        """
+        Initialize AsyncSensorRunner
+
+        Args:
+            sensor_path: Path to sensor script (defaults to scripts/context_sensor.sh)
+            sensor_timeout: Timeout for sensor execution in seconds
+            cwd: Working directory (defaults to the script's directory)
+            max_concurrency: Maximum concurrent sensor processes (default: unbounded)
+        """
+        self._path = Path(sensor_path) if sensor_path is not None else default_sensor_path()
+
+        if not self._path.exists():
+            raise FileNotFoundError(f"Sensor script not found: {self._path}")
+
+        if not self._path.is_file():
+            raise ValueError(f"Sensor path is not a file: {self._path}")
+
+        self._cwd = Path(cwd) if cwd is not None else self._path.parent
+        self._sensor_timeout = sensor_timeout
+        self._max_concurrency = max_concurrency
+
+        # Created lazily: a semaphore binds to the loop it is first used on
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def path(self) -> Path:
+        """Path to the sensor script"""
+        return self._path
+
+    @property
+    def cwd(self) -> Path:
+        return self._cwd
+
+    async def execute(
+        self,
+        input_data: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> Tuple[str, str]:
+        """
+        Execute the sensor once
+
+        Args:
+            input_data: Optional JSON data to pass to sensor via STDIN
+            timeout: Timeout in seconds (defaults to sensor_timeout)
+
+        Returns:
+            Tuple of (stdout, stderr) as strings
+
+        Raises:
+            SensorError: If sensor execution fails or times out
+            asyncio.CancelledError: If cancelled (the child process is killed)
+        """
+        if timeout is None:
+            timeout = self._sensor_timeout
+
+        if self._max_concurrency is None:
+            return await self._run(input_data, timeout)
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async with self._semaphore:
+            return await self._run(input_data, timeout)
+
+    async def get_state(self, input_data: Optional[Dict[str, Any]] = None) -> AgentState:
+        """
+        Execute the sensor and parse its output
+
+        Args:
+            input_data: Optional input data to pass to sensor
+
+        Returns:
+            Parsed AgentState
+
+        Raises:
+            SensorError: If sensor execution fails or times out
+        """
+        stdout, stderr = await self.execute(input_data)
+        return parse_sensor_output(stdout, stderr)
+
+    async def get_states(
+        self,
+        inputs: Iterable[Optional[Dict[str, Any]]]
+    ) -> List[AgentState]:
+        """
+        Execute the sensor concurrently for several inputs
+
+        Args:
+            inputs: Input data for each execution
+
+        Returns:
+            AgentStates in input order
+
+        Raises:
+            SensorError: The first failure (remaining executions are cancelled)
+        """
+        tasks = [asyncio.ensure_future(self.get_state(input_data)) for input_data in inputs]
+
+        try:
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def _run(
+        self,
+        input_data: Optional[Dict[str, Any]],
+        timeout: Optional[float]
+    ) -> Tuple[str, str]:
+        """Spawn one sensor process and collect its output"""
+        stdin_input = json.dumps(input_data or {}).encode("utf-8")
+
+        logger.debug(f"Executing sensor (async): {self._path}")
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                str(self._path),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=str(self._cwd)
+            )
+        except FileNotFoundError as e:
+            raise SensorError(f"Sensor script not found: {e}")
+        except PermissionError as e:
+            raise SensorError(f"Permission denied executing sensor: {e}")
+        except OSError as e:
+            raise SensorError(f"Unexpected error executing sensor: {e}")
+
+        try:
+            stdout_bytes, stderr_bytes = await asyncio.wait_for(
+                process.communicate(stdin_input),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            await self._kill(process)
+            raise SensorError(f"Sensor execution timed out after {timeout}s")
+        except BaseException:
+            # Cancellation: never leave the child process running
+            await asyncio.shield(self._kill(process))
+            raise
+
+        stdout = stdout_bytes.decode("utf-8", "replace")
+        stderr = stderr_bytes.decode("utf-8", "replace")
+
+        if process.returncode != 0:
+            logger.warning(f"Sensor exited with non-zero code: {process.returncode}")
+            logger.warning(f"Sensor stderr: {stderr}")
+            raise SensorError(
+                f"Sensor failed with exit code {process.returncode}: {stderr}"
+            )
+
+        return stdout.strip(), stderr.strip()
+
+    @staticmethod
+    async def _kill(process: asyncio.subprocess.Process) -> None:
+        """Kill a sensor process and reap it"""
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+        await process.wait()
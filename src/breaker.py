@@ -0,0 +1,174 @@
+"""
+Sensor Circuit Breaker
+
+Stops the poll loop from running a sensor that keeps failing. After
+``failure_threshold`` consecutive failures the circuit opens and polls
+are skipped for an exponentially growing, jittered delay. When the delay
+expires a single half-open probe runs: success closes the circuit, a
+failure re-opens it with the next backoff step. Other callers are turned
+away until the probe's outcome is recorded.
+"""
+
+import random
+import threading
+import time
+from enum import Enum
+from typing import Optional, Callable, Dict, Any
+
+
+class BreakerState(Enum):
+    """Circuit breaker states"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+# on_transition(old_state, new_state, info)
+TransitionCallback = Callable[[BreakerState, BreakerState, Dict[str, Any]], None]
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with exponential backoff
+
+    Thread-safe. Transition callbacks run outside the breaker lock.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        base_delay: float = 10.0,
+        max_delay: float = 300.0,
+        multiplier: float = 2.0,
+        jitter: float = 0.2,
+        on_transition: Optional[TransitionCallback] = None,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Callable[[], float] = random.random
+    ):
+        """
+        Initialize CircuitBreaker
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            base_delay: First open delay in seconds
+            max_delay: Upper bound for the open delay in seconds
+            multiplier: Backoff growth per consecutive open
+            jitter: Relative random spread applied to each delay (0.2 = ±20%)
+            on_transition: Called with (old_state, new_state, info) on changes
+            clock: Monotonic clock (injectable for tests)
+            rng: Random source returning [0, 1) (injectable for tests)
+        """
+        if failure_threshold < 1:
+            raise ValueError(f"failure_threshold must be >= 1, got {failure_threshold}")
+
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self._on_transition = on_transition
+        self._clock = clock
+        self._rng = rng
+
+        self._lock = threading.Lock()
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+        self._opens = 0
+        self._open_until = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> BreakerState:
+        with self._lock:
+            return self._state
+
+    @property
+    def consecutive_failures(self) -> int:
+        with self._lock:
+            return self._failures
+
+    def allow(self) -> bool:
+        """
+        Whether a sensor run may proceed now
+
+        Moves an open circuit whose delay has expired to half-open, which
+        admits one probe; further callers are refused until the probe is
+        resolved by record_success() or record_failure().
+        """
+        with self._lock:
+            if self._state is BreakerState.CLOSED:
+                return True
+            if self._state is BreakerState.HALF_OPEN:
+                if self._probe_in_flight:
+                    return False
+                self._probe_in_flight = True
+                return True
+            if self._clock() < self._open_until:
+                return False
+            self._probe_in_flight = True
+            transition = self._transition(BreakerState.HALF_OPEN)
+
+        self._notify(transition)
+        return True
+
+    def remaining(self) -> float:
+        """Seconds until an open circuit admits a probe (0 otherwise)"""
+        with self._lock:
+            if self._state is not BreakerState.OPEN:
+                return 0.0
+            return max(self._open_until - self._clock(), 0.0)
+
+    def record_success(self) -> None:
+        """Record a successful sensor run (closes the circuit)"""
+        with self._lock:
+            self._failures = 0
+            self._opens = 0
+            self._probe_in_flight = False
+            if self._state is BreakerState.CLOSED:
+                return
+            transition = self._transition(BreakerState.CLOSED)
+
+        self._notify(transition)
+
+    def record_failure(self) -> None:
+        """Record a failed sensor run"""
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+
+            if self._state is BreakerState.OPEN:
+                return
+            if self._state is BreakerState.CLOSED and self._failures < self.failure_threshold:
+                return
+
+            delay = min(self.base_delay * self.multiplier ** self._opens, self.max_delay)
+            delay *= 1 + self.jitter * (2 * self._rng() - 1)
+            self._opens += 1
+            self._open_until = self._clock() + delay
+            transition = self._transition(BreakerState.OPEN, retry_in=delay)
+
+        self._notify(transition)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get breaker status
+
+        Returns:
+            Dictionary with state, consecutive_failures and retry_in seconds
+        """
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_in": self.remaining(),
+        }
+
+    def _transition(self, new_state: BreakerState, **info: Any) -> tuple:
+        """Change state (lock held); returns the pending notification"""
+        old_state = self._state
+        self._state = new_state
+        info["consecutive_failures"] = self._failures
+        return old_state, new_state, info
+
+    def _notify(self, transition: tuple) -> None:
+        if self._on_transition is not None:
+            self._on_transition(*transition)
@@ -0,0 +1,171 @@
+"""
+Sensor Result Cache
+
+Bounded LRU cache of raw sensor output. Entries are keyed on a digest of
+the sensor input plus cheap ``stat()`` fingerprints of everything the
+bundled sensor reads (workspace directory, git HEAD and refs, the sensor
+executable), so a poll whose inputs did not change skips the sensor.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple, Iterable
+
+from .sensors import find_git_dir
+
+
+# (st_ino, st_mtime_ns, st_size) of a path, or None if it does not exist
+StatFingerprint = Optional[Tuple[int, int, int]]
+
+
+def stat_fingerprint(path: Path) -> StatFingerprint:
+    """
+    Fingerprint a path with a single stat() call
+
+    Args:
+        path: Path to fingerprint
+
+    Returns:
+        Tuple of (inode, mtime in ns, size), or None if the path is missing
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def sensor_fingerprint(
+    cwd: Path,
+    workspace_path: Optional[str] = None,
+    extra_paths: Iterable[Path] = ()
+) -> Tuple[Any, ...]:
+    """
+    Fingerprint the filesystem state a sensor run depends on
+
+    Covers the workspace directory, the git directory found from ``cwd``
+    (``HEAD``, ``packed-refs`` and the checked-out branch ref) and any
+    extra paths such as the sensor executable.
+
+    Args:
+        cwd: Directory the sensor runs in
+        workspace_path: Workspace path from the sensor input (defaults to cwd)
+        extra_paths: Additional paths whose changes invalidate results
+
+    Returns:
+        Hashable fingerprint tuple
+    """
+    workspace = Path(workspace_path) if workspace_path else Path(cwd)
+    git_dir = find_git_dir(cwd)
+
+    parts = [str(workspace), stat_fingerprint(workspace)]
+
+    if git_dir is None:
+        parts.append(None)
+    else:
+        head = git_dir / "HEAD"
+        parts.extend([str(git_dir), stat_fingerprint(head), stat_fingerprint(git_dir / "packed-refs")])
+        try:
+            ref = head.read_text().strip()
+        except OSError:
+            ref = ""
+        if ref.startswith("ref: "):
+            parts.append(stat_fingerprint(git_dir / ref[len("ref: "):]))
+
+    for path in extra_paths:
+        parts.append(stat_fingerprint(path))
+
+    return tuple(parts)
+
+
+def input_digest(input_key: str) -> str:
+    """Short digest of a canonical sensor input key"""
+    return hashlib.blake2b(input_key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SensorResultCache:
+    """
+    Thread-safe LRU cache of (stdout, stderr) sensor results
+
+    Keys are opaque hashables (see ContextAgent._result_cache_key). The
+    least recently used entry is evicted once max_entries is exceeded.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        """
+        Initialize SensorResultCache
+
+        Args:
+            max_entries: Maximum number of cached results (must be > 0)
+        """
+        if max_entries <= 0:
+            raise ValueError(f"max_entries must be > 0, got {max_entries}")
+
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Any, Tuple[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def max_entries(self) -> int:
+        return self._max_entries
+
+    def get(self, key: Any) -> Optional[Tuple[str, str]]:
+        """
+        Look up a cached result and mark it as recently used
+
+        Returns:
+            Cached (stdout, stderr), or None on a miss
+        """
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return result
+
+    def put(self, key: Any, result: Tuple[str, str]) -> None:
+        """Store a result, evicting the least recently used entry if full"""
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Drop all cached results (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with size, max_entries, hits, misses, evictions and hit_rate
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self._max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
@@ -45,6 +45,37 @@ class AgentConfig:
     polling_interval: float = 5.0
     context_threshold: int = 80
     sensor_timeout: float = 5.0
+    sensor_backend: str = "subprocess"  # or "framed", "native", "coprocess", "registry"
+    min_refresh_interval: float = 0.0
+    result_cache_size: int = 0
+    adaptive_timeout: bool = False
+    min_sensor_timeout: float = 0.5
+    adaptive_timeout_factor: float = 3.0
+    breaker_failure_threshold: int = 3
+    breaker_base_delay: float = 10.0
+    breaker_max_delay: float = 300.0
+    use_spawner: bool = False
+    sensor_record_path: Optional[str] = None
+    sensor_nice: int = 0
+    sensor_io_class: str = "none"  # or "best-effort", "idle"
+    sensor_cpu_quota: float = 0.0
+    adaptive_polling: bool = False
+    min_polling_interval: float = 1.0
+    max_polling_interval: float = 60.0
+    watch_workspace: bool = False
+    watch_polling_interval: float = 300.0
+    shared_scheduler: bool = False
+    fixed_rate_polling: bool = False
+    missed_poll_policy: str = "skip"  # or "catch_up", "coalesce"
+    idle_timeout: float = 0.0
+    poll_phase_spread: bool = False
+    poll_jitter: float = 0.0
+    sensor_lock_path: Optional[str] = None
+    sensor_lock_slots: int = 1
+    pressure_throttling: bool = False
+    pressure_cpu_limit: float = 40.0
+    pressure_io_limit: float = 40.0
+    pressure_max_stretch: float = 4.0
     enable_zerodb: bool = False
 
     # ZeroDB Settings (optional)
@@ -78,6 +109,37 @@ class AgentConfig:
             "CONTEXT_AGENT_POLLING_INTERVAL": ("polling_interval", float),
             "CONTEXT_AGENT_CONTEXT_THRESHOLD": ("context_threshold", int),
             "CONTEXT_AGENT_SENSOR_TIMEOUT": ("sensor_timeout", float),
+            "CONTEXT_AGENT_SENSOR_BACKEND": ("sensor_backend", str),
+            "CONTEXT_AGENT_MIN_REFRESH_INTERVAL": ("min_refresh_interval", float),
+            "CONTEXT_AGENT_RESULT_CACHE_SIZE": ("result_cache_size", int),
+            "CONTEXT_AGENT_ADAPTIVE_TIMEOUT": ("adaptive_timeout", cls._parse_bool),
+            "CONTEXT_AGENT_MIN_SENSOR_TIMEOUT": ("min_sensor_timeout", float),
+            "CONTEXT_AGENT_ADAPTIVE_TIMEOUT_FACTOR": ("adaptive_timeout_factor", float),
+            "CONTEXT_AGENT_BREAKER_FAILURE_THRESHOLD": ("breaker_failure_threshold", int),
+            "CONTEXT_AGENT_BREAKER_BASE_DELAY": ("breaker_base_delay", float),
+            "CONTEXT_AGENT_BREAKER_MAX_DELAY": ("breaker_max_delay", float),
+            "CONTEXT_AGENT_USE_SPAWNER": ("use_spawner", cls._parse_bool),
+            "CONTEXT_AGENT_SENSOR_RECORD_PATH": ("sensor_record_path", str),
+            "CONTEXT_AGENT_SENSOR_NICE": ("sensor_nice", int),
+            "CONTEXT_AGENT_SENSOR_IO_CLASS": ("sensor_io_class", str),
+            "CONTEXT_AGENT_SENSOR_CPU_QUOTA": ("sensor_cpu_quota", float),
+            "CONTEXT_AGENT_ADAPTIVE_POLLING": ("adaptive_polling", cls._parse_bool),
+            "CONTEXT_AGENT_MIN_POLLING_INTERVAL": ("min_polling_interval", float),
+            "CONTEXT_AGENT_MAX_POLLING_INTERVAL": ("max_polling_interval", float),
+            "CONTEXT_AGENT_WATCH_WORKSPACE": ("watch_workspace", cls._parse_bool),
+            "CONTEXT_AGENT_WATCH_POLLING_INTERVAL": ("watch_polling_interval", float),
+            "CONTEXT_AGENT_SHARED_SCHEDULER": ("shared_scheduler", cls._parse_bool),
+            "CONTEXT_AGENT_FIXED_RATE_POLLING": ("fixed_rate_polling", cls._parse_bool),
+            "CONTEXT_AGENT_MISSED_POLL_POLICY": ("missed_poll_policy", str),
+            "CONTEXT_AGENT_IDLE_TIMEOUT": ("idle_timeout", float),
+            "CONTEXT_AGENT_POLL_PHASE_SPREAD": ("poll_phase_spread", cls._parse_bool),
+            "CONTEXT_AGENT_POLL_JITTER": ("poll_jitter", float),
+            "CONTEXT_AGENT_SENSOR_LOCK_PATH": ("sensor_lock_path", str),
+            "CONTEXT_AGENT_SENSOR_LOCK_SLOTS": ("sensor_lock_slots", int),
+            "CONTEXT_AGENT_PRESSURE_THROTTLING": ("pressure_throttling", cls._parse_bool),
+            "CONTEXT_AGENT_PRESSURE_CPU_LIMIT": ("pressure_cpu_limit", float),
+            "CONTEXT_AGENT_PRESSURE_IO_LIMIT": ("pressure_io_limit", float),
+            "CONTEXT_AGENT_PRESSURE_MAX_STRETCH": ("pressure_max_stretch", float),
             "CONTEXT_AGENT_ENABLE_ZERODB": ("enable_zerodb", cls._parse_bool),
             "CONTEXT_AGENT_ZERODB_API_KEY": ("zerodb_api_key", str),
             "CONTEXT_AGENT_ZERODB_PROJECT_ID": ("zerodb_project_id", str),
@@ -262,6 +324,98 @@ class AgentConfig:
         if self.sensor_timeout <= 0:
             errors.append(f"sensor_timeout must be > 0, got {self.sensor_timeout}")
 
+        # Validate adaptive timeout bounds
+        if not 0 < self.min_sensor_timeout <= self.sensor_timeout:
+            errors.append(
+                f"min_sensor_timeout must be > 0 and <= sensor_timeout, got {self.min_sensor_timeout}"
+            )
+
+        if self.adaptive_timeout_factor < 1:
+            errors.append(
+                f"adaptive_timeout_factor must be >= 1, got {self.adaptive_timeout_factor}"
+            )
+
+        # Validate circuit breaker settings
+        if self.breaker_failure_threshold < 0:
+            errors.append(
+                f"breaker_failure_threshold must be >= 0, got {self.breaker_failure_threshold}"
+            )
+
+        if not 0 < self.breaker_base_delay <= self.breaker_max_delay:
+            errors.append(
+                f"breaker_base_delay must be > 0 and <= breaker_max_delay, got {self.breaker_base_delay}"
+            )
+
+        # Validate sensor_backend
+        valid_sensor_backends = ["subprocess", "framed", "native", "coprocess", "registry"]
+        if self.sensor_backend not in valid_sensor_backends:
+            errors.append(
+                f"sensor_backend must be one of {valid_sensor_backends}, got {self.sensor_backend}"
+            )
+
+        # Validate sensor process priority
+        if not 0 <= self.sensor_nice <= 19:
+            errors.append(f"sensor_nice must be between 0-19, got {self.sensor_nice}")
+
+        valid_io_classes = ["none", "best-effort", "idle"]
+        if self.sensor_io_class not in valid_io_classes:
+            errors.append(
+                f"sensor_io_class must be one of {valid_io_classes}, got {self.sensor_io_class}"
+            )
+
+        if self.sensor_cpu_quota < 0:
+            errors.append(f"sensor_cpu_quota must be >= 0, got {self.sensor_cpu_quota}")
+
+        # Validate adaptive polling bounds
+        if self.min_polling_interval <= 0:
+            errors.append(
+                f"min_polling_interval must be > 0, got {self.min_polling_interval}"
+            )
+        elif self.max_polling_interval < self.min_polling_interval:
+            errors.append(
+                f"max_polling_interval ({self.max_polling_interval}) must be >= "
+                f"min_polling_interval ({self.min_polling_interval})"
+            )
+
+        if self.watch_polling_interval <= 0:
+            errors.append(
+                f"watch_polling_interval must be > 0, got {self.watch_polling_interval}"
+            )
+
+        valid_poll_policies = ["skip", "catch_up", "coalesce"]
+        if self.missed_poll_policy not in valid_poll_policies:
+            errors.append(
+                f"missed_poll_policy must be one of {valid_poll_policies}, "
+                f"got {self.missed_poll_policy}"
+            )
+
+        if self.idle_timeout < 0:
+            errors.append(f"idle_timeout must be >= 0, got {self.idle_timeout}")
+
+        if not 0 <= self.poll_jitter < 1:
+            errors.append(f"poll_jitter must be in [0, 1), got {self.poll_jitter}")
+
+        if self.sensor_lock_slots < 1:
+            errors.append(f"sensor_lock_slots must be >= 1, got {self.sensor_lock_slots}")
+
+        for name in ("pressure_cpu_limit", "pressure_io_limit"):
+            limit = getattr(self, name)
+            if not 0 <= limit < 100:
+                errors.append(f"{name} must be in [0, 100), got {limit}")
+
+        if self.pressure_max_stretch < 1:
+            errors.append(f"pressure_max_stretch must be >= 1, got {self.pressure_max_stretch}")
+
+        # Validate min_refresh_interval
+        if self.min_refresh_interval < 0:
+            errors.append(
+                f"min_refresh_interval must be >= 0, got {self.min_refresh_interval}"
+            )
+
+        # Validate result_cache_size
+        if self.result_cache_size < 0:
+            errors.append(f"result_cache_size must be >= 0, got {self.result_cache_size}")
+
         # Validate log_level
         valid_log_levels = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
         if self.log_level.upper() not in valid_log_levels:
@@ -0,0 +1,177 @@
+"""
+Host-Wide Poll Coordination
+
+Keeps agents that start together (login, container boot) from running their
+sensors in lockstep:
+
+- poll_phase() gives every workspace a deterministic offset within the
+  polling interval, so the polls of many agents are spread evenly over it
+  instead of firing together every interval
+- HostSensorLock limits how many sensors run at once across all processes
+  on the host, using flock() on a small set of shared lock files (one per
+  slot)
+
+Per-poll jitter is applied by PollTimer (see polling.py).
+
+Example:
+    >>> poll_phase("/src/api", 5.0)
+    2.615067443987261
+    >>> lock = HostSensorLock("/tmp/context-sensors.lock", slots=2)
+    >>> with lock:
+    ...     sensor.execute(input_data)
+"""
+
+import functools
+import hashlib
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Callable, TypeVar
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-Unix platforms
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def poll_phase(key: str, interval: float) -> float:
+    """
+    Deterministic poll offset of a workspace within the interval
+
+    The same key gets the same offset in every process (unlike hash(),
+    which is randomized per interpreter).
+
+    Args:
+        key: Workspace path or another stable agent identifier
+        interval: Polling interval in seconds
+
+    Returns:
+        Offset in [0, interval)
+    """
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64 * interval
+
+
+class HostSensorLock:
+    """
+    Host-wide limit on concurrent sensor runs
+
+    Each slot is a lock file (``<path>.<n>``) held with flock() for the
+    duration of a sensor run. A run takes any free slot, or waits for the
+    slot its key hashes to. Locks are released by the kernel if a process
+    dies, so a crashed agent cannot block the others.
+    """
+
+    def __init__(self, path: str, slots: int = 1, key: str = ""):
+        """
+        Initialize HostSensorLock
+
+        Args:
+            path: Lock file path prefix shared by all agents on the host
+            slots: Sensor runs allowed at the same time host-wide
+            key: Identifier used to pick the slot to wait for (e.g. the
+                workspace path), spreading waiters over the slots
+        """
+        if slots < 1:
+            raise ValueError(f"slots must be >= 1, got {slots}")
+
+        self.path = Path(path)
+        self.slots = slots
+        self._preferred = int(poll_phase(key, slots)) if key else 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Any] = {"acquisitions": 0, "contended": 0, "wait_total": 0.0}
+
+        if fcntl is None:
+            logger.warning("flock() not available, host-wide sensor lock disabled")
+
+    def _slot_path(self, slot: int) -> str:
+        return f"{self.path}.{slot}"
+
+    def acquire(self) -> None:
+        """Take a slot, waiting if all are in use"""
+        if fcntl is None:
+            return
+
+        started = time.monotonic()
+        contended = False
+        fd = None
+
+        # Any free slot, starting with the preferred one
+        for offset in range(self.slots):
+            slot = (self._preferred + offset) % self.slots
+            candidate = os.open(self._slot_path(slot), os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o666)
+            try:
+                fcntl.flock(candidate, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(candidate)
+                continue
+            fd = candidate
+            break
+
+        if fd is None:
+            contended = True
+            fd = os.open(
+                self._slot_path(self._preferred), os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o666
+            )
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            except BaseException:
+                os.close(fd)
+                raise
+
+        # One descriptor per acquisition: flock() is per open file, so
+        # threads of this process exclude each other as well
+        self._local.fd = fd
+        with self._lock:
+            self._stats["acquisitions"] += 1
+            self._stats["contended"] += int(contended)
+            self._stats["wait_total"] += time.monotonic() - started
+
+    def release(self) -> None:
+        """Release the slot held by the calling thread"""
+        fd = getattr(self._local, "fd", None)
+        if fd is None:
+            return
+        self._local.fd = None
+        os.close(fd)
+
+    def wrap(self, fn: Callable[..., T]) -> Callable[..., T]:
+        """Wrap fn so that it runs while holding a slot"""
+        @functools.wraps(fn)
+        def locked(*args, **kwargs):
+            with self:
+                return fn(*args, **kwargs)
+        return locked
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get lock statistics
+
+        Returns:
+            Dictionary with path, slots, acquisitions, contended (runs that
+            had to wait for a slot) and avg_wait in seconds
+        """
+        with self._lock:
+            acquisitions = self._stats["acquisitions"]
+            return {
+                "path": str(self.path),
+                "slots": self.slots,
+                "acquisitions": acquisitions,
+                "contended": self._stats["contended"],
+                "avg_wait": self._stats["wait_total"] / acquisitions if acquisitions else 0.0,
+            }
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
@@ -0,0 +1,291 @@
+"""
+Persistent Coprocess Sensor
+
+Keeps a single sensor process alive and exchanges one request/response
+pair per poll over the line protocol defined in ``protocol.py``. This
+removes fork/exec and interpreter startup from every poll while still
+allowing custom sensor executables.
+"""
+
+import queue
+import logging
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple, List
+
+from .sensors import Sensor, SensorError, SensorData
+from .priority import SensorPriority
+from .protocol import (
+    PROTOCOL_VERSION,
+    ProtocolError,
+    encode_message,
+    decode_message,
+    hello_message,
+    sense_message,
+    result_from_message,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class _CoprocessExited(Exception):
+    """Internal signal: the coprocess closed its pipes"""
+    pass
+
+
+class CoprocessSensor(Sensor):
+    """
+    Sensor backend backed by a long-lived sensor process
+
+    The process is started lazily, verified with a protocol version
+    handshake and restarted automatically when it crashes. A request that
+    exceeds its timeout kills the process; the next request starts a fresh one.
+    """
+
+    name = "coprocess"
+
+    def __init__(
+        self,
+        sensor_path: str,
+        cwd: Optional[str] = None,
+        args: Tuple[str, ...] = ("--coprocess",),
+        start_timeout: float = 5.0,
+        priority: Optional[SensorPriority] = None
+    ):
+        """
+        Initialize CoprocessSensor
+
+        Args:
+            sensor_path: Path to the sensor executable
+            cwd: Working directory (defaults to the executable's directory)
+            args: Arguments that put the sensor into coprocess mode
+            start_timeout: Timeout for process start and handshake in seconds
+            priority: Optional CPU/I/O priority applied to the process
+        """
+        self._path = Path(sensor_path)
+        self._cwd = Path(cwd) if cwd is not None else self._path.parent
+        self._args = tuple(args)
+        self._start_timeout = start_timeout
+        self._priority = priority
+
+        self._process: Optional[subprocess.Popen] = None
+        self._responses: Optional[queue.Queue] = None
+        self._readers: List[threading.Thread] = []
+        self._request_id = 0
+        self._lock = threading.Lock()
+
+        self._starts = 0
+        self.sensor_version: Optional[str] = None
+
+    @property
+    def path(self) -> Path:
+        """Path to the sensor executable"""
+        return self._path
+
+    @property
+    def cwd(self) -> Path:
+        return self._cwd
+
+    @property
+    def pid(self) -> Optional[int]:
+        """PID of the running coprocess, if any"""
+        return self._process.pid if self._process else None
+
+    @property
+    def restart_count(self) -> int:
+        """Number of times the coprocess was (re)started after the first start"""
+        return max(self._starts - 1, 0)
+
+    def execute(
+        self,
+        input_data: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> Tuple[str, SensorData]:
+        with self._lock:
+            # One retry: a crashed coprocess is restarted transparently
+            for attempt in range(2):
+                self._ensure_started()
+
+                self._request_id += 1
+                request_id = self._request_id
+
+                try:
+                    response = self._request(sense_message(request_id, input_data), timeout)
+                except _CoprocessExited:
+                    self._terminate()
+                    if attempt == 0:
+                        logger.warning("Sensor coprocess exited unexpectedly, restarting")
+                        continue
+                    raise SensorError("Sensor coprocess exited unexpectedly")
+
+                if response.get("id") != request_id:
+                    self._terminate()
+                    raise ProtocolError(
+                        f"Sensor response id {response.get('id')} does not match request {request_id}"
+                    )
+
+                try:
+                    return result_from_message(response)
+                except ProtocolError:
+                    self._terminate()
+                    raise
+
+        raise SensorError("Sensor coprocess unavailable")  # pragma: no cover
+
+    def close(self) -> None:
+        with self._lock:
+            self._terminate()
+
+    # ------------------------------------------------------------------------
+    # Process management
+    # ------------------------------------------------------------------------
+
+    def _ensure_started(self) -> None:
+        """Start the coprocess and perform the handshake if it is not running"""
+        if self._process is not None and self._process.poll() is None:
+            return
+
+        if self._process is not None:
+            logger.warning(
+                f"Sensor coprocess exited with code {self._process.returncode}, restarting"
+            )
+            self._terminate()
+
+        try:
+            command = [str(self._path), *self._args]
+            if self._priority is not None:
+                command = self._priority.wrap(command)
+            self._process = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                cwd=str(self._cwd)
+            )
+        except FileNotFoundError as e:
+            raise SensorError(f"Sensor script not found: {e}")
+        except PermissionError as e:
+            raise SensorError(f"Permission denied executing sensor: {e}")
+        except OSError as e:
+            raise SensorError(f"Unexpected error executing sensor: {e}")
+
+        self._starts += 1
+        self._responses = queue.Queue()
+
+        self._readers = [
+            threading.Thread(
+                target=self._read_stdout,
+                args=(self._process, self._responses),
+                daemon=True,
+                name="ContextAgent-CoprocessReader"
+            ),
+            threading.Thread(
+                target=self._read_stderr,
+                args=(self._process,),
+                daemon=True,
+                name="ContextAgent-CoprocessStderr"
+            ),
+        ]
+        for reader in self._readers:
+            reader.start()
+
+        try:
+            response = self._request(hello_message(), self._start_timeout)
+        except _CoprocessExited:
+            self._terminate()
+            raise SensorError("Sensor coprocess exited during handshake")
+        except SensorError:
+            self._terminate()
+            raise
+
+        if response["type"] != "hello" or response.get("protocol") != PROTOCOL_VERSION:
+            self._terminate()
+            raise ProtocolError(
+                f"Sensor does not support protocol version {PROTOCOL_VERSION}: {response}"
+            )
+
+        self.sensor_version = response.get("version")
+        logger.debug(
+            f"Sensor coprocess started: pid={self._process.pid}, version={self.sensor_version}"
+        )
+
+    def _request(self, message: Dict[str, Any], timeout: Optional[float]) -> Dict[str, Any]:
+        """Send one message and wait for one response line"""
+        try:
+            self._process.stdin.write(encode_message(message))
+            self._process.stdin.flush()
+        except (BrokenPipeError, ValueError, OSError):
+            raise _CoprocessExited()
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        remaining = timeout
+
+        while True:
+            try:
+                line = self._responses.get(timeout=remaining)
+            except queue.Empty:
+                self._terminate(kill=True)
+                raise SensorError(f"Sensor execution timed out after {timeout}s")
+
+            if line is None:
+                raise _CoprocessExited()
+
+            if line.strip():
+                return decode_message(line)
+
+            if deadline is not None:
+                remaining = max(deadline - time.monotonic(), 0)
+
+    def _terminate(self, kill: bool = False) -> None:
+        """Stop the coprocess (closing STDIN lets it exit on its own)"""
+        process = self._process
+        self._process = None
+        self._responses = None
+
+        if process is None:
+            return
+
+        if kill:
+            process.kill()
+
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+
+        try:
+            process.wait(timeout=1.0)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+        # Readers finish at EOF and close their pipes
+        for reader in self._readers:
+            reader.join(timeout=1.0)
+        self._readers = []
+
+    @staticmethod
+    def _read_stdout(process: subprocess.Popen, responses: queue.Queue) -> None:
+        """Forward response lines to the request queue until EOF"""
+        try:
+            for line in process.stdout:
+                responses.put(line)
+        except (OSError, ValueError):
+            pass
+        finally:
+            process.stdout.close()
+            responses.put(None)
+
+    @staticmethod
+    def _read_stderr(process: subprocess.Popen) -> None:
+        """Forward sensor diagnostics to the log"""
+        try:
+            for line in process.stderr:
+                logger.debug(f"Sensor coprocess stderr: {line.decode('utf-8', 'replace').rstrip()}")
+        except (OSError, ValueError):
+            pass
+        finally:
+            process.stderr.close()
@@ -17,6 +17,7 @@ class EventType(Enum):
     BRANCH_CHANGED = "branch_changed"
     CONTEXT_THRESHOLD = "context_threshold"
     STATE_UPDATED = "state_updated"
+    SENSOR_CIRCUIT_CHANGED = "sensor_circuit_changed"
 
 
 @dataclass
@@ -90,6 +91,10 @@ class EventEmitter:
                 # Gracefully handle callback errors
                 print(f"Error in event handler: {e}")
 
+    def handler_count(self) -> int:
+        """Number of registered handlers across all event types"""
+        return sum(len(handlers) for handlers in self._handlers.values())
+
     def clear(self, event_type: EventType = None) -> None:
         """
         Clear event handlers
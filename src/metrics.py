@@ -0,0 +1,318 @@
+"""
+Sensor Metrics
+
+Streaming latency histogram for sensor executions, the adaptive timeout
+derived from it, and CPU/memory accounting of sensor child processes.
+"""
+
+import bisect
+import math
+import os
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List
+
+
+class LatencyHistogram:
+    """
+    Streaming latency histogram with log-spaced buckets
+
+    Buckets grow geometrically (``growth`` ratio) from ``min_latency`` to
+    ``max_latency``, so percentiles are accurate to a few percent at any
+    scale while memory stays constant. Once ``decay_after`` samples have
+    been recorded all counts are halved, so the histogram follows
+    changes in sensor behaviour instead of averaging over its lifetime.
+    """
+
+    def __init__(
+        self,
+        min_latency: float = 0.0001,
+        max_latency: float = 120.0,
+        growth: float = 1.1,
+        decay_after: int = 1000
+    ):
+        """
+        Initialize LatencyHistogram
+
+        Args:
+            min_latency: Upper bound of the first bucket in seconds
+            max_latency: Latencies above this land in the overflow bucket
+            growth: Ratio between consecutive bucket bounds (> 1)
+            decay_after: Halve all counts after this many samples (0 disables)
+        """
+        if growth <= 1:
+            raise ValueError(f"growth must be > 1, got {growth}")
+
+        count = int(math.ceil(math.log(max_latency / min_latency, growth))) + 1
+        self._bounds: List[float] = [min_latency * growth ** i for i in range(count)]
+        # Float weights so decay does not truncate sparse buckets
+        self._counts: List[float] = [0.0] * (count + 1)  # last bucket: overflow
+        self._decay_after = decay_after
+        self._lock = threading.Lock()
+
+        self._samples = 0.0
+        self._total = 0
+        self._max: Optional[float] = None
+
+    def record(self, latency: float) -> None:
+        """Record one latency in seconds"""
+        index = bisect.bisect_left(self._bounds, latency)
+
+        with self._lock:
+            self._counts[index] += 1
+            self._samples += 1
+            self._total += 1
+            if self._max is None or latency > self._max:
+                self._max = latency
+
+            if self._decay_after and self._samples >= self._decay_after:
+                self._counts = [c / 2 for c in self._counts]
+                self._samples /= 2
+
+    @property
+    def count(self) -> float:
+        """Weighted number of samples in the histogram (halved by each decay)"""
+        with self._lock:
+            return self._samples
+
+    @property
+    def total(self) -> int:
+        """Total samples ever recorded"""
+        with self._lock:
+            return self._total
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Estimate a latency percentile
+
+        Args:
+            q: Percentile in [0, 100]
+
+        Returns:
+            Upper bound of the bucket containing the percentile (capped at
+            the largest observed latency), or None without samples
+        """
+        with self._lock:
+            if not self._samples:
+                return None
+
+            rank = max(1, math.ceil(self._samples * q / 100.0))
+            seen = 0.0
+            for index, bucket_count in enumerate(self._counts):
+                seen += bucket_count
+                if seen >= rank - 1e-9:
+                    break
+
+            bound = self._bounds[index] if index < len(self._bounds) else self._max
+            return min(bound, self._max)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get summary statistics
+
+        Returns:
+            Dictionary with count, total, p50, p90, p99 and max (seconds)
+        """
+        return {
+            "count": self.count,
+            "total": self.total,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self._max,
+        }
+
+
+class AdaptiveTimeout:
+    """
+    Sensor timeout derived from observed latency
+
+    The effective timeout is ``percentile × factor`` clamped to
+    ``[minimum, maximum]``. Until ``min_samples`` runs have been observed
+    the maximum is used. Timed-out runs should be recorded with their
+    elapsed time so that a slowing sensor raises the timeout again.
+    """
+
+    def __init__(
+        self,
+        histogram: LatencyHistogram,
+        minimum: float,
+        maximum: float,
+        factor: float = 3.0,
+        percentile: float = 99.0,
+        min_samples: int = 10
+    ):
+        """
+        Initialize AdaptiveTimeout
+
+        Args:
+            histogram: Latency histogram of sensor runs
+            minimum: Lower clamp in seconds
+            maximum: Upper clamp in seconds (also the initial timeout)
+            factor: Multiplier applied to the latency percentile
+            percentile: Latency percentile to scale (default: p99)
+            min_samples: Samples required before adapting
+        """
+        if minimum > maximum:
+            raise ValueError(f"minimum ({minimum}) must be <= maximum ({maximum})")
+
+        self._histogram = histogram
+        self.minimum = minimum
+        self.maximum = maximum
+        self.factor = factor
+        self.percentile = percentile
+        self.min_samples = min_samples
+
+    @property
+    def value(self) -> float:
+        """Current effective timeout in seconds"""
+        if self._histogram.count < self.min_samples:
+            return self.maximum
+
+        latency = self._histogram.percentile(self.percentile)
+        return min(max(latency * self.factor, self.minimum), self.maximum)
+
+
+@dataclass(frozen=True)
+class ResourceUsage:
+    """
+    Resources used by one sensor child process
+
+    Includes the descendants it waited for (e.g. jq and git run by the
+    sensor script).
+
+    Attributes:
+        user_time: User CPU seconds
+        system_time: System CPU seconds
+        max_rss_kb: Peak resident set size in KiB (largest single process)
+    """
+    user_time: float
+    system_time: float
+    max_rss_kb: int
+
+    @classmethod
+    def from_rusage(cls, rusage: Any) -> "ResourceUsage":
+        """Create from a resource.struct_rusage (or equivalent mapping)"""
+        if isinstance(rusage, dict):
+            return cls(rusage["user_time"], rusage["system_time"], rusage["max_rss_kb"])
+        return cls(rusage.ru_utime, rusage.ru_stime, rusage.ru_maxrss)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "user_time": self.user_time,
+            "system_time": self.system_time,
+            "max_rss_kb": self.max_rss_kb,
+        }
+
+
+def can_reap_with_usage(process: "subprocess.Popen") -> bool:
+    """
+    Whether wait_child() can reap a process and capture its rusage
+
+    False on platforms without wait4 and for objects that are not real
+    Popen children (subprocess.Popen itself may be patched, so the
+    instance is checked instead).
+    """
+    return hasattr(os, "wait4") and isinstance(getattr(process, "pid", None), int)
+
+
+def wait_child(
+    process: "subprocess.Popen",
+    timeout: Optional[float] = None
+) -> Optional[ResourceUsage]:
+    """
+    Reap a Popen child with os.wait4() and return its resource usage
+
+    Use instead of wait() once the pipes have been drained: wait(), poll()
+    and communicate() reap with waitpid(), which discards the usage.
+    Sets ``process.returncode`` as wait() would, so later wait()/poll()
+    calls return it without reaping again.
+
+    Args:
+        process: Child started by subprocess.Popen (see can_reap_with_usage)
+        timeout: Seconds to wait for the child to exit (None = no limit)
+
+    Returns:
+        ResourceUsage of the child and the descendants it waited for, or
+        None if the child had already been reaped
+
+    Raises:
+        subprocess.TimeoutExpired: If the child is still running after timeout
+    """
+    if process.returncode is not None:
+        return None
+
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    delay = 0.0005
+    while True:
+        try:
+            pid, status, rusage = os.wait4(process.pid, 0 if deadline is None else os.WNOHANG)
+        except ChildProcessError:
+            # Reaped elsewhere (or SIGCHLD ignored); Popen reports 0 as well
+            process.returncode = 0
+            return None
+
+        if pid == process.pid:
+            process.returncode = _exit_code(status)
+            return ResourceUsage.from_rusage(rusage)
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise subprocess.TimeoutExpired(process.args, timeout)
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.05)
+
+
+def _exit_code(status: int) -> int:
+    """Popen returncode for a wait status (negative signal number if killed)"""
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+class ResourceAccounting:
+    """
+    Aggregated resource usage of sensor executions
+
+    Thread-safe counters in total and per key (the workspace the sensor
+    inspected).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._total = self._empty()
+        self._by_key: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _empty() -> Dict[str, Any]:
+        return {"executions": 0, "user_time": 0.0, "system_time": 0.0, "max_rss_kb": 0}
+
+    def record(self, usage: ResourceUsage, key: str) -> None:
+        """Add one child's usage under key"""
+        with self._lock:
+            for counters in (self._total, self._by_key.setdefault(key, self._empty())):
+                counters["executions"] += 1
+                counters["user_time"] += usage.user_time
+                counters["system_time"] += usage.system_time
+                counters["max_rss_kb"] = max(counters["max_rss_kb"], usage.max_rss_kb)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get aggregated usage
+
+        Returns:
+            Dictionary with executions, user_time, system_time, cpu_time
+            (seconds), max_rss_kb and the same counters per workspace
+            under "workspaces"
+        """
+        def view(counters: Dict[str, Any]) -> Dict[str, Any]:
+            result = dict(counters)
+            result["cpu_time"] = counters["user_time"] + counters["system_time"]
+            return result
+
+        with self._lock:
+            snapshot = view(self._total)
+            snapshot["workspaces"] = {key: view(c) for key, c in self._by_key.items()}
+            return snapshot
@@ -0,0 +1,337 @@
+"""
+Poll Scheduling
+
+AdaptiveInterval picks the delay before the next background poll from what
+recent polls observed: after a change the agent polls at the minimum
+interval, every unchanged poll multiplies the interval by ``backoff`` up to
+the maximum. When context usage approaches the threshold the interval is
+capped so the crossing is seen promptly:
+
+- within ``threshold_margin`` percentage points of the threshold the
+  minimum interval is used
+- while usage is rising, the interval is kept below half the time the
+  current rate needs to reach the threshold
+
+PollTimer turns the chosen interval into the delay before the next poll.
+By default the delay is counted from the end of a poll (fixed delay, so
+the real period includes the sensor run). In fixed-rate mode polls are due
+on a grid anchored to the monotonic clock, and an overrun past one or more
+due times is handled by a policy:
+
+- ``skip``: wait for the next grid tick; missed ticks are dropped
+- ``catch_up``: poll back to back until every missed tick has run (at most
+  ``MAX_CATCH_UP`` ticks; older ones are dropped)
+- ``coalesce``: poll once immediately for all missed ticks, then continue
+  on the grid
+
+Optional jitter moves every poll by a random fraction of the interval (the
+fixed-rate grid itself does not move), so agents that happen to share a
+phase drift apart.
+
+Example:
+    >>> interval = AdaptiveInterval(minimum=1.0, maximum=60.0, threshold=80)
+    >>> interval.observe(changed=False, usage_pct=20)
+    2.0
+"""
+
+import random
+import threading
+import time
+from typing import Optional, Dict, Any, Callable
+
+
+# Missed-tick policies of fixed-rate polling
+POLL_POLICIES = ("skip", "catch_up", "coalesce")
+
+# Most missed ticks the catch_up policy runs back to back
+MAX_CATCH_UP = 10
+
+# Weight of the newest period in the achieved-rate average
+_RATE_SMOOTHING = 0.2
+
+# Percentage points below the context threshold treated as close to it
+THRESHOLD_MARGIN = 10.0
+
+
+class AdaptiveInterval:
+    """
+    Polling interval that backs off while the state is stable
+
+    Thread-safe.
+    """
+
+    def __init__(
+        self,
+        minimum: float,
+        maximum: float,
+        initial: Optional[float] = None,
+        backoff: float = 2.0,
+        threshold: Optional[float] = None,
+        threshold_margin: float = THRESHOLD_MARGIN,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize AdaptiveInterval
+
+        Args:
+            minimum: Shortest interval in seconds (used after a change)
+            maximum: Longest interval in seconds
+            initial: Starting interval (defaults to the minimum)
+            backoff: Multiplier applied per unchanged poll
+            threshold: Context usage percentage to watch (None disables the
+                threshold caps)
+            threshold_margin: Percentage points below the threshold within
+                which the minimum interval is used
+            clock: Monotonic clock (injectable for tests)
+        """
+        if minimum <= 0:
+            raise ValueError(f"minimum must be > 0, got {minimum}")
+        if minimum > maximum:
+            raise ValueError(f"minimum ({minimum}) must be <= maximum ({maximum})")
+        if backoff < 1:
+            raise ValueError(f"backoff must be >= 1, got {backoff}")
+
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.threshold = threshold
+        self.threshold_margin = threshold_margin
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._value = min(max(initial if initial is not None else minimum, minimum), maximum)
+        # Last observed usage, when it last changed and its rate (pct/second)
+        self._usage: Optional[float] = None
+        self._usage_at: Optional[float] = None
+        self._usage_rate = 0.0
+        self._stats = {"observations": 0, "changes": 0}
+
+    @property
+    def value(self) -> float:
+        """Current interval in seconds"""
+        with self._lock:
+            return self._value
+
+    def observe(self, changed: bool, usage_pct: Optional[float] = None) -> float:
+        """
+        Record the outcome of a poll and compute the next interval
+
+        Args:
+            changed: Whether the poll detected a state change
+            usage_pct: Context window usage percentage of the new state
+
+        Returns:
+            Next interval in seconds
+        """
+        with self._lock:
+            now = self._clock()
+            self._stats["observations"] += 1
+
+            if changed:
+                self._stats["changes"] += 1
+                value = self.minimum
+            else:
+                value = min(self._value * self.backoff, self.maximum)
+
+            if usage_pct is not None:
+                self._track_usage(usage_pct, now)
+                if self.threshold is not None:
+                    value = min(value, self._threshold_cap(usage_pct, now))
+
+            self._value = max(value, self.minimum)
+            return self._value
+
+    def reset(self) -> None:
+        """Return to the minimum interval (e.g. after an external trigger)"""
+        with self._lock:
+            self._value = self.minimum
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get scheduler state
+
+        Returns:
+            Dictionary with interval, minimum, maximum, usage_rate
+            (percentage points per second) and observation counts
+        """
+        with self._lock:
+            return {
+                "interval": self._value,
+                "minimum": self.minimum,
+                "maximum": self.maximum,
+                "usage_rate": self._usage_rate,
+                **self._stats,
+            }
+
+    def _track_usage(self, usage_pct: float, now: float) -> None:
+        """Update the usage rate when usage changed (lock held)"""
+        if self._usage is None:
+            self._usage, self._usage_at = usage_pct, now
+            return
+
+        if usage_pct == self._usage:
+            return
+
+        elapsed = now - self._usage_at
+        self._usage_rate = (usage_pct - self._usage) / elapsed if elapsed > 0 else 0.0
+        self._usage, self._usage_at = usage_pct, now
+
+    def _threshold_cap(self, usage_pct: float, now: float) -> float:
+        """Longest interval that still catches a threshold crossing (lock held)"""
+        remaining = self.threshold - usage_pct
+        if remaining <= 0:
+            # Already crossed; nothing left to catch until usage drops
+            return self.maximum
+        if remaining <= self.threshold_margin:
+            return self.minimum
+        if self._usage_rate <= 0:
+            return self.maximum
+
+        # Time until the projected crossing, measured from the last change
+        time_left = remaining / self._usage_rate - (now - self._usage_at)
+        return max(time_left / 2, self.minimum)
+
+
+class PollTimer:
+    """
+    Due times of background polls and the cadence actually achieved
+
+    Thread-safe.
+    """
+
+    def __init__(
+        self,
+        fixed_rate: bool = False,
+        policy: str = "skip",
+        jitter: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Callable[[], float] = random.random
+    ):
+        """
+        Initialize PollTimer
+
+        The grid is anchored at construction time (the agent's initial
+        sensor run).
+
+        Args:
+            fixed_rate: Schedule polls on a fixed-rate grid instead of a
+                fixed delay after each poll
+            policy: Missed-tick policy in fixed-rate mode: "skip",
+                "catch_up" or "coalesce"
+            jitter: Random offset of each poll as a fraction of the
+                interval (0.1 = up to ±10%)
+            clock: Monotonic clock (injectable for tests)
+            rng: Random source in [0, 1) (injectable for tests)
+        """
+        if policy not in POLL_POLICIES:
+            raise ValueError(f"policy must be one of {list(POLL_POLICIES)}, got {policy}")
+        if not 0 <= jitter < 1:
+            raise ValueError(f"jitter must be in [0, 1), got {jitter}")
+
+        self.fixed_rate = fixed_rate
+        self.policy = policy
+        self.jitter = jitter
+        self._clock = clock
+        self._rng = rng
+        self._lock = threading.Lock()
+
+        # Grid tick of the next poll, and that tick with jitter applied
+        self._due = self._target = clock()
+        self._last_start: Optional[float] = None
+        self._avg_period: Optional[float] = None
+        self._stats: Dict[str, Any] = {
+            "polls": 0,
+            "skipped": 0,
+            "lag": 0.0,
+            "max_lag": 0.0,
+            "lag_total": 0.0,
+        }
+
+    def poll_started(self) -> None:
+        """Record the start of a poll (its lag behind the due time and the achieved period)"""
+        with self._lock:
+            now = self._clock()
+            lag = max(now - self._target, 0.0)
+            self._stats["polls"] += 1
+            self._stats["lag"] = lag
+            self._stats["lag_total"] += lag
+            self._stats["max_lag"] = max(self._stats["max_lag"], lag)
+
+            if self._last_start is not None:
+                period = now - self._last_start
+                if self._avg_period is None:
+                    self._avg_period = period
+                else:
+                    self._avg_period += _RATE_SMOOTHING * (period - self._avg_period)
+            self._last_start = now
+
+    def next_delay(self, period: float) -> float:
+        """
+        Compute the delay before the next poll
+
+        Args:
+            period: Interval between polls in seconds
+
+        Returns:
+            Seconds to wait (0 to poll immediately)
+        """
+        with self._lock:
+            now = self._clock()
+            offset = self.jitter * period * (2 * self._rng() - 1) if self.jitter else 0.0
+
+            if not self.fixed_rate:
+                self._due = now + period
+                self._target = self._due + offset
+                return period + offset
+
+            if now < self._target:
+                # Early poll (watcher change, idle resume): the pending
+                # tick has not happened yet and stays due
+                return self._target - now
+
+            due = self._due + period
+            if due <= now and period > 0:
+                # Grid ticks whose due time has passed
+                missed = int((now - due) // period) + 1
+                if self.policy == "skip":
+                    due += missed * period
+                    self._stats["skipped"] += missed
+                elif self.policy == "coalesce":
+                    # One poll now stands for all missed ticks
+                    due += (missed - 1) * period
+                    self._stats["skipped"] += missed - 1
+                elif missed > MAX_CATCH_UP:
+                    dropped = missed - MAX_CATCH_UP
+                    due += dropped * period
+                    self._stats["skipped"] += dropped
+
+            self._due = due
+            self._target = due + offset
+            return max(self._target - now, 0.0)
+
+    def defer(self, delay: float) -> None:
+        """Re-anchor the grid so the next poll is due in delay seconds (e.g. circuit backoff)"""
+        with self._lock:
+            self._due = self._target = self._clock() + delay
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get cadence statistics
+
+        Returns:
+            Dictionary with mode, policy, polls, skipped (missed ticks not
+            run), achieved_rate (polls per second, smoothed), lag (seconds
+            the last poll started after its due time), max_lag and avg_lag
+        """
+        with self._lock:
+            polls = self._stats["polls"]
+            return {
+                "mode": "fixed_rate" if self.fixed_rate else "fixed_delay",
+                "policy": self.policy,
+                "polls": polls,
+                "skipped": self._stats["skipped"],
+                "achieved_rate": 1.0 / self._avg_period if self._avg_period else 0.0,
+                "lag": self._stats["lag"],
+                "max_lag": self._stats["max_lag"],
+                "avg_lag": self._stats["lag_total"] / polls if polls else 0.0,
+            }
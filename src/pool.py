@@ -0,0 +1,251 @@
+"""
+Shared Sensor Execution Pool
+
+Bounded worker pool that many ContextAgent instances can share, so total
+sensor concurrency stays capped however many workspaces are monitored.
+Work is queued per key (usually the workspace path) and dispatched
+round-robin across keys, so one busy workspace cannot starve the others,
+and each key has its own in-flight limit.
+
+Example:
+    >>> pool = SensorPool(max_workers=4)
+    >>> agents = [ContextAgent(sensor=..., pool=pool) for _ in workspaces]
+    >>> pool.stats()["queued"]
+    0
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Optional, Dict, Any, Callable, Deque, Tuple
+
+
+_Task = Tuple[Future, Callable[..., Any], tuple, dict, float]
+
+
+class _KeyQueue:
+    """Pending tasks and in-flight count of one key"""
+
+    __slots__ = ("pending", "in_flight", "completed")
+
+    def __init__(self):
+        self.pending: Deque[_Task] = deque()
+        self.in_flight = 0
+        self.completed = 0
+
+
+class SensorPool:
+    """
+    Bounded, fair-queued pool of sensor worker threads
+
+    Workers are started lazily up to ``max_workers``. Tasks of the same key
+    run at most ``per_key_limit`` at a time; keys take turns in round-robin
+    order when workers free up.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        per_key_limit: int = 1,
+        name: str = "SensorPool"
+    ):
+        """
+        Initialize SensorPool
+
+        Args:
+            max_workers: Maximum concurrent sensor runs (default: CPU count)
+            per_key_limit: Maximum concurrent runs per key (default: 1)
+            name: Thread name prefix
+        """
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be >= 1, got {max_workers}")
+        if per_key_limit < 1:
+            raise ValueError(f"per_key_limit must be >= 1, got {per_key_limit}")
+
+        self.max_workers = max_workers
+        self.per_key_limit = per_key_limit
+        self._name = name
+
+        self._cond = threading.Condition()
+        # Keys with queued or running tasks in round-robin order; a
+        # dispatched key moves to the end
+        self._keys: "OrderedDict[str, _KeyQueue]" = OrderedDict()
+        self._workers: list = []
+        self._idle = 0
+        self._shutdown = False
+
+        self._queued = 0
+        self._in_flight = 0
+        self._stats: Dict[str, Any] = {
+            "submitted": 0,
+            "completed": 0,
+            "max_queue_depth": 0,
+            "queue_wait_total": 0.0,
+        }
+
+    def submit(self, key: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """
+        Queue fn(*args, **kwargs) under key
+
+        Args:
+            key: Fairness and in-flight limit key (e.g. workspace path)
+            fn: Callable to run on a pool worker
+
+        Returns:
+            Future with the result or exception of fn
+
+        Raises:
+            RuntimeError: If the pool has been shut down
+        """
+        future: Future = Future()
+
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("cannot submit to a shut down SensorPool")
+
+            queue = self._keys.get(key)
+            if queue is None:
+                queue = self._keys[key] = _KeyQueue()
+            queue.pending.append((future, fn, args, kwargs, time.monotonic()))
+
+            self._queued += 1
+            self._stats["submitted"] += 1
+            if self._queued > self._stats["max_queue_depth"]:
+                self._stats["max_queue_depth"] = self._queued
+
+            if self._idle == 0 and len(self._workers) < self.max_workers:
+                self._start_worker()
+            self._cond.notify()
+
+        return future
+
+    def run(self, key: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Submit fn under key and wait for its result (exceptions re-raise)"""
+        return self.submit(key, fn, *args, **kwargs).result()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get pool statistics
+
+        Returns:
+            Dictionary with max_workers, workers, queued (current queue
+            depth), in_flight, submitted, completed, max_queue_depth,
+            avg_queue_wait (seconds) and queued/in_flight/completed of each
+            key with queued or running tasks
+        """
+        with self._cond:
+            started = self._stats["completed"] + self._in_flight
+            return {
+                "max_workers": self.max_workers,
+                "workers": len(self._workers),
+                "queued": self._queued,
+                "in_flight": self._in_flight,
+                "submitted": self._stats["submitted"],
+                "completed": self._stats["completed"],
+                "max_queue_depth": self._stats["max_queue_depth"],
+                "avg_queue_wait": (
+                    self._stats["queue_wait_total"] / started if started else 0.0
+                ),
+                "keys": {
+                    key: {
+                        "queued": len(queue.pending),
+                        "in_flight": queue.in_flight,
+                        "completed": queue.completed,
+                    }
+                    for key, queue in self._keys.items()
+                },
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the pool
+
+        Queued tasks that have not started are cancelled.
+
+        Args:
+            wait: Wait for running tasks and worker threads to finish
+        """
+        with self._cond:
+            self._shutdown = True
+            for key, queue in list(self._keys.items()):
+                while queue.pending:
+                    queue.pending.popleft()[0].cancel()
+                if not queue.in_flight:
+                    del self._keys[key]
+            self._queued = 0
+            self._cond.notify_all()
+            workers = list(self._workers)
+
+        if wait:
+            for worker in workers:
+                worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    def _start_worker(self) -> None:
+        """Start one worker thread (condition held)"""
+        worker = threading.Thread(
+            target=self._worker,
+            daemon=True,
+            name=f"{self._name}-{len(self._workers)}"
+        )
+        self._workers.append(worker)
+        worker.start()
+
+    def _next_task(self) -> Optional[Tuple[str, _Task]]:
+        """Pop the next runnable task in round-robin key order (condition held)"""
+        for key, queue in self._keys.items():
+            if queue.pending and queue.in_flight < self.per_key_limit:
+                self._keys.move_to_end(key)
+                return key, queue.pending.popleft()
+        return None
+
+    def _worker(self) -> None:
+        """Worker thread main loop"""
+        while True:
+            with self._cond:
+                while True:
+                    picked = self._next_task()
+                    if picked is not None or self._shutdown:
+                        break
+                    self._idle += 1
+                    self._cond.wait()
+                    self._idle -= 1
+
+                if picked is None:
+                    return
+
+                key, (future, fn, args, kwargs, queued_at) = picked
+                queue = self._keys[key]
+                queue.in_flight += 1
+                self._queued -= 1
+                self._in_flight += 1
+                self._stats["queue_wait_total"] += time.monotonic() - queued_at
+
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        result = fn(*args, **kwargs)
+                    except BaseException as e:
+                        future.set_exception(e)
+                    else:
+                        future.set_result(result)
+            finally:
+                with self._cond:
+                    queue.in_flight -= 1
+                    queue.completed += 1
+                    if not queue.pending and not queue.in_flight:
+                        # Drained: forget the key (workspaces come and go)
+                        del self._keys[key]
+                    self._in_flight -= 1
+                    self._stats["completed"] += 1
+                    # A slot for this key opened up; another worker may take it
+                    self._cond.notify()
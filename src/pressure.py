@@ -0,0 +1,199 @@
+"""
+Host Load Pressure
+
+Measures how contended the host is so background monitoring can yield to
+real work. Linux pressure stall information (PSI) is preferred:
+
+- ``/proc/pressure/cpu`` and ``/proc/pressure/io``: the ``some avg10``
+  value is the share of the last 10 seconds in which at least one task
+  was stalled waiting for the resource (percent)
+
+Without PSI (older kernels, containers that hide it) the 1-minute load
+average per CPU, as a percentage capped at 100, stands in for CPU
+pressure. Without either, the host is never considered under pressure.
+
+PressureMonitor turns the readings into a stretch factor for polling
+intervals: 1 up to the configured limit, then rising linearly to
+``max_stretch`` at 100% pressure of the most contended resource.
+
+Example:
+    >>> monitor = PressureMonitor(cpu_limit=40.0, io_limit=40.0, max_stretch=4.0)
+    >>> monitor.stretch()  # 70% CPU stall time
+    2.5
+"""
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable
+
+
+logger = logging.getLogger(__name__)
+
+
+# Resources read from /proc/pressure
+PSI_RESOURCES = ("cpu", "io")
+
+
+def read_psi(resource: str, proc_root: str = "/proc") -> Optional[float]:
+    """
+    Read the "some avg10" stall percentage of a resource
+
+    Args:
+        resource: "cpu", "io" or "memory"
+        proc_root: procfs mount point (injectable for tests)
+
+    Returns:
+        Percentage, or None if PSI is unavailable
+    """
+    try:
+        text = (Path(proc_root) / "pressure" / resource).read_text()
+    except OSError:
+        return None
+
+    for line in text.splitlines():
+        fields = line.split()
+        if fields and fields[0] == "some":
+            for field in fields[1:]:
+                name, _, value = field.partition("=")
+                if name == "avg10":
+                    try:
+                        return float(value)
+                    except ValueError:
+                        return None
+    return None
+
+
+def read_load(proc_root: str = "/proc") -> Optional[float]:
+    """
+    Read the 1-minute load average per CPU
+
+    Args:
+        proc_root: procfs mount point (injectable for tests)
+
+    Returns:
+        Load as a percentage of the CPUs (capped at 100), or None if
+        /proc/loadavg is unavailable
+    """
+    try:
+        load = float((Path(proc_root) / "loadavg").read_text().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+
+    return min(load / (os.cpu_count() or 1) * 100, 100.0)
+
+
+class PressureMonitor:
+    """
+    Stretch factor for background work derived from host pressure
+
+    Readings are cached for ``sample_interval`` seconds, so the monitor can
+    be consulted on every poll and write. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        cpu_limit: float = 40.0,
+        io_limit: float = 40.0,
+        max_stretch: float = 4.0,
+        sample_interval: float = 1.0,
+        proc_root: str = "/proc",
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize PressureMonitor
+
+        Args:
+            cpu_limit: CPU pressure (percent) above which work is stretched
+            io_limit: I/O pressure (percent) above which work is stretched
+            max_stretch: Interval multiplier at 100% pressure
+            sample_interval: Seconds a reading is reused
+            proc_root: procfs mount point (injectable for tests)
+            clock: Monotonic clock (injectable for tests)
+        """
+        for name, limit in (("cpu_limit", cpu_limit), ("io_limit", io_limit)):
+            if not 0 <= limit < 100:
+                raise ValueError(f"{name} must be in [0, 100), got {limit}")
+        if max_stretch < 1:
+            raise ValueError(f"max_stretch must be >= 1, got {max_stretch}")
+
+        self.cpu_limit = cpu_limit
+        self.io_limit = io_limit
+        self.max_stretch = max_stretch
+        self.sample_interval = sample_interval
+        self._proc_root = proc_root
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._sampled_at: Optional[float] = None
+        self._reading: Dict[str, Any] = {"source": None, "cpu": None, "io": None}
+        self._stretch = 1.0
+        self._stats = {"samples": 0, "pressured": 0}
+
+    def stretch(self) -> float:
+        """
+        Current interval multiplier
+
+        Returns:
+            1.0 below the limits, up to max_stretch under full pressure
+        """
+        with self._lock:
+            now = self._clock()
+            if self._sampled_at is None or now - self._sampled_at >= self.sample_interval:
+                self._sample(now)
+            return self._stretch
+
+    @property
+    def under_pressure(self) -> bool:
+        """Whether a pressure limit is currently exceeded"""
+        return self.stretch() > 1.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get pressure state
+
+        Returns:
+            Dictionary with source ("psi", "loadavg" or None), cpu and io
+            pressure in percent, stretch, the limits, samples and pressured
+            (samples above a limit)
+        """
+        self.stretch()
+        with self._lock:
+            return {
+                **self._reading,
+                "stretch": self._stretch,
+                "cpu_limit": self.cpu_limit,
+                "io_limit": self.io_limit,
+                **self._stats,
+            }
+
+    def _sample(self, now: float) -> None:
+        """Take a new reading (lock held)"""
+        readings = {resource: read_psi(resource, self._proc_root) for resource in PSI_RESOURCES}
+        if readings["cpu"] is not None:
+            source = "psi"
+        else:
+            readings = {"cpu": read_load(self._proc_root), "io": None}
+            source = "loadavg" if readings["cpu"] is not None else None
+
+        stretch = 1.0
+        for resource, limit in (("cpu", self.cpu_limit), ("io", self.io_limit)):
+            value = readings[resource]
+            if value is not None and value > limit:
+                excess = (min(value, 100.0) - limit) / (100.0 - limit)
+                stretch = max(stretch, 1.0 + (self.max_stretch - 1.0) * excess)
+
+        if stretch > 1.0 and self._stretch == 1.0:
+            logger.info(
+                f"Host under pressure ({readings}), stretching background work x{stretch:.1f}"
+            )
+        elif stretch == 1.0 and self._stretch > 1.0:
+            logger.info("Host pressure cleared, resuming normal background work")
+
+        self._sampled_at = now
+        self._reading = {"source": source, **readings}
+        self._stretch = stretch
+        self._stats["samples"] += 1
+        self._stats["pressured"] += int(stretch > 1.0)
@@ -0,0 +1,330 @@
+"""
+Sensor Process Priority
+
+Runs sensor processes at reduced CPU and I/O priority so that monitoring
+never competes with the editor or build. Priorities are applied at spawn
+time by prefixing the sensor command with small exec wrappers:
+
+- ``nice -n N`` lowers the CPU scheduling priority
+- ``ionice -c CLASS`` lowers the I/O priority (Linux, util-linux)
+- a cgroup v2 with a ``cpu.max`` quota, joined before the sensor starts
+
+Every wrapper ends in ``exec``, so the sensor (and the jq/git processes it
+starts) inherits the settings without an extra long-lived process, and
+Popen keeps its fast vfork path (no preexec_fn). Missing tools or an
+unavailable cgroup are logged once and skipped; a sensor that cannot join
+a configured cgroup fails instead of running unthrottled.
+
+cgroup v2 only lets a cgroup distribute a controller to its children while
+it has no processes of its own, so the agent moves itself into a leaf
+cgroup (``agent``) next to the sensor cgroup before enabling ``cpu``.
+
+Example:
+    >>> priority = SensorPriority(nice=10, io_class="idle")
+    >>> priority.wrap(["scripts/context_sensor.sh"])
+    ['/usr/bin/nice', '-n', '10', '/usr/bin/ionice', '-c', '3', 'scripts/context_sensor.sh']
+"""
+
+import errno
+import logging
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Optional, List
+
+
+logger = logging.getLogger(__name__)
+
+
+# ionice scheduling classes by name
+IO_CLASSES = {"none": None, "best-effort": "2", "idle": "3"}
+
+# cgroup v2 cpu.max period in microseconds
+CPU_PERIOD_US = 100000
+
+# Leaf cgroup the agent moves to so its own cgroup can enable controllers
+AGENT_LEAF = "agent"
+
+# Exit status of a sensor that could not join its cgroup
+CGROUP_JOIN_FAILED = 125
+
+# Joins the cgroup whose cgroup.procs file is $1, then execs the sensor
+_CGROUP_JOIN = (
+    'echo $$ > "$1" || { echo "Cannot join sensor cgroup $1" >&2; '
+    f'exit {CGROUP_JOIN_FAILED}; }}; shift; exec "$@"'
+)
+
+
+class SensorCgroup:
+    """
+    A cgroup v2 that sensor processes are placed in
+
+    Created below the agent's own cgroup (cgroup v2 delegation is required
+    to write it) with the ``cpu`` controller enabled; ``cpu.max`` limits
+    all sensors in it to a fraction of one CPU in total.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Initialize SensorCgroup
+
+        Args:
+            path: Existing cgroup directory
+        """
+        self.path = Path(path)
+
+    @property
+    def procs_file(self) -> Path:
+        """File a process writes its PID to in order to join the cgroup"""
+        return self.path / "cgroup.procs"
+
+    @classmethod
+    def create(
+        cls,
+        cpu_quota: float,
+        parent: Optional[Path] = None,
+        name: str = "context-sensors"
+    ) -> Optional["SensorCgroup"]:
+        """
+        Create (or reuse) the sensor cgroup with a CPU quota
+
+        Args:
+            cpu_quota: CPU time allowed in total, as a fraction of one CPU
+            parent: Parent cgroup directory (defaults to the agent's own
+                cgroup v2 directory, which the agent then leaves for a
+                leaf cgroup)
+            name: Child cgroup name
+
+        Returns:
+            SensorCgroup, or None if cgroup v2 is unavailable, the cpu
+            controller is not delegated or the cgroup is not writable
+        """
+        move_self = parent is None
+        if parent is None:
+            parent = own_cgroup_dir()
+            if parent is None:
+                logger.warning("cgroup v2 not available, sensor CPU quota disabled")
+                return None
+
+        parent = Path(parent)
+        path = parent / name
+        leaf = parent / AGENT_LEAF
+        quota = max(int(cpu_quota * CPU_PERIOD_US), 1000)
+        created = leaf_created = moved = False
+
+        try:
+            controllers = (parent / "cgroup.controllers").read_text().split()
+            if "cpu" not in controllers:
+                raise OSError(errno.EOPNOTSUPP, "cpu controller not delegated", str(parent))
+
+            try:
+                _enable_cpu(parent)
+            except OSError as e:
+                if e.errno != errno.EBUSY or not move_self:
+                    raise
+                # The parent still holds the agent (no-internal-process
+                # rule): move the agent into a leaf cgroup and retry
+                if not leaf.is_dir():
+                    leaf.mkdir()
+                    leaf_created = True
+                (leaf / "cgroup.procs").write_text(f"{os.getpid()}\n")
+                moved = True
+                logger.info(f"Moved agent to cgroup {leaf}")
+                _enable_cpu(parent)
+
+            if not path.is_dir():
+                path.mkdir()
+                created = True
+            if not (path / "cpu.max").exists():
+                raise OSError(errno.EOPNOTSUPP, "cpu controller not enabled", str(path))
+            (path / "cpu.max").write_text(f"{quota} {CPU_PERIOD_US}\n")
+
+            cgroup = cls(path)
+            cgroup.probe()
+        except OSError as e:
+            # Leave the cgroup tree as it was
+            undo = []
+            if created:
+                undo.append(path.rmdir)
+            if moved:
+                undo.append(lambda: (parent / "cgroup.procs").write_text(f"{os.getpid()}\n"))
+            if leaf_created:
+                undo.append(leaf.rmdir)
+            for step in undo:
+                try:
+                    step()
+                except OSError as undo_error:
+                    logger.warning(f"Cannot restore cgroup setup: {undo_error}")
+            logger.warning(f"Cannot configure sensor cgroup {path}: {e}; CPU quota disabled")
+            return None
+
+        logger.info(f"Sensor cgroup {path}: cpu.max {quota} {CPU_PERIOD_US}")
+        return cgroup
+
+    def probe(self) -> None:
+        """
+        Check that a new process can join the cgroup
+
+        Raises:
+            OSError: If joining fails
+        """
+        result = subprocess.run(
+            ["/bin/sh", "-c", _CGROUP_JOIN, "sh", str(self.procs_file), "true"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+        if result.returncode != 0:
+            raise OSError(
+                errno.EACCES, result.stderr.strip() or "cannot join", str(self.procs_file)
+            )
+
+
+def _enable_cpu(parent: Path) -> None:
+    """
+    Enable the cpu controller for the children of parent
+
+    Raises:
+        OSError: If the controller cannot be enabled (EBUSY while parent
+            still holds processes)
+    """
+    (parent / "cgroup.subtree_control").write_text("+cpu\n")
+
+
+def own_cgroup_dir(
+    mountinfo: str = "/proc/self/mountinfo",
+    cgroup_file: str = "/proc/self/cgroup"
+) -> Optional[Path]:
+    """
+    Directory of the current process's cgroup v2
+
+    Args:
+        mountinfo: mountinfo file to locate the cgroup2 mount
+        cgroup_file: cgroup membership file of the process
+
+    Returns:
+        Path below the cgroup2 mount, or None without cgroup v2
+    """
+    try:
+        with open(mountinfo) as f:
+            mounts = f.read().splitlines()
+        with open(cgroup_file) as f:
+            memberships = f.read().splitlines()
+    except OSError:
+        return None
+
+    mount_point = None
+    for line in mounts:
+        # <id> <parent> <dev> <root> <mount point> <options> ... - <fstype> <source> ...
+        fields = line.split(" - ", 1)
+        if len(fields) == 2 and fields[1].split(" ", 1)[0] == "cgroup2":
+            mount_point = fields[0].split(" ")[4]
+            break
+
+    relative = next((line[3:] for line in memberships if line.startswith("0::")), None)
+    if mount_point is None or relative is None:
+        return None
+
+    return Path(mount_point) / relative.lstrip("/")
+
+
+class SensorPriority:
+    """
+    CPU, I/O and cgroup limits applied to sensor processes at spawn time
+    """
+
+    def __init__(
+        self,
+        nice: int = 0,
+        io_class: str = "none",
+        io_level: int = 7,
+        cgroup: Optional[SensorCgroup] = None
+    ):
+        """
+        Initialize SensorPriority
+
+        Args:
+            nice: Niceness increment (0-19, 0 leaves the priority unchanged)
+            io_class: I/O scheduling class: "none", "best-effort" or "idle"
+            io_level: Priority within the best-effort class (0-7, 7 = lowest)
+            cgroup: Optional cgroup the sensors are placed in
+        """
+        if not 0 <= nice <= 19:
+            raise ValueError(f"nice must be between 0 and 19, got {nice}")
+        if io_class not in IO_CLASSES:
+            raise ValueError(f"io_class must be one of {list(IO_CLASSES)}, got {io_class}")
+        if not 0 <= io_level <= 7:
+            raise ValueError(f"io_level must be between 0 and 7, got {io_level}")
+
+        self.nice = nice
+        self.io_class = io_class
+        self.io_level = io_level
+        self.cgroup = cgroup
+        self._prefix = self._build_prefix()
+
+    @classmethod
+    def from_settings(
+        cls,
+        nice: int = 0,
+        io_class: str = "none",
+        cpu_quota: float = 0.0
+    ) -> Optional["SensorPriority"]:
+        """
+        Build from agent settings
+
+        Args:
+            nice: Niceness increment
+            io_class: I/O scheduling class
+            cpu_quota: Total sensor CPU quota as a fraction of one CPU
+                (0 disables the cgroup)
+
+        Returns:
+            SensorPriority, or None when every setting is at its default
+        """
+        if nice == 0 and io_class == "none" and cpu_quota <= 0:
+            return None
+
+        cgroup = SensorCgroup.create(cpu_quota) if cpu_quota > 0 else None
+        return cls(nice=nice, io_class=io_class, cgroup=cgroup)
+
+    @property
+    def prefix(self) -> List[str]:
+        """Command prefix that applies the limits"""
+        return list(self._prefix)
+
+    def wrap(self, args: List[str]) -> List[str]:
+        """Prefix a sensor command with the limit wrappers"""
+        return self._prefix + list(args)
+
+    def _build_prefix(self) -> List[str]:
+        prefix: List[str] = []
+
+        if self.cgroup is not None:
+            prefix += ["/bin/sh", "-c", _CGROUP_JOIN, "sh", str(self.cgroup.procs_file)]
+
+        if self.nice:
+            nice = shutil.which("nice")
+            if nice is None:
+                logger.warning("nice not found, sensor CPU priority unchanged")
+            else:
+                prefix += [nice, "-n", str(self.nice)]
+
+        io_class = IO_CLASSES[self.io_class]
+        if io_class is not None:
+            ionice = shutil.which("ionice")
+            if ionice is None:
+                logger.warning("ionice not found, sensor I/O priority unchanged")
+            else:
+                prefix += [ionice, "-c", io_class]
+                if io_class == "2":
+                    prefix += ["-n", str(self.io_level)]
+
+        return prefix
+
+    def __repr__(self) -> str:
+        return (
+            f"SensorPriority(nice={self.nice}, io_class={self.io_class!r}, "
+            f"cgroup={str(self.cgroup.path) if self.cgroup else None})"
+        )
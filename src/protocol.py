@@ -0,0 +1,160 @@
+"""
+Sensor Line Protocol
+
+Line-delimited JSON messages exchanged with long-lived sensors
+(see ``scripts/context_sensor.sh --coprocess``). Each message is a single
+JSON object terminated by a newline:
+
+    agent  -> sensor: {"type": "hello", "protocol": 1}
+    sensor -> agent:  {"type": "hello", "protocol": 1, "version": "1.0.0"}
+
+    agent  -> sensor: {"type": "sense", "id": 7, "input": {...}}
+    sensor -> agent:  {"type": "result", "id": 7, "display": "...", "data": {...}}
+                   or {"type": "error", "id": 7, "error": "..."}
+
+Batch mode (``context_sensor.sh --batch``) reads one input payload per line
+and answers each with a result or error frame whose id is the 1-based line
+number. Framed mode (``context_sensor.sh --framed 1``) is the one-shot
+equivalent: one input document, one result frame (id 1) on STDOUT, with
+STDERR left free for diagnostics.
+"""
+
+import json
+from typing import Dict, Any, Optional, Tuple, List
+
+from .sensors import SensorError, SensorData
+
+
+PROTOCOL_VERSION = 1
+
+
+class ProtocolError(SensorError):
+    """Raised when a sensor violates the line protocol"""
+    pass
+
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    """
+    Encode a protocol message as a single newline-terminated line
+
+    Args:
+        message: Message dictionary
+
+    Returns:
+        UTF-8 encoded line
+    """
+    return json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def decode_message(line: bytes) -> Dict[str, Any]:
+    """
+    Decode a single protocol line
+
+    Args:
+        line: Raw line (with or without trailing newline)
+
+    Returns:
+        Message dictionary
+
+    Raises:
+        ProtocolError: If the line is not a JSON object with a type
+    """
+    try:
+        message = json.loads(line)
+    except ValueError as e:
+        raise ProtocolError(f"Invalid protocol message: {e}")
+
+    if not isinstance(message, dict) or "type" not in message:
+        raise ProtocolError(f"Invalid protocol message: {line[:200]!r}")
+
+    return message
+
+
+class FrameDecoder:
+    """
+    Incremental decoder for newline-delimited protocol frames
+
+    Bytes can be fed in arbitrary chunks; complete lines are decoded
+    straight from bytes (no intermediate str decoding) and partial lines
+    are buffered until their newline arrives.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[Dict[str, Any]]:
+        """
+        Add bytes and return the frames they complete
+
+        Raises:
+            ProtocolError: If a complete line is not a valid frame
+        """
+        self._buffer += data
+        frames = []
+
+        start = 0
+        while True:
+            end = self._buffer.find(b"\n", start)
+            if end < 0:
+                break
+            line = bytes(self._buffer[start:end])
+            start = end + 1
+            if line.strip():
+                frames.append(decode_message(line))
+
+        del self._buffer[:start]
+        return frames
+
+    def close(self) -> List[Dict[str, Any]]:
+        """
+        Flush a final unterminated frame at end of stream
+
+        Raises:
+            ProtocolError: If the remaining bytes are not a valid frame
+        """
+        line = bytes(self._buffer)
+        self._buffer.clear()
+        return [decode_message(line)] if line.strip() else []
+
+
+def hello_message() -> Dict[str, Any]:
+    """Build the handshake request"""
+    return {"type": "hello", "protocol": PROTOCOL_VERSION}
+
+
+def sense_message(request_id: int, input_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build a sense request"""
+    return {"type": "sense", "id": request_id, "input": input_data or {}}
+
+
+def result_from_message(message: Dict[str, Any]) -> Tuple[str, SensorData]:
+    """
+    Convert a result frame to the sensor (stdout, stderr) contract
+
+    The data object is handed over as decoded; it is not serialized back
+    to JSON for the agent to parse again.
+
+    Args:
+        message: Decoded "result" or "error" frame
+
+    Returns:
+        Tuple of (display string, data dictionary)
+
+    Raises:
+        SensorError: For error frames
+        ProtocolError: For any other frame type, or a result frame whose
+            display is not a string or whose data is not an object
+    """
+    if message["type"] == "error":
+        raise SensorError(f"Sensor failed: {message.get('error', 'unknown error')}")
+
+    if message["type"] != "result":
+        raise ProtocolError(f"Unexpected sensor response type: {message['type']}")
+
+    display = message.get("display", "")
+    data = message.get("data", {})
+    if not isinstance(display, str):
+        raise ProtocolError(f"Invalid sensor result display: {display!r}")
+    if not isinstance(data, dict):
+        raise ProtocolError(f"Invalid sensor result data: {str(data)[:200]!r}")
+    return display.strip(), data
@@ -0,0 +1,409 @@
+"""
+Composable Per-Field Sensors
+
+Splits the sensor document into field groups (model, workspace, git,
+context window), each produced by its own FieldSensor with its own refresh
+interval and cost budget. SensorRegistry is a Sensor backend that refreshes
+only the groups that are due and merges the cached fragments into a
+GroupDocument: the decoded sensor data, tagged with the top-level keys that
+were recollected, so the ContextAgent rebuilds and diffs only those parts
+of its state.
+
+Example:
+    >>> registry = SensorRegistry(cwd=".", sensors=[GitFieldSensor(interval=60.0)])
+    >>> agent = ContextAgent(sensor=registry)
+    >>> registry.stats()["git"]["runs"]
+    0
+"""
+
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple, List, Sequence, Callable, FrozenSet
+
+from .sensors import (
+    Sensor,
+    SENSOR_VERSION,
+    DEFAULT_MAX_TOKENS,
+    find_git_dir,
+    read_git_branch,
+    format_display,
+    _json_get,
+    _to_int,
+    _percentage,
+    _absolute_cwd,
+    _workspace_name,
+)
+
+
+class FieldSensor(ABC):
+    """
+    Producer of one field group of the sensor document
+
+    Subclasses set ``group`` (registry key), ``path`` (where the fragment
+    is stored in the document) and ``input_keys`` (top-level input keys the
+    fragment depends on; a change in any of them forces a refresh).
+    """
+
+    group = "field"
+    path: Tuple[str, ...] = ()
+    input_keys: Tuple[str, ...] = ()
+    default_interval = 0.0
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        budget: Optional[float] = None,
+        max_backoff: int = 8
+    ):
+        """
+        Initialize FieldSensor
+
+        Args:
+            interval: Seconds a collected fragment stays valid (0 = every run;
+                defaults to the group's default_interval)
+            budget: Expected collection cost in seconds; runs over budget
+                double the effective interval up to max_backoff times
+            max_backoff: Maximum interval multiplier from budget overruns
+        """
+        self.interval = self.default_interval if interval is None else interval
+        self.budget = budget
+        self.max_backoff = max_backoff
+
+    def input_digest(self, data: Dict[str, Any]) -> str:
+        """Digest of the input keys this group depends on"""
+        return json.dumps(
+            [data.get(key) for key in self.input_keys], sort_keys=True, default=str
+        )
+
+    @abstractmethod
+    def collect(self, data: Dict[str, Any], cwd: Path) -> Any:
+        """
+        Compute the group's fragment
+
+        Args:
+            data: Sensor input (empty dict when none was given)
+            cwd: Directory the registry inspects
+
+        Returns:
+            JSON-compatible fragment stored at ``path``
+
+        Raises:
+            SensorError: If the input is invalid
+        """
+
+
+class ModelFieldSensor(FieldSensor):
+    """Model name from the input"""
+
+    group = "model"
+    path = ("model",)
+    input_keys = ("model",)
+
+    def collect(self, data: Dict[str, Any], cwd: Path) -> Any:
+        return _json_get(data, ("model",), "Claude")
+
+
+class WorkspaceFieldSensor(FieldSensor):
+    """Workspace path and directory name"""
+
+    group = "workspace"
+    path = ("workspace",)
+    input_keys = ("workspace_path",)
+    default_interval = 30.0
+
+    def collect(self, data: Dict[str, Any], cwd: Path) -> Any:
+        workspace_path = _json_get(data, ("workspace_path",), str(cwd))
+        return {"path": workspace_path, "name": _workspace_name(workspace_path)}
+
+
+class GitFieldSensor(FieldSensor):
+    """Git repository detection and current branch"""
+
+    group = "git"
+    path = ("workspace", "git")
+    default_interval = 30.0
+
+    def collect(self, data: Dict[str, Any], cwd: Path) -> Any:
+        git_dir = find_git_dir(cwd)
+        return {
+            "is_repo": git_dir is not None,
+            "branch": read_git_branch(git_dir) if git_dir is not None else "",
+        }
+
+
+class ContextWindowFieldSensor(FieldSensor):
+    """Context window token usage from the input"""
+
+    group = "context_window"
+    path = ("context_window",)
+    input_keys = ("context_window",)
+
+    def collect(self, data: Dict[str, Any], cwd: Path) -> Any:
+        max_tokens = _to_int(
+            _json_get(data, ("context_window", "max_tokens"), str(DEFAULT_MAX_TOKENS)),
+            "context_window.max_tokens"
+        )
+        tokens_used = _to_int(
+            _json_get(data, ("context_window", "tokens_used"), "0"),
+            "context_window.tokens_used"
+        )
+        return {
+            "max_tokens": max_tokens,
+            "tokens_used": tokens_used,
+            "usage_pct": _percentage(tokens_used, max_tokens),
+        }
+
+
+def default_field_sensors() -> List[FieldSensor]:
+    """Field sensors covering the full sensor document"""
+    return [
+        ModelFieldSensor(),
+        WorkspaceFieldSensor(),
+        GitFieldSensor(),
+        ContextWindowFieldSensor(),
+    ]
+
+
+class _GroupCache:
+    """Cached fragment and accounting of one field group"""
+
+    __slots__ = ("value", "digest", "refreshed_at", "backoff",
+                 "runs", "hits", "over_budget", "total_time", "last_duration")
+
+    def __init__(self):
+        self.value: Any = None
+        self.digest: Optional[str] = None
+        self.refreshed_at: Optional[float] = None
+        self.backoff = 1
+        self.runs = 0
+        self.hits = 0
+        self.over_budget = 0
+        self.total_time = 0.0
+        self.last_duration = 0.0
+
+
+class GroupDocument(dict):
+    """
+    Sensor data produced by a SensorRegistry
+
+    A plain dict holding the decoded sensor document, so it is accepted
+    wherever sensor output is (see sensors.SensorData). It also records
+    which top-level keys were recollected relative to the registry's
+    previous document; everything else is carried over unchanged.
+
+    Attributes:
+        generation: Sequence number of this document within its registry
+        base: Generation of the previous document (None for the first)
+        refreshed_keys: Top-level keys holding recollected fragments
+    """
+
+    def __init__(
+        self,
+        data: Dict[str, Any],
+        generation: int,
+        base: Optional[int],
+        refreshed_keys: FrozenSet[str]
+    ):
+        super().__init__(data)
+        self.generation = generation
+        self.base = base
+        self.refreshed_keys = refreshed_keys
+
+    def refreshed_since(self, previous: Any) -> Optional[FrozenSet[str]]:
+        """
+        Top-level keys that may differ from an earlier document
+
+        Args:
+            previous: Sensor data the consumer currently holds
+
+        Returns:
+            The refreshed keys if this document was derived directly from
+            ``previous``, otherwise None (compare everything)
+        """
+        if isinstance(previous, GroupDocument) and previous.generation == self.base:
+            return self.refreshed_keys
+        return None
+
+
+class SensorRegistry(Sensor):
+    """
+    Sensor backend composed of per-group FieldSensors
+
+    Each execute() refreshes the groups whose interval has elapsed or whose
+    input keys changed, and reuses the cached fragments of the others.
+    Unchanged groups therefore produce identical output, which lets the
+    agent's unchanged-output short-circuit skip parsing entirely; otherwise
+    the returned GroupDocument tells the agent which keys to rebuild.
+    """
+
+    name = "registry"
+
+    def __init__(
+        self,
+        cwd: Optional[str] = None,
+        sensors: Optional[Sequence[FieldSensor]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize SensorRegistry
+
+        Args:
+            cwd: Directory to inspect (defaults to the current working directory)
+            sensors: Field sensors replacing the defaults of the same group
+            clock: Monotonic clock (injectable for tests)
+        """
+        self._cwd = _absolute_cwd(cwd)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sensors: Dict[str, FieldSensor] = {}
+        self._cache: Dict[str, _GroupCache] = {}
+        self.last_refreshed: Tuple[str, ...] = ()
+        self._generation = 0
+
+        for sensor in default_field_sensors():
+            self.register(sensor)
+        for sensor in sensors or ():
+            self.register(sensor)
+
+    @property
+    def cwd(self) -> Path:
+        return self._cwd
+
+    def register(self, sensor: FieldSensor) -> None:
+        """Add a field sensor, replacing any sensor of the same group"""
+        with self._lock:
+            self._sensors[sensor.group] = sensor
+            self._cache[sensor.group] = _GroupCache()
+
+    def invalidate(self, group: Optional[str] = None) -> None:
+        """Force a group (or all groups) to refresh on the next execute()"""
+        with self._lock:
+            for name, cache in self._cache.items():
+                if group is None or name == group:
+                    cache.refreshed_at = None
+
+    def execute(
+        self,
+        input_data: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> Tuple[str, GroupDocument]:
+        data = input_data if isinstance(input_data, dict) else {}
+        document: Dict[str, Any] = {"version": SENSOR_VERSION}
+        refreshed = []
+        refreshed_keys = set()
+
+        with self._lock:
+            # Collect every due group before touching the caches: if one
+            # group fails, none is marked fresh without reaching a document
+            collected = {}
+            for group, sensor in self._sensors.items():
+                if self._refresh_due(sensor, self._cache[group], data):
+                    started = self._clock()
+                    value = sensor.collect(data, self._cwd)
+                    collected[group] = (value, started, self._clock())
+
+            for group, sensor in self._sensors.items():
+                cache = self._cache[group]
+                if group in collected:
+                    self._update(sensor, cache, data, *collected[group])
+                    refreshed.append(group)
+                    refreshed_keys.add(sensor.path[0])
+                else:
+                    cache.hits += 1
+                _store(document, sensor.path, cache.value)
+            self.last_refreshed = tuple(refreshed)
+
+            self._generation += 1
+            result = GroupDocument(
+                document,
+                generation=self._generation,
+                base=self._generation - 1 if self._generation > 1 else None,
+                refreshed_keys=frozenset(refreshed_keys),
+            )
+
+        return self._display(document), result
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-group statistics
+
+        Returns:
+            Dictionary keyed by group with interval (effective, seconds),
+            runs, hits, over_budget, total_time and last_duration
+        """
+        with self._lock:
+            return {
+                group: {
+                    "interval": sensor.interval * cache.backoff,
+                    "runs": cache.runs,
+                    "hits": cache.hits,
+                    "over_budget": cache.over_budget,
+                    "total_time": cache.total_time,
+                    "last_duration": cache.last_duration,
+                }
+                for group, sensor in self._sensors.items()
+                for cache in (self._cache[group],)
+            }
+
+    def _refresh_due(self, sensor: FieldSensor, cache: _GroupCache, data: Dict[str, Any]) -> bool:
+        """Whether a group must be recollected (lock held)"""
+        if cache.refreshed_at is None:
+            return True
+        if sensor.input_keys and sensor.input_digest(data) != cache.digest:
+            return True
+        return self._clock() - cache.refreshed_at >= sensor.interval * cache.backoff
+
+    def _update(
+        self,
+        sensor: FieldSensor,
+        cache: _GroupCache,
+        data: Dict[str, Any],
+        value: Any,
+        started: float,
+        finished: float
+    ) -> None:
+        """Store a collected fragment and its accounting (lock held)"""
+        duration = finished - started
+        cache.value = value
+        cache.digest = sensor.input_digest(data) if sensor.input_keys else None
+        cache.refreshed_at = finished
+        cache.runs += 1
+        cache.total_time += duration
+        cache.last_duration = duration
+
+        if sensor.budget is not None:
+            if duration > sensor.budget:
+                cache.over_budget += 1
+                cache.backoff = min(cache.backoff * 2, sensor.max_backoff)
+            else:
+                cache.backoff = 1
+
+    @staticmethod
+    def _display(document: Dict[str, Any]) -> str:
+        workspace = document.get("workspace") or {}
+        git = workspace.get("git") or {}
+        context = document.get("context_window") or {}
+        return format_display(
+            document.get("model", "Claude"),
+            workspace.get("name", ""),
+            git.get("is_repo", False),
+            git.get("branch", ""),
+            context.get("tokens_used", 0),
+            context.get("usage_pct", 0),
+        )
+
+
+def _store(document: Dict[str, Any], path: Tuple[str, ...], value: Any) -> None:
+    """Store a fragment at a nested path, merging with existing dicts"""
+    target = document
+    for key in path[:-1]:
+        target = target.setdefault(key, {})
+
+    existing = target.get(path[-1])
+    if isinstance(existing, dict) and isinstance(value, dict):
+        existing.update(value)
+    else:
+        target[path[-1]] = dict(value) if isinstance(value, dict) else value
@@ -0,0 +1,248 @@
+"""
+Sensor Record and Replay
+
+RecordingSensor wraps any sensor backend and appends every execution to a
+trace file; ReplaySensor feeds a trace back to a ContextAgent without
+running bash, jq or git. Together they let parse, diff, event and
+persistence throughput be measured on real traces without subprocess noise.
+
+Traces are NDJSON (gzip-compressed when the path ends in ``.gz``): a header
+line followed by one record per execution::
+
+    {"format": "context-sensor-trace", "version": 1, "sensor": "subprocess", "cwd": "..."}
+    {"at": 0.0, "input": {...}, "stdout": "...", "stderr": "...", "duration": 0.012}
+    {"at": 5.01, "input": {...}, "error": "Sensor execution timed out after 5.0s", "duration": 5.0}
+
+Example:
+    >>> agent = ContextAgent(sensor=RecordingSensor(create_sensor("subprocess", path), "trace.gz"))
+    >>> replay = ContextAgent(sensor=ReplaySensor("trace.gz", speed=None))
+"""
+
+import gzip
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple, List, Iterator, IO, Sequence
+
+from .metrics import ResourceAccounting
+from .sensors import Sensor, SensorError, SensorData, BatchResult
+
+
+TRACE_FORMAT = "context-sensor-trace"
+TRACE_VERSION = 1
+
+
+def _open_trace(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def read_trace(path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Load a sensor trace
+
+    Args:
+        path: Trace file written by RecordingSensor
+
+    Returns:
+        Tuple of (header, records)
+
+    Raises:
+        SensorError: If the file is not a supported trace
+    """
+    with _open_trace(Path(path), "r") as f:
+        lines: Iterator[str] = iter(f)
+        try:
+            header = json.loads(next(lines))
+        except (StopIteration, ValueError):
+            raise SensorError(f"Not a sensor trace: {path}")
+
+        if header.get("format") != TRACE_FORMAT or header.get("version") != TRACE_VERSION:
+            raise SensorError(f"Unsupported sensor trace format in {path}: {header}")
+
+        return header, [json.loads(line) for line in lines if line.strip()]
+
+
+class RecordingSensor(Sensor):
+    """
+    Sensor wrapper that records every execution to a trace file
+
+    Outputs and errors of the wrapped sensor are passed through unchanged.
+    """
+
+    def __init__(self, sensor: Sensor, path: str, append: bool = False):
+        """
+        Initialize RecordingSensor
+
+        Args:
+            sensor: Sensor backend to record
+            path: Trace file (gzip-compressed if it ends in .gz)
+            append: Append to an existing trace instead of replacing it
+        """
+        self._sensor = sensor
+        self._path = Path(path)
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self.name = f"recording:{sensor.name}"
+
+        exists = append and self._path.exists() and self._path.stat().st_size > 0
+        self._file: Optional[IO[str]] = _open_trace(self._path, "a" if append else "w")
+        if not exists:
+            self._write({
+                "format": TRACE_FORMAT,
+                "version": TRACE_VERSION,
+                "sensor": sensor.name,
+                "cwd": str(sensor.cwd),
+            })
+
+    @property
+    def cwd(self) -> Path:
+        return self._sensor.cwd
+
+    @property
+    def sensor(self) -> Sensor:
+        """The wrapped sensor"""
+        return self._sensor
+
+    @property
+    def usage(self) -> Optional[ResourceAccounting]:
+        """Resource accounting of the wrapped sensor, if it keeps one"""
+        return getattr(self._sensor, "usage", None)
+
+    def execute(
+        self,
+        input_data: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> Tuple[str, SensorData]:
+        started = time.monotonic()
+        record: Dict[str, Any] = {"at": round(started - self._started, 6), "input": input_data}
+
+        try:
+            stdout, stderr = self._sensor.execute(input_data, timeout=timeout)
+        except SensorError as e:
+            record["error"] = str(e)
+            record["duration"] = round(time.monotonic() - started, 6)
+            self._write(record)
+            raise
+
+        record["stdout"] = stdout
+        record["stderr"] = stderr
+        record["duration"] = round(time.monotonic() - started, 6)
+        self._write(record)
+        return stdout, stderr
+
+    def execute_batch(
+        self,
+        inputs: Sequence[Optional[Dict[str, Any]]],
+        timeout: Optional[float] = None
+    ) -> List[BatchResult]:
+        started = time.monotonic()
+        results = self._sensor.execute_batch(inputs, timeout=timeout)
+
+        # One record per input; the batch duration is split evenly
+        duration = round((time.monotonic() - started) / max(len(inputs), 1), 6)
+        at = round(started - self._started, 6)
+        for input_data, result in zip(inputs, results):
+            record: Dict[str, Any] = {"at": at, "input": input_data}
+            if isinstance(result, SensorError):
+                record["error"] = str(result)
+            else:
+                record["stdout"], record["stderr"] = result
+            record["duration"] = duration
+            self._write(record)
+
+        return results
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        self._sensor.close()
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line)
+                self._file.flush()
+
+
+class ReplaySensor(Sensor):
+    """
+    Sensor backend that replays a recorded trace
+
+    Records are returned in order regardless of the input passed in;
+    recorded errors are raised again as SensorError.
+    """
+
+    name = "replay"
+
+    def __init__(
+        self,
+        path: str,
+        speed: Optional[float] = 1.0,
+        loop: bool = False
+    ):
+        """
+        Initialize ReplaySensor
+
+        Args:
+            path: Trace file written by RecordingSensor
+            speed: Replay speed relative to the recorded sensor durations
+                (2.0 = twice as fast, None = no delay at all)
+            loop: Restart from the first record when the trace is exhausted
+                (otherwise further executions raise SensorError)
+
+        Raises:
+            SensorError: If the file is not a supported trace
+        """
+        if speed is not None and speed <= 0:
+            raise ValueError(f"speed must be > 0 or None, got {speed}")
+
+        self.header, self.records = read_trace(path)
+        self._speed = speed
+        self._loop = loop
+        self._lock = threading.Lock()
+        self._position = 0
+
+    @property
+    def cwd(self) -> Path:
+        return Path(self.header.get("cwd", "."))
+
+    @property
+    def position(self) -> int:
+        """Index of the next record to replay"""
+        with self._lock:
+            return self._position
+
+    def rewind(self) -> None:
+        """Restart the replay from the first record"""
+        with self._lock:
+            self._position = 0
+
+    def execute(
+        self,
+        input_data: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> Tuple[str, SensorData]:
+        with self._lock:
+            if self._position >= len(self.records):
+                if not self._loop or not self.records:
+                    raise SensorError("Sensor trace exhausted")
+                self._position = 0
+            record = self.records[self._position]
+            self._position += 1
+
+        if self._speed is not None:
+            delay = record.get("duration", 0.0) / self._speed
+            if timeout is not None and delay > timeout:
+                time.sleep(timeout)
+                raise SensorError(f"Sensor execution timed out after {timeout}s")
+            time.sleep(delay)
+
+        if "error" in record:
+            raise SensorError(record["error"])
+        return record["stdout"], record["stderr"]
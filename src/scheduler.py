@@ -0,0 +1,297 @@
+"""
+Shared Poll Scheduler
+
+Drives the background polls of many ContextAgent instances from a few
+threads instead of one poller thread per agent. Polls are kept in a heap
+ordered by due time; each worker thread sleeps until the earliest poll is
+due, runs it and pushes it back with the delay the poll returned, so every
+agent keeps its own (adaptive, backed-off or watcher-stretched) interval.
+
+A process-wide scheduler and a process-wide asyncio event loop (used for
+ZeroDB persistence) are available through shared_scheduler() and
+shared_event_loop().
+
+Example:
+    >>> scheduler = PollScheduler(workers=2)
+    >>> agents = [ContextAgent(sensor=..., scheduler=scheduler) for _ in workspaces]
+    >>> for agent in agents:
+    ...     agent.start(polling_interval=5.0)
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Optional, Dict, Any, Callable, List, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+# Worker threads of the process-wide scheduler
+SHARED_WORKERS = 4
+
+
+class ScheduledPoll:
+    """Handle of a callback registered with a PollScheduler"""
+
+    def __init__(
+        self,
+        scheduler: "PollScheduler",
+        callback: Callable[[], Optional[float]],
+        name: str
+    ):
+        self.name = name
+        self.runs = 0
+        self._scheduler = scheduler
+        self._callback = callback
+        # Bumped on every reschedule; stale heap entries are skipped
+        self._version = 0
+        self._delay = 0.0
+        self._cancelled = False
+        self._woken = False
+        self._runner: Optional[int] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def wake(self) -> None:
+        """Run the callback as soon as possible instead of at its due time"""
+        self._scheduler._wake(self)
+
+    def cancel(self, wait: bool = True) -> None:
+        """
+        Stop scheduling the callback
+
+        Args:
+            wait: Wait for a run in progress to finish (ignored when called
+                from the callback itself)
+        """
+        self._scheduler._cancel(self, wait)
+
+
+class PollScheduler:
+    """
+    Timer heap of periodic callbacks served by a few worker threads
+
+    A callback returns the delay in seconds until its next run, or None to
+    stop. The same callback never runs concurrently with itself.
+    """
+
+    def __init__(self, workers: int = 1, name: str = "PollScheduler"):
+        """
+        Initialize PollScheduler
+
+        Args:
+            workers: Worker threads; also the number of callbacks that can
+                run at the same time (default: 1)
+            name: Thread name prefix
+        """
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}")
+
+        self.workers = workers
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[float, int, int, ScheduledPoll]] = []
+        self._seq = itertools.count()
+        self._jobs = 0
+        self._running = 0
+        self._shutdown = False
+        self._stats: Dict[str, Any] = {"runs": 0, "errors": 0, "max_lateness": 0.0, "lateness_total": 0.0}
+
+        self._threads = [
+            threading.Thread(target=self._worker, daemon=True, name=f"{name}-{index}")
+            for index in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def schedule(
+        self,
+        callback: Callable[[], Optional[float]],
+        delay: float = 0.0,
+        name: Optional[str] = None
+    ) -> ScheduledPoll:
+        """
+        Register a periodic callback
+
+        Args:
+            callback: Called on a worker thread; returns seconds until the
+                next call, or None to stop
+            delay: Seconds until the first call
+            name: Label for logs
+
+        Returns:
+            ScheduledPoll handle (wake/cancel)
+
+        Raises:
+            RuntimeError: If the scheduler has been shut down
+        """
+        job = ScheduledPoll(self, callback, name or getattr(callback, "__name__", "poll"))
+
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule on a shut down PollScheduler")
+            self._jobs += 1
+            self._push(job, delay)
+
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get scheduler statistics
+
+        Returns:
+            Dictionary with workers, jobs (scheduled callbacks), running,
+            runs, errors, max_lateness and avg_lateness (seconds between a
+            callback's due time and its start)
+        """
+        with self._cond:
+            runs = self._stats["runs"]
+            return {
+                "workers": self.workers,
+                "jobs": self._jobs,
+                "running": self._running,
+                "runs": runs,
+                "errors": self._stats["errors"],
+                "max_lateness": self._stats["max_lateness"],
+                "avg_lateness": self._stats["lateness_total"] / runs if runs else 0.0,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the scheduler; scheduled callbacks are dropped
+
+        Args:
+            wait: Wait for running callbacks and worker threads to finish
+        """
+        with self._cond:
+            self._shutdown = True
+            self._heap.clear()
+            self._cond.notify_all()
+
+        if wait:
+            for thread in self._threads:
+                if thread is not threading.current_thread():
+                    thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    def _push(self, job: ScheduledPoll, delay: float) -> None:
+        """Queue the next run of job (condition held)"""
+        job._version += 1
+        job._delay = delay
+        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), job._version, job))
+        self._cond.notify()
+
+    def _wake(self, job: ScheduledPoll) -> None:
+        with self._cond:
+            if job._cancelled or self._shutdown:
+                return
+            if job._runner is not None:
+                # Running now: run again right after
+                job._woken = True
+            else:
+                self._push(job, 0.0)
+
+    def _cancel(self, job: ScheduledPoll, wait: bool) -> None:
+        with self._cond:
+            if not job._cancelled:
+                job._cancelled = True
+                job._version += 1
+                self._jobs -= 1
+            if wait:
+                while job._runner is not None and job._runner != threading.get_ident():
+                    self._cond.wait()
+
+    def _next_job(self) -> Optional[ScheduledPoll]:
+        """Wait for the next due callback (condition held)"""
+        while not self._shutdown:
+            if not self._heap:
+                self._cond.wait()
+                continue
+
+            due, _, version, job = self._heap[0]
+            now = time.monotonic()
+            if due > now:
+                self._cond.wait(timeout=due - now)
+                continue
+
+            heapq.heappop(self._heap)
+            if job._cancelled or version != job._version:
+                continue
+
+            lateness = now - due
+            self._stats["lateness_total"] += lateness
+            self._stats["max_lateness"] = max(self._stats["max_lateness"], lateness)
+            return job
+
+        return None
+
+    def _worker(self) -> None:
+        """Worker thread main loop"""
+        while True:
+            with self._cond:
+                job = self._next_job()
+                if job is None:
+                    return
+                job._runner = threading.get_ident()
+                job._woken = False
+                self._running += 1
+
+            delay: Optional[float] = job._delay
+            try:
+                delay = job._callback()
+            except Exception as e:
+                logger.error(f"Scheduled poll {job.name} failed: {e}")
+                with self._cond:
+                    self._stats["errors"] += 1
+
+            with self._cond:
+                job._runner = None
+                job.runs += 1
+                self._running -= 1
+                self._stats["runs"] += 1
+
+                if not job._cancelled and not self._shutdown:
+                    if delay is None:
+                        job._cancelled = True
+                        self._jobs -= 1
+                    else:
+                        self._push(job, 0.0 if job._woken else delay)
+                # Wake cancel() waiters along with the workers
+                self._cond.notify_all()
+
+
+_shared_lock = threading.Lock()
+_shared_scheduler: Optional[PollScheduler] = None
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def shared_scheduler() -> PollScheduler:
+    """Process-wide PollScheduler (created on first use)"""
+    global _shared_scheduler
+    with _shared_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = PollScheduler(workers=SHARED_WORKERS, name="SharedPollScheduler")
+        return _shared_scheduler
+
+
+def shared_event_loop() -> asyncio.AbstractEventLoop:
+    """Process-wide asyncio event loop running in a daemon thread (created on first use)"""
+    global _shared_loop
+    with _shared_lock:
+        if _shared_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, daemon=True, name="SharedEventLoop"
+            ).start()
+            _shared_loop = loop
+        return _shared_loop
@@ -0,0 +1,346 @@
+"""
+Schema-Compiled State Decoder
+
+Declares the sensor JSON fields that make up an AgentState and compiles
+that declaration once into a specialised decoder function. The decoder
+coerces and validates every field, collects field-level errors and falls
+back to the field default on error, so malformed sensor output still
+yields a partial state.
+
+Decoded objects are created without going through the frozen dataclass
+``__init__`` (which pays an ``object.__setattr__`` per field); value
+clamping from ``ContextWindowInfo.__post_init__`` is part of the schema.
+
+Example:
+    >>> state, errors = decode_agent_state({"context_window": {"tokens_used": "x"}}, "")
+    >>> state.context_window.tokens_used
+    0
+    >>> errors[0].path
+    'context_window.tokens_used'
+"""
+
+import dataclasses
+import math
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Tuple, List, Callable, Union, AbstractSet, FrozenSet
+
+from .state import AgentState, WorkspaceInfo, GitInfo, ContextWindowInfo
+
+
+@dataclass(frozen=True)
+class Field:
+    """
+    A scalar field read from sensor JSON
+
+    Attributes:
+        key: Key in the sensor JSON object
+        type: Target type (str, int or bool)
+        default: Value used when the key is missing, null or invalid
+        attr: Attribute name on the target class (defaults to key)
+        minimum: Clamp lower bound for ints
+        maximum: Clamp upper bound for ints
+    """
+    key: str
+    type: type
+    default: Any
+    attr: Optional[str] = None
+    minimum: Optional[int] = None
+    maximum: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class Record:
+    """
+    A nested JSON object decoded into a dataclass
+
+    Attributes:
+        key: Key in the parent JSON object (None for the root record)
+        cls: Frozen dataclass to build
+        fields: Field and Record members
+        attr: Attribute name on the parent class (defaults to key)
+    """
+    key: Optional[str]
+    cls: type
+    fields: Tuple[Union[Field, "Record"], ...]
+    attr: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class FieldError:
+    """
+    A field that could not be decoded
+
+    Attributes:
+        path: Dotted path of the field in the sensor JSON
+        message: What was wrong
+        value: The offending value
+    """
+    path: str
+    message: str
+    value: Any = None
+
+    def __str__(self) -> str:
+        return f"{self.path or '<root>'}: {self.message} (got {self.value!r})"
+
+
+# Declarative schema of the sensor JSON document (see scripts/context_sensor.sh)
+AGENT_STATE_SCHEMA = Record(None, AgentState, (
+    Field("model", str, "Claude"),
+    Record("workspace", WorkspaceInfo, (
+        Field("path", str, ""),
+        Field("name", str, ""),
+        Record("git", GitInfo, (
+            Field("is_repo", bool, False),
+            Field("branch", str, ""),
+        )),
+    )),
+    Record("context_window", ContextWindowInfo, (
+        Field("max_tokens", int, 200000, minimum=0),
+        Field("tokens_used", int, 0, minimum=0),
+        Field("usage_pct", int, 0, minimum=0, maximum=100),
+    )),
+    Field("version", str, "1.0.0", attr="sensor_version"),
+))
+
+
+# ============================================================================
+# Coercion (slow path, only reached when a value has the wrong type)
+# ============================================================================
+
+_INVALID = object()
+
+
+def _coerce_str(value: Any) -> Any:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return _INVALID
+
+
+def _coerce_int(value: Any) -> Any:
+    # Finite floats are truncated like the sensor's integer arithmetic
+    if isinstance(value, bool):
+        return _INVALID
+    if isinstance(value, float):
+        return int(value) if math.isfinite(value) else _INVALID
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            pass
+        try:
+            number = float(value)
+        except ValueError:
+            return _INVALID
+        return int(number) if math.isfinite(number) else _INVALID
+    return _INVALID
+
+
+def _coerce_bool(value: Any) -> Any:
+    if value in ("true", "false"):
+        return value == "true"
+    if value.__class__ is int and value in (0, 1):
+        return bool(value)
+    return _INVALID
+
+
+_COERCERS = {str: _coerce_str, int: _coerce_int, bool: _coerce_bool}
+
+
+# ============================================================================
+# Compiler
+# ============================================================================
+
+class _Compiler:
+    """Generates the source of a decoder function for a root Record"""
+
+    def __init__(self, root: Record, params: Tuple[str, ...]):
+        self.root = root
+        self.params = params
+        self.lines: List[str] = []
+        self.namespace: Dict[str, Any] = {
+            "_EMPTY": {},
+            "_INVALID": _INVALID,
+            "_new": object.__new__,
+            "_FieldError": FieldError,
+        }
+        self.counter = 0
+
+    def name(self, prefix: str) -> str:
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def constant(self, value: Any) -> str:
+        """Reference a value from the generated code"""
+        name = self.name("_c")
+        self.namespace[name] = value
+        return name
+
+    def emit(self, line: str, indent: int = 1) -> None:
+        self.lines.append("    " * indent + line)
+
+    def compile(self) -> Callable[..., Tuple[Any, List[FieldError]]]:
+        self.lines.append(f"def decode(data, {', '.join(self.params)}):")
+        self.emit("errors = []")
+        # Dict subclasses (registry.GroupDocument) are accepted at the root only
+        self.emit("if data.__class__ is not dict and not isinstance(data, dict):")
+        self.emit("if data is not None:", 2)
+        self.emit("errors.append(_FieldError('', 'expected object', data))", 3)
+        self.emit("data = _EMPTY", 2)
+        root = self.record(self.root, "data", "")
+        self.emit(f"return {root}, errors")
+
+        source = "\n".join(self.lines)
+        exec(compile(source, f"<schema decoder {self.root.cls.__name__}>", "exec"), self.namespace)
+        decode = self.namespace["decode"]
+        decode.__source__ = source
+        return decode
+
+    def record(self, record: Record, source: str, path: str) -> str:
+        """Emit code decoding record members from dict variable `source`"""
+        values: Dict[str, str] = {}
+
+        for member in record.fields:
+            attr = member.attr or member.key
+            member_path = f"{path}.{member.key}" if path else member.key
+
+            if isinstance(member, Record):
+                child = self.name("d")
+                self.emit(f"{child} = {source}.get({member.key!r}, _EMPTY)")
+                self.emit(f"if {child}.__class__ is not dict:")
+                self.emit(f"if {child} is not None:", 2)
+                self.emit(
+                    f"errors.append(_FieldError({member_path!r}, 'expected object', {child}))", 3
+                )
+                self.emit(f"{child} = _EMPTY", 2)
+                values[attr] = self.record(member, child, member_path)
+            else:
+                values[attr] = self.field(member, source, member_path)
+
+        # Attributes not in the schema: decoder parameters, then class defaults
+        for dc_field in dataclasses.fields(record.cls):
+            if dc_field.name in values:
+                continue
+            if record is self.root and dc_field.name in self.params:
+                values[dc_field.name] = dc_field.name
+            elif dc_field.default is not dataclasses.MISSING:
+                values[dc_field.name] = self.constant(dc_field.default)
+            else:
+                values[dc_field.name] = f"{self.constant(dc_field.default_factory)}()"
+
+        # Store attributes straight into the instance dict (bypasses the
+        # frozen dataclass __setattr__ guard used by __init__)
+        obj = self.name("o")
+        self.emit(f"{obj} = _new({self.constant(record.cls)})")
+        self.emit(f"_attrs = {obj}.__dict__")
+        for attr, value in values.items():
+            self.emit(f"_attrs[{attr!r}] = {value}")
+        return obj
+
+    def field(self, spec: Field, source: str, path: str) -> str:
+        """Emit code decoding one scalar field; returns the variable name"""
+        var = self.name("v")
+        default = self.constant(spec.default)
+        coerce = self.constant(_COERCERS[spec.type])
+        type_name = spec.type.__name__
+
+        self.emit(f"{var} = {source}.get({spec.key!r}, {default})")
+        # Fast path: exact type (bool is excluded from int by the class check)
+        self.emit(f"if {var}.__class__ is not {type_name}:")
+        self.emit(f"if {var} is None:", 2)
+        self.emit(f"{var} = {default}", 3)
+        self.emit("else:", 2)
+        self.emit(f"_value = {coerce}({var})", 3)
+        self.emit("if _value is _INVALID:", 3)
+        self.emit(
+            f"errors.append(_FieldError({path!r}, 'expected {type_name}', {var}))", 4
+        )
+        self.emit(f"_value = {default}", 4)
+        self.emit(f"{var} = _value", 3)
+
+        if spec.minimum is not None:
+            self.emit(f"if {var} < {spec.minimum!r}:")
+            self.emit(f"{var} = {spec.minimum!r}", 2)
+        if spec.maximum is not None:
+            self.emit(f"if {var} > {spec.maximum!r}:")
+            self.emit(f"{var} = {spec.maximum!r}", 2)
+
+        return var
+
+
+def compile_decoder(
+    schema: Record,
+    params: Tuple[str, ...] = ()
+) -> Callable[..., Tuple[Any, List[FieldError]]]:
+    """
+    Compile a schema into a decoder function
+
+    Args:
+        schema: Root Record describing the JSON document
+        params: Decoder arguments assigned to same-named root attributes
+
+    Returns:
+        Function ``decode(data, *params) -> (object, [FieldError, ...])``
+    """
+    return _Compiler(schema, params).compile()
+
+
+_decode_agent_state = compile_decoder(AGENT_STATE_SCHEMA, params=("display",))
+
+
+def decode_agent_state(
+    sensor_data: Any,
+    display_string: str
+) -> Tuple[AgentState, List[FieldError]]:
+    """
+    Decode sensor JSON into a validated AgentState
+
+    Args:
+        sensor_data: Parsed JSON data from the sensor
+        display_string: Display string from the sensor
+
+    Returns:
+        Tuple of (AgentState, field errors). Invalid fields take their
+        default value, so the state is always usable.
+    """
+    return _decode_agent_state(sensor_data, display_string.strip())
+
+
+# Partial decoders keyed by the top-level keys they decode, with the
+# AgentState attributes they carry over from the previous state
+_partial_decoders: Dict[FrozenSet[str], Tuple[Callable[..., Any], Tuple[str, ...]]] = {}
+
+
+def decode_partial_state(
+    sensor_data: Dict[str, Any],
+    display_string: str,
+    previous: AgentState,
+    keys: AbstractSet[str]
+) -> Tuple[AgentState, List[FieldError]]:
+    """
+    Decode only some top-level keys of the sensor JSON
+
+    The sub-objects of all other keys are reused from ``previous``. Used
+    when the sensor reports which parts of its document were recollected
+    (see registry.GroupDocument).
+
+    Args:
+        sensor_data: Parsed JSON data from the sensor
+        display_string: Display string from the sensor
+        previous: State the unlisted keys are carried over from
+        keys: Top-level keys of the sensor JSON to decode
+
+    Returns:
+        Tuple of (AgentState, field errors), as for decode_agent_state
+    """
+    keys = frozenset(keys)
+    entry = _partial_decoders.get(keys)
+    if entry is None:
+        members = tuple(m for m in AGENT_STATE_SCHEMA.fields if m.key in keys)
+        kept = tuple(m.attr or m.key for m in AGENT_STATE_SCHEMA.fields if m.key not in keys)
+        decode = compile_decoder(Record(None, AgentState, members), params=("display",) + kept)
+        entry = _partial_decoders[keys] = (decode, kept)
+
+    decode, kept = entry
+    return decode(
+        sensor_data, display_string.strip(), *(getattr(previous, attr) for attr in kept)
+    )
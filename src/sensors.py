@@ -0,0 +1,857 @@
+"""
+Sensor Backends
+
+This module defines the pluggable sensor interface used by the ContextAgent
+and the built-in backends:
+
+- SubprocessSensor: runs an external sensor script (scripts/context_sensor.sh)
+  once per call. Works with any custom sensor that follows the
+  STDIN JSON / STDOUT display / STDERR JSON contract.
+- NativeSensor: pure-Python implementation of the bundled sensor script.
+  Produces the same display string and structured data without spawning
+  bash, jq or git.
+- CoprocessSensor (coprocess.py): keeps one sensor process alive and talks
+  to it over a line-delimited protocol.
+
+Every backend returns a ``(stdout, stderr)`` tuple so the agent's parsing
+and change detection work identically regardless of the backend. Backends
+that receive protocol frames (framed, batch, coprocess) return the decoded
+data object in place of the JSON string.
+"""
+
+import os
+import errno
+import json
+import logging
+import select
+import shutil
+import signal
+import selectors
+import subprocess
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple, List, Union, Sequence, Callable, TYPE_CHECKING
+
+from .metrics import ResourceAccounting, can_reap_with_usage, wait_child
+
+if TYPE_CHECKING:
+    from .priority import SensorPriority
+    from .spawner import SensorSpawner
+
+
+logger = logging.getLogger(__name__)
+
+
+SENSOR_VERSION = "1.0.0"
+DEFAULT_MAX_TOKENS = 200000
+
+# Supported values for the ``sensor_backend`` setting
+SENSOR_BACKENDS = ("subprocess", "framed", "native", "coprocess", "registry")
+
+# Bytes read from a sensor pipe at a time while streaming frames
+_READ_CHUNK = 32768
+
+
+class SensorError(Exception):
+    """Raised when sensor execution fails"""
+    pass
+
+
+# Structured sensor data: the JSON document, or the object already decoded
+# from a protocol frame
+SensorData = Union[str, Dict[str, Any]]
+
+# Per-input batch result: (stdout, stderr), or the error for that input
+BatchResult = Union[Tuple[str, SensorData], SensorError]
+
+
+class Sensor(ABC):
+    """
+    Base class for sensor backends
+
+    A sensor receives optional JSON-compatible input and returns the raw
+    ``(stdout, stderr)`` pair: the display string and the structured JSON
+    document describing the current context (or the decoded document, see
+    SensorData).
+    """
+
+    name = "sensor"
+
+    @property
+    @abstractmethod
+    def cwd(self) -> Path:
+        """Working directory the sensor inspects (git detection, default workspace)"""
+
+    @abstractmethod
+    def execute(
+        self,
+        input_data: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> Tuple[str, SensorData]:
+        """
+        Run the sensor once
+
+        Args:
+            input_data: Optional JSON data passed to the sensor
+            timeout: Optional execution timeout in seconds
+
+        Returns:
+            Tuple of (stdout, stderr): display string and sensor data
+
+        Raises:
+            SensorError: If sensor execution fails or times out
+        """
+
+    def execute_batch(
+        self,
+        inputs: Sequence[Optional[Dict[str, Any]]],
+        timeout: Optional[float] = None
+    ) -> List[BatchResult]:
+        """
+        Run the sensor for several inputs
+
+        The default runs execute() per input; backends that can evaluate
+        many inputs in one invocation override this.
+
+        Args:
+            inputs: Input data for each evaluation
+            timeout: Optional timeout in seconds per input
+
+        Returns:
+            One result per input, in order: (stdout, stderr), or the
+            SensorError raised for that input
+
+        Raises:
+            SensorError: If the batch as a whole fails
+        """
+        results: List[BatchResult] = []
+        for input_data in inputs:
+            try:
+                results.append(self.execute(input_data, timeout=timeout))
+            except SensorError as e:
+                results.append(e)
+        return results
+
+    def close(self) -> None:
+        """Release any resources held by the sensor"""
+
+
+class SubprocessSensor(Sensor):
+    """
+    Sensor backend that executes a sensor script per call
+
+    The script is spawned with the script's directory as working directory,
+    receives the input JSON on STDIN and must exit with status 0. Batches
+    use the script's ``--batch`` mode: NDJSON inputs on STDIN, one protocol
+    frame per input on STDOUT.
+
+    In framed mode (``--framed <protocol>``) the script writes a single
+    result frame to STDOUT instead of splitting display and data across
+    STDOUT/STDERR. Frames are decoded from bytes as STDOUT chunks arrive,
+    the decoded data object is returned as is and STDERR is only logged
+    as diagnostics.
+
+    With a SensorSpawner the script is launched by the spawner's helper
+    process instead of being forked from the agent.
+
+    CPU time and peak memory of every script run (including the jq/git
+    processes it waits for) are aggregated in ``usage``, per workspace.
+    An optional SensorPriority lowers the script's CPU/I/O priority.
+    """
+
+    name = "subprocess"
+
+    def __init__(
+        self,
+        sensor_path: str,
+        cwd: Optional[str] = None,
+        framed: bool = False,
+        spawner: Optional["SensorSpawner"] = None,
+        priority: Optional["SensorPriority"] = None
+    ):
+        """
+        Initialize SubprocessSensor
+
+        Args:
+            sensor_path: Path to the sensor script
+            cwd: Working directory for the script (defaults to the script's directory)
+            framed: Use the single-stream framed output protocol
+            spawner: Optional SensorSpawner that launches the script
+            priority: Optional CPU/I/O priority applied to the script
+        """
+        self._path = Path(sensor_path)
+        self._cwd = Path(cwd) if cwd is not None else None
+        self._framed = framed
+        self._spawner = spawner
+        self._priority = priority
+        self.usage = ResourceAccounting()
+
+        if framed:
+            self.name = "framed"
+
+    @property
+    def path(self) -> Path:
+        """Path to the sensor script"""
+        return self._path
+
+    @path.setter
+    def path(self, value: str) -> None:
+        self._path = Path(value)
+
+    @property
+    def cwd(self) -> Path:
+        return self._cwd if self._cwd is not None else self._path.parent
+
+    def execute(
+        self,
+        input_data: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> Tuple[str, SensorData]:
+        if self._framed:
+            return self._execute_framed(input_data, timeout)
+
+        # Prepare input JSON
+        stdin_input = json.dumps(input_data or {})
+
+        logger.debug(f"Executing sensor: {self._path}")
+        logger.debug(f"Sensor input: {stdin_input}")
+
+        stdout, stderr = self._run(
+            [str(self._path)], stdin_input, timeout, usage_key=self._usage_key(input_data)
+        )
+
+        logger.debug(f"Sensor stdout: {stdout}")
+        logger.debug(f"Sensor stderr: {stderr}")
+
+        return stdout.strip(), stderr.strip()
+
+    def execute_batch(
+        self,
+        inputs: Sequence[Optional[Dict[str, Any]]],
+        timeout: Optional[float] = None
+    ) -> List[BatchResult]:
+        from .protocol import ProtocolError, result_from_message
+
+        if not inputs:
+            return []
+
+        # One NDJSON line per input
+        stdin_input = b"".join(
+            json.dumps(input_data or {}).encode("utf-8") + b"\n" for input_data in inputs
+        )
+        batch_timeout = timeout * len(inputs) if timeout is not None else None
+
+        logger.debug(f"Executing sensor batch of {len(inputs)}: {self._path}")
+
+        frames = self._run_framed([str(self._path), "--batch"], stdin_input, batch_timeout)
+        if len(frames) != len(inputs):
+            raise ProtocolError(
+                f"Sensor batch returned {len(frames)} results for {len(inputs)} inputs"
+            )
+
+        results: List[BatchResult] = []
+        for index, frame in enumerate(frames, start=1):
+            if frame.get("id") != index:
+                raise ProtocolError(
+                    f"Sensor batch result id {frame.get('id')} does not match input {index}"
+                )
+            try:
+                results.append(result_from_message(frame))
+            except ProtocolError:
+                raise
+            except SensorError as e:
+                results.append(e)
+
+        return results
+
+    def _execute_framed(
+        self,
+        input_data: Optional[Dict[str, Any]],
+        timeout: Optional[float]
+    ) -> Tuple[str, SensorData]:
+        """Run the script once in framed mode and convert its result frame"""
+        from .protocol import PROTOCOL_VERSION, ProtocolError, result_from_message
+
+        logger.debug(f"Executing sensor (framed): {self._path}")
+
+        frames = self._run_framed(
+            [str(self._path), "--framed", str(PROTOCOL_VERSION)],
+            json.dumps(input_data or {}).encode("utf-8"),
+            timeout,
+            usage_key=self._usage_key(input_data)
+        )
+        if len(frames) != 1:
+            raise ProtocolError(f"Framed sensor returned {len(frames)} frames, expected 1")
+
+        return result_from_message(frames[0])
+
+    def _run_framed(
+        self,
+        args: List[str],
+        stdin_input: bytes,
+        timeout: Optional[float],
+        usage_key: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Spawn the script in a framed mode and decode its STDOUT frames as they arrive"""
+        from .protocol import FrameDecoder
+
+        decoder = FrameDecoder()
+        frames: List[Dict[str, Any]] = []
+
+        _, stderr = self._run(
+            args, stdin_input, timeout, text=False, usage_key=usage_key,
+            on_stdout=lambda chunk: frames.extend(decoder.feed(chunk))
+        )
+
+        if stderr:
+            logger.debug(f"Sensor diagnostics: {stderr.decode('utf-8', 'replace').rstrip()}")
+
+        return frames + decoder.close()
+
+    def _run(
+        self,
+        args: List[str],
+        stdin_input: Union[str, bytes],
+        timeout: Optional[float],
+        text: bool = True,
+        usage_key: Optional[str] = None,
+        on_stdout: Optional[Callable[[bytes], None]] = None
+    ) -> Tuple[Any, Any]:
+        """
+        Spawn the sensor script once and return its raw (stdout, stderr)
+
+        With on_stdout (binary mode only) STDOUT is passed to the callback
+        in chunks as the script writes it, and the returned stdout is empty.
+        """
+        usage_key = usage_key or str(self.cwd)
+        try:
+            if self._priority is not None:
+                # Behind the wrappers a missing script would only surface
+                # as exit status 127
+                self._check_executable(args[0])
+                args = self._priority.wrap(args)
+
+            if self._spawner is not None:
+                returncode, stdout, stderr = self._spawn(
+                    args, stdin_input, timeout, text, usage_key
+                )
+                if on_stdout is not None:
+                    # The helper relays output once the script has exited
+                    on_stdout(stdout)
+                    stdout = b""
+            else:
+                returncode, stdout, stderr = self._popen(
+                    args, stdin_input, timeout, text, usage_key, on_stdout
+                )
+
+            # Check return code
+            if returncode != 0:
+                logger.warning(
+                    f"Sensor exited with non-zero code: {returncode}"
+                )
+                if not text:
+                    stderr = stderr.decode("utf-8", "replace")
+                logger.warning(f"Sensor stderr: {stderr}")
+                raise SensorError(
+                    f"Sensor failed with exit code {returncode}: {stderr}"
+                )
+
+            return stdout, stderr
+
+        except subprocess.TimeoutExpired:
+            raise SensorError(
+                f"Sensor execution timed out after {timeout}s"
+            )
+
+        except FileNotFoundError as e:
+            raise SensorError(f"Sensor script not found: {e}")
+        except PermissionError as e:
+            raise SensorError(f"Permission denied executing sensor: {e}")
+        except Exception as e:
+            if isinstance(e, SensorError):
+                raise
+            raise SensorError(f"Unexpected error executing sensor: {e}")
+
+    def _check_executable(self, command: str) -> None:
+        """
+        Raise like Popen would for a missing or non-executable script
+
+        Raises:
+            FileNotFoundError: If the script does not exist
+            PermissionError: If the script is not executable
+        """
+        if os.sep not in command:
+            # Looked up on PATH
+            if shutil.which(command) is None:
+                raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), command)
+            return
+
+        path = Path(command)
+        if not path.is_absolute():
+            path = self.cwd / path
+        if not path.is_file():
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), command)
+        if not os.access(path, os.X_OK):
+            raise PermissionError(errno.EACCES, os.strerror(errno.EACCES), command)
+
+    def _usage_key(self, input_data: Optional[Dict[str, Any]]) -> str:
+        """Workspace that resource usage is attributed to"""
+        workspace_path = (input_data or {}).get("workspace_path")
+        return workspace_path if isinstance(workspace_path, str) else str(self.cwd)
+
+    def _popen(
+        self,
+        args: List[str],
+        stdin_input: Union[str, bytes],
+        timeout: Optional[float],
+        text: bool,
+        usage_key: str,
+        on_stdout: Optional[Callable[[bytes], None]] = None
+    ) -> Tuple[int, Any, Any]:
+        """Fork the script from the agent process"""
+        process = subprocess.Popen(
+            args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=text,
+            cwd=str(self.cwd)
+        )
+        if not can_reap_with_usage(process):
+            return self._communicate(process, stdin_input, timeout, on_stdout)
+
+        # Drain the pipes and reap with wait4() ourselves: communicate()
+        # reaps with waitpid(), which discards the child's rusage
+        if isinstance(stdin_input, str):
+            stdin_input = stdin_input.encode("utf-8")
+        started = time.monotonic()
+        stdout = bytearray()
+        usage = None
+        try:
+            stderr = self._stream(process, stdin_input, timeout, on_stdout or stdout.extend)
+            usage = wait_child(
+                process,
+                max(timeout - (time.monotonic() - started), 0) if timeout is not None else None
+            )
+        except BaseException:
+            for pipe in (process.stdin, process.stdout, process.stderr):
+                pipe.close()
+            # Not process.kill(): it polls first, which would reap the
+            # child with waitpid() and lose its usage
+            try:
+                os.kill(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            usage = wait_child(process)
+            raise
+        finally:
+            if usage is not None:
+                self.usage.record(usage, usage_key)
+
+        if text:
+            return (
+                process.returncode,
+                stdout.decode("utf-8", "replace"),
+                stderr.decode("utf-8", "replace")
+            )
+        return process.returncode, bytes(stdout), stderr
+
+    @staticmethod
+    def _communicate(
+        process: subprocess.Popen,
+        stdin_input: Union[str, bytes],
+        timeout: Optional[float],
+        on_stdout: Optional[Callable[[bytes], None]]
+    ) -> Tuple[int, Any, Any]:
+        """Exchange data with communicate() where the usage cannot be captured"""
+        try:
+            stdout, stderr = process.communicate(
+                input=stdin_input,
+                timeout=timeout
+            )
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise
+
+        if on_stdout is not None:
+            on_stdout(stdout)
+            stdout = b""
+        return process.returncode, stdout, stderr
+
+    @staticmethod
+    def _stream(
+        process: subprocess.Popen,
+        stdin_input: bytes,
+        timeout: Optional[float],
+        on_stdout: Callable[[bytes], None]
+    ) -> bytes:
+        """
+        Write STDIN and read the process's output until both pipes close,
+        handing STDOUT chunks to on_stdout as they arrive
+
+        The process is not waited for.
+
+        Returns:
+            Collected STDERR
+
+        Raises:
+            subprocess.TimeoutExpired: If the pipes are still open after timeout
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        pending = memoryview(stdin_input)
+        stderr = bytearray()
+
+        with selectors.DefaultSelector() as selector:
+            if pending:
+                selector.register(process.stdin, selectors.EVENT_WRITE)
+            else:
+                process.stdin.close()
+            selector.register(process.stdout, selectors.EVENT_READ)
+            selector.register(process.stderr, selectors.EVENT_READ)
+
+            while selector.get_map():
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise subprocess.TimeoutExpired(process.args, timeout)
+
+                for key, _ in selector.select(remaining):
+                    if key.fileobj is process.stdin:
+                        try:
+                            written = os.write(key.fd, pending[:select.PIPE_BUF])
+                        except BrokenPipeError:
+                            written = len(pending)
+                        pending = pending[written:]
+                        if not pending:
+                            selector.unregister(process.stdin)
+                            process.stdin.close()
+                        continue
+
+                    chunk = os.read(key.fd, _READ_CHUNK)
+                    if not chunk:
+                        selector.unregister(key.fileobj)
+                        key.fileobj.close()
+                    elif key.fileobj is process.stdout:
+                        on_stdout(chunk)
+                    else:
+                        stderr += chunk
+
+        return bytes(stderr)
+
+    def _spawn(
+        self,
+        args: List[str],
+        stdin_input: Union[str, bytes],
+        timeout: Optional[float],
+        text: bool,
+        usage_key: str
+    ) -> Tuple[int, Any, Any]:
+        """Launch the script through the spawner helper"""
+        if text:
+            stdin_input = stdin_input.encode("utf-8")
+
+        returncode, stdout, stderr, rusage = self._spawner.run(
+            args, stdin_input, str(self.cwd), timeout=timeout
+        )
+        if rusage is not None:
+            self.usage.record(rusage, usage_key)
+
+        if text:
+            stdout = stdout.decode("utf-8", "replace")
+            stderr = stderr.decode("utf-8", "replace")
+        return returncode, stdout, stderr
+
+
+class NativeSensor(Sensor):
+    """
+    In-process implementation of scripts/context_sensor.sh
+
+    Mirrors the script's behavior field for field: the same input keys and
+    defaults, git detection relative to the working directory, integer
+    percentage arithmetic and display string layout. Git state is read
+    directly from the repository metadata (.git/HEAD) instead of running git.
+    """
+
+    name = "native"
+
+    def __init__(self, cwd: Optional[str] = None):
+        """
+        Initialize NativeSensor
+
+        Args:
+            cwd: Directory to inspect, equivalent to the script's working
+                directory (defaults to the current working directory)
+        """
+        self._cwd = _absolute_cwd(cwd)
+
+    @property
+    def cwd(self) -> Path:
+        return self._cwd
+
+    def execute(
+        self,
+        input_data: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> Tuple[str, str]:
+        display, data = self.sense(input_data)
+        return display, json.dumps(data)
+
+    def sense(self, input_data: Optional[Dict[str, Any]] = None) -> Tuple[str, Dict[str, Any]]:
+        """
+        Compute the display string and structured sensor data
+
+        Args:
+            input_data: Optional JSON data (same keys the sensor script reads)
+
+        Returns:
+            Tuple of (display string, sensor data dictionary)
+
+        Raises:
+            SensorError: If context window values are not integers
+        """
+        data = input_data if input_data is not None else {}
+
+        model = _json_get(data, ("model",), "Claude")
+        workspace_path = _json_get(data, ("workspace_path",), str(self._cwd))
+        workspace_name = _workspace_name(workspace_path)
+
+        git_dir = find_git_dir(self._cwd)
+        is_repo = git_dir is not None
+        git_branch = read_git_branch(git_dir) if git_dir is not None else ""
+
+        max_tokens = _to_int(
+            _json_get(data, ("context_window", "max_tokens"), str(DEFAULT_MAX_TOKENS)),
+            "context_window.max_tokens"
+        )
+        tokens_used = _to_int(
+            _json_get(data, ("context_window", "tokens_used"), "0"),
+            "context_window.tokens_used"
+        )
+        usage_pct = _percentage(tokens_used, max_tokens)
+
+        display = format_display(model, workspace_name, is_repo, git_branch, tokens_used, usage_pct)
+
+        sensor_data = {
+            "version": SENSOR_VERSION,
+            "model": model,
+            "workspace": {
+                "path": workspace_path,
+                "name": workspace_name,
+                "git": {
+                    "is_repo": is_repo,
+                    "branch": git_branch
+                }
+            },
+            "context_window": {
+                "max_tokens": max_tokens,
+                "tokens_used": tokens_used,
+                "usage_pct": usage_pct
+            }
+        }
+
+        return display, sensor_data
+
+
+def create_sensor(
+    backend: str,
+    sensor_path: str,
+    cwd: Optional[str] = None,
+    spawner: Optional["SensorSpawner"] = None,
+    priority: Optional["SensorPriority"] = None
+) -> Sensor:
+    """
+    Create a sensor backend by name
+
+    Args:
+        backend: Backend name ("subprocess", "framed", "native", "coprocess"
+            or "registry")
+        sensor_path: Path to the sensor script (used by the subprocess backend)
+        cwd: Working directory (defaults to the sensor script's directory so
+            both backends inspect the same location)
+        spawner: Optional SensorSpawner used by the subprocess and framed
+            backends to launch the script
+        priority: Optional CPU/I/O priority for process-based backends
+
+    Returns:
+        Sensor instance
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    if backend == "subprocess":
+        return SubprocessSensor(sensor_path, cwd=cwd, spawner=spawner, priority=priority)
+    if backend == "framed":
+        return SubprocessSensor(
+            sensor_path, cwd=cwd, framed=True, spawner=spawner, priority=priority
+        )
+    if backend == "native":
+        return NativeSensor(cwd=cwd if cwd is not None else str(Path(sensor_path).parent))
+    if backend == "coprocess":
+        from .coprocess import CoprocessSensor
+        return CoprocessSensor(sensor_path, cwd=cwd, priority=priority)
+    if backend == "registry":
+        from .registry import SensorRegistry
+        return SensorRegistry(cwd=cwd if cwd is not None else str(Path(sensor_path).parent))
+
+    raise ValueError(
+        f"Unknown sensor backend: {backend}. Use one of {list(SENSOR_BACKENDS)}"
+    )
+
+
+# ============================================================================
+# Git Helpers
+# ============================================================================
+
+def find_git_dir(start: Path) -> Optional[Path]:
+    """
+    Locate the git directory for a path, like `git rev-parse`
+
+    Walks up from ``start`` looking for a ``.git`` directory or a ``.git``
+    file (worktrees and submodules, ``gitdir: <path>``).
+
+    Args:
+        start: Directory to start searching from
+
+    Returns:
+        Path to the git directory, or None if not inside a repository
+    """
+    current = Path(start)
+
+    while True:
+        if current.name == ".git" and (current / "HEAD").is_file():
+            return current
+
+        dot_git = current / ".git"
+        if dot_git.is_dir():
+            if (dot_git / "HEAD").is_file():
+                return dot_git
+        elif dot_git.is_file():
+            git_dir = _read_gitdir_file(dot_git)
+            if git_dir is not None:
+                return git_dir
+
+        if current.parent == current:
+            return None
+        current = current.parent
+
+
+def read_git_branch(git_dir: Path) -> str:
+    """
+    Read the current branch name, like `git branch --show-current`
+
+    Args:
+        git_dir: Path to the git directory
+
+    Returns:
+        Branch name, or empty string for a detached HEAD
+    """
+    try:
+        head = (git_dir / "HEAD").read_text().strip()
+    except OSError:
+        return ""
+
+    prefix = "ref: refs/heads/"
+    if head.startswith(prefix):
+        return head[len(prefix):]
+    return ""
+
+
+def _read_gitdir_file(path: Path) -> Optional[Path]:
+    """Resolve a `gitdir: <path>` pointer file"""
+    try:
+        content = path.read_text().strip()
+    except OSError:
+        return None
+
+    if not content.startswith("gitdir:"):
+        return None
+
+    git_dir = Path(content[len("gitdir:"):].strip())
+    if not git_dir.is_absolute():
+        git_dir = path.parent / git_dir
+
+    return git_dir if (git_dir / "HEAD").is_file() else None
+
+
+# ============================================================================
+# Value Helpers
+# ============================================================================
+
+def format_display(
+    model: str,
+    workspace_name: str,
+    is_repo: bool,
+    git_branch: str,
+    tokens_used: int,
+    usage_pct: int
+) -> str:
+    """Build the display string (same layout as the sensor script)"""
+    display = f"[{model}]"
+    if workspace_name:
+        display += f" 📁 {workspace_name}"
+    if is_repo and git_branch:
+        display += f" 🌿 {git_branch}"
+    if tokens_used > 0:
+        display += f" | 📊 {usage_pct}%"
+    return display
+
+
+def _json_get(data: Any, keys: Tuple[str, ...], default: str) -> str:
+    """
+    Extract a field as a string, like `jq -r '.a.b // "default"'`
+
+    Missing, null and false values yield the default. Non-string values are
+    rendered the way jq prints them in raw mode.
+    """
+    value = data
+    for key in keys:
+        if not isinstance(value, dict):
+            return default
+        value = value.get(key)
+
+    if value is None or value is False:
+        return default
+    if isinstance(value, str):
+        return value
+    if value is True:
+        return "true"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (int, float)):
+        return str(value)
+    return json.dumps(value)
+
+
+def _to_int(value: str, field_name: str) -> int:
+    """Convert a sensor value to int, failing like the script's arithmetic"""
+    try:
+        return int(value)
+    except ValueError:
+        raise SensorError(f"Invalid integer value for {field_name}: {value!r}")
+
+
+def _percentage(used: int, max_tokens: int) -> int:
+    """Integer percentage with shell (truncating) division semantics"""
+    if max_tokens == 0:
+        return 0
+
+    numerator = used * 100
+    quotient = abs(numerator) // abs(max_tokens)
+    return quotient if (numerator >= 0) == (max_tokens > 0) else -quotient
+
+
+def _absolute_cwd(cwd: Optional[str]) -> Path:
+    """Absolute working directory of an in-process backend (symlinks kept, like $PWD)"""
+    return Path(os.path.abspath(cwd if cwd is not None else os.getcwd()))
+
+
+def _workspace_name(path: str) -> str:
+    """Directory name of the workspace, empty if it is not a directory"""
+    if not path or not os.path.isdir(path):
+        return ""
+
+    stripped = path.rstrip("/")
+    return os.path.basename(stripped) if stripped else "/"
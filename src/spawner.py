@@ -0,0 +1,312 @@
+"""
+Sensor Spawner Helper
+
+Launches sensor processes from a small, pre-started helper process instead
+of the agent itself, in the spirit of multiprocessing's forkserver. Process
+creation then forks the helper (a bare interpreter of a few MB) rather than
+the agent, so spawn latency no longer grows with the agent's memory.
+
+The agent talks to the helper over its STDIN/STDOUT with one JSON message
+per line. Binary payloads are base64 encoded:
+
+    request:  {"id": 1, "args": [...], "cwd": "...", "stdin": "<b64>", "timeout": 5.0}
+    response: {"id": 1, "returncode": 0, "timed_out": false,
+               "stdout": "<b64>", "stderr": "<b64>",
+               "rusage": {"user_time": 0.01, "system_time": 0.0, "max_rss_kb": 3400}}
+    error:    {"id": 1, "errno": 2, "error": "No such file or directory"}
+
+Requests are served concurrently by the helper, one thread each.
+
+On CPython 3.10+ for Linux, subprocess.Popen already uses vfork() when it
+can, which is cheap regardless of the agent's size. The helper pays off when
+Popen has to fork() (preexec_fn, older interpreters, other platforms); see
+benchmarks/bench_spawn.py.
+
+Example:
+    >>> spawner = SensorSpawner()
+    >>> sensor = SubprocessSensor("scripts/context_sensor.sh", spawner=spawner)
+    >>> spawner.close()
+"""
+
+import base64
+import itertools
+import json
+import logging
+import subprocess
+import sys
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Optional, Dict, Tuple, List
+
+from .metrics import ResourceUsage
+from .sensors import SensorError
+
+
+logger = logging.getLogger(__name__)
+
+
+# Extra time to wait for the helper beyond the sensor timeout (the helper
+# kills timed-out sensors itself and still answers)
+RESPONSE_GRACE = 5.0
+
+# Helper program, run with `python -I -S -c` so it imports nothing but the
+# standard library modules it needs
+_HELPER_SOURCE = r'''
+import base64, json, os, signal, subprocess, sys, threading, time
+
+lock = threading.Lock()
+out = sys.stdout.buffer
+
+def exchange(process, data, timeout):
+    # Drain the pipes without reaping: communicate() reaps with waitpid(),
+    # which discards the child's rusage
+    output = {}
+    def feed():
+        for write in (lambda: process.stdin.write(data), process.stdin.close):
+            try:
+                write()
+            except BrokenPipeError:
+                pass
+    def drain(name):
+        output[name] = getattr(process, name).read()
+    threads = [threading.Thread(target=feed, daemon=True)] + [
+        threading.Thread(target=drain, args=(name,), daemon=True)
+        for name in ("stdout", "stderr")]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    for thread in threads:
+        thread.join(max(deadline - time.monotonic(), 0) if deadline is not None else None)
+    usage = None
+    if not any(thread.is_alive() for thread in threads):
+        usage = reap(process, deadline)
+    if process.returncode is None:
+        # Not process.kill(): it polls first, reaping with waitpid()
+        os.kill(process.pid, signal.SIGKILL)
+        for thread in threads:
+            thread.join()
+        return True, output, reap(process, None)
+    return False, output, usage
+
+def reap(process, deadline):
+    # wait4() reports the rusage of the child and the descendants it waited for
+    while True:
+        try:
+            pid, status, ru = os.wait4(process.pid, os.WNOHANG if deadline is not None else 0)
+        except ChildProcessError:
+            process.returncode = 0
+            return None
+        if pid == process.pid:
+            process.returncode = (-os.WTERMSIG(status) if os.WIFSIGNALED(status)
+                                  else os.WEXITSTATUS(status))
+            return {"user_time": ru.ru_utime, "system_time": ru.ru_stime,
+                    "max_rss_kb": ru.ru_maxrss}
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(0.001)
+
+def reply(message):
+    data = json.dumps(message).encode() + b"\n"
+    with lock:
+        out.write(data)
+        out.flush()
+
+def handle(request):
+    rid = request["id"]
+    try:
+        process = subprocess.Popen(
+            request["args"], cwd=request["cwd"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        reply({"id": rid, "errno": e.errno, "error": e.strerror or str(e)})
+        return
+    timed_out, output, usage = exchange(
+        process, base64.b64decode(request["stdin"]), request["timeout"])
+    reply({"id": rid, "returncode": process.returncode, "timed_out": timed_out,
+           "stdout": base64.b64encode(output.get("stdout", b"")).decode(),
+           "stderr": base64.b64encode(output.get("stderr", b"")).decode(),
+           "rusage": usage})
+
+# Non-daemon threads: in-flight requests are answered before exit
+for line in sys.stdin.buffer:
+    threading.Thread(target=handle, args=(json.loads(line),)).start()
+'''
+
+
+class SensorSpawner:
+    """
+    Client for a pre-started sensor spawner helper process
+
+    Thread-safe. The helper is started on first use and restarted if it
+    exits; close() stops it.
+    """
+
+    def __init__(self, python: Optional[str] = None):
+        """
+        Initialize SensorSpawner
+
+        Args:
+            python: Interpreter for the helper (defaults to sys.executable)
+        """
+        self._python = python or sys.executable
+        self._lock = threading.Lock()
+        self._process: Optional[subprocess.Popen] = None
+        self._reader: Optional[threading.Thread] = None
+        # Requests awaiting a response from the current helper
+        self._pending: Dict[int, Future] = {}
+        self._ids = itertools.count(1)
+        self._closed = False
+
+    @property
+    def pid(self) -> Optional[int]:
+        """PID of the running helper, or None"""
+        with self._lock:
+            return self._process.pid if self._process is not None else None
+
+    def start(self) -> None:
+        """Start the helper now instead of on first use"""
+        with self._lock:
+            self._ensure_started()
+
+    def run(
+        self,
+        args: List[str],
+        stdin_input: bytes,
+        cwd: str,
+        timeout: Optional[float] = None
+    ) -> Tuple[int, bytes, bytes, Optional[ResourceUsage]]:
+        """
+        Run a command through the helper
+
+        Args:
+            args: Program and arguments
+            stdin_input: Bytes written to the command's STDIN
+            cwd: Working directory
+            timeout: Seconds before the helper kills the command
+
+        Returns:
+            Tuple of (returncode, stdout, stderr, usage); usage is the
+            command's ResourceUsage, or None where wait4 is unavailable
+
+        Raises:
+            subprocess.TimeoutExpired: If the command timed out (it has
+                been killed)
+            OSError: If the command could not be started (FileNotFoundError,
+                PermissionError, ...)
+            SensorError: If the helper is unavailable or stopped responding
+        """
+        future: Future = Future()
+        request = {
+            "args": [str(arg) for arg in args],
+            "cwd": cwd,
+            "stdin": base64.b64encode(stdin_input).decode("ascii"),
+            "timeout": timeout,
+        }
+
+        with self._lock:
+            if self._closed:
+                raise SensorError("Sensor spawner is closed")
+            self._ensure_started()
+            request["id"] = request_id = next(self._ids)
+            pending = self._pending
+            pending[request_id] = future
+            try:
+                self._process.stdin.write(json.dumps(request).encode("utf-8") + b"\n")
+                self._process.stdin.flush()
+            except OSError as e:
+                del pending[request_id]
+                raise SensorError(f"Sensor spawner is unavailable: {e}")
+
+        wait = timeout + RESPONSE_GRACE if timeout is not None else None
+        try:
+            response = future.result(timeout=wait)
+        except FutureTimeoutError:
+            with self._lock:
+                pending.pop(request_id, None)
+            raise SensorError("Sensor spawner did not respond")
+
+        if "errno" in response:
+            raise OSError(response["errno"], response["error"], request["args"][0])
+        if response["timed_out"]:
+            raise subprocess.TimeoutExpired(args, timeout)
+
+        rusage = response.get("rusage")
+        return (
+            response["returncode"],
+            base64.b64decode(response["stdout"]),
+            base64.b64decode(response["stderr"]),
+            ResourceUsage.from_rusage(rusage) if rusage is not None else None,
+        )
+
+    def close(self) -> None:
+        """Stop the helper process"""
+        with self._lock:
+            self._closed = True
+            process, self._process = self._process, None
+            reader, self._reader = self._reader, None
+
+        if process is None:
+            return
+
+        process.stdin.close()
+        try:
+            process.wait(timeout=RESPONSE_GRACE)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        if reader is not None:
+            reader.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _ensure_started(self) -> None:
+        """Start the helper if it is not running (lock held)"""
+        if self._process is not None and self._process.poll() is None:
+            return
+
+        if self._process is not None:
+            logger.warning(f"Sensor spawner exited ({self._process.returncode}), restarting")
+            self._process.stdin.close()
+
+        self._process = subprocess.Popen(
+            [self._python, "-I", "-S", "-c", _HELPER_SOURCE],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            close_fds=True
+        )
+        self._pending = {}
+        self._reader = threading.Thread(
+            target=self._read_responses,
+            args=(self._process, self._pending),
+            daemon=True,
+            name="SensorSpawnerReader"
+        )
+        self._reader.start()
+        logger.debug(f"Sensor spawner started (pid {self._process.pid})")
+
+    def _read_responses(self, process: subprocess.Popen, pending: Dict[int, Future]) -> None:
+        """Dispatch one helper's responses to waiting callers"""
+        for line in process.stdout:
+            try:
+                response = json.loads(line)
+            except ValueError:
+                logger.warning(f"Invalid sensor spawner response: {line[:200]!r}")
+                continue
+
+            with self._lock:
+                future = pending.pop(response.get("id"), None)
+            if future is not None:
+                future.set_result(response)
+
+        process.stdout.close()
+
+        # Helper exited: fail requests it will never answer
+        with self._lock:
+            orphaned = list(pending.values())
+            pending.clear()
+        for future in orphaned:
+            future.set_exception(SensorError("Sensor spawner exited"))
@@ -16,9 +16,13 @@ Example usage:
 """
 
 from dataclasses import dataclass, field, asdict
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AbstractSet
 from datetime import datetime
 import json
+import logging
+
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass(frozen=True)
@@ -171,33 +175,21 @@ class AgentState:
             display_string: Display string from sensor (via STDOUT)
 
         Returns:
-            AgentState instance
+            AgentState instance (fields with invalid values take their
+            defaults and are logged; see schema.decode_agent_state)
         """
-        workspace_data = sensor_data.get("workspace", {})
-        git_data = workspace_data.get("git", {})
-        context_data = sensor_data.get("context_window", {})
-
-        return cls(
-            model=sensor_data.get("model", "Claude"),
-            workspace=WorkspaceInfo(
-                path=workspace_data.get("path", ""),
-                name=workspace_data.get("name", ""),
-                git=GitInfo(
-                    is_repo=git_data.get("is_repo", False),
-                    branch=git_data.get("branch", "")
-                )
-            ),
-            context_window=ContextWindowInfo(
-                max_tokens=context_data.get("max_tokens", 200000),
-                tokens_used=context_data.get("tokens_used", 0),
-                usage_pct=context_data.get("usage_pct", 0)
-            ),
-            display=display_string.strip(),
-            last_updated=datetime.utcnow().isoformat(),
-            sensor_version=sensor_data.get("version", "1.0.0")
-        )
-
-    def has_changed(self, other: Optional["AgentState"]) -> bool:
+        from .schema import decode_agent_state
+
+        state, errors = decode_agent_state(sensor_data, display_string)
+        for error in errors:
+            logger.warning(f"Invalid sensor field {error}")
+        return state
+
+    def has_changed(
+        self,
+        other: Optional["AgentState"],
+        keys: Optional[AbstractSet[str]] = None
+    ) -> bool:
         """
         Check if state has changed compared to another state
 
@@ -206,6 +198,9 @@ class AgentState:
 
         Args:
             other: Previous AgentState to compare against (None = always changed)
+            keys: Top-level sensor keys ("model", "workspace",
+                "context_window") to compare; the others are known to be
+                unchanged (None = compare all)
 
         Returns:
             True if state has changed, False if identical
@@ -220,6 +215,8 @@ class AgentState:
             return True
 
         # Compare key fields (excluding timestamps)
+        if keys is not None:
+            return bool(self.get_changes(other, keys))
         return (
             self.model != other.model or
             self.workspace.name != other.workspace.name or
@@ -228,7 +225,11 @@ class AgentState:
             self.context_window.usage_pct != other.context_window.usage_pct
         )
 
-    def get_changes(self, other: Optional["AgentState"]) -> Dict[str, Any]:
+    def get_changes(
+        self,
+        other: Optional["AgentState"],
+        keys: Optional[AbstractSet[str]] = None
+    ) -> Dict[str, Any]:
         """
         Get specific changes between states
 
@@ -237,6 +238,7 @@ class AgentState:
 
         Args:
             other: Previous AgentState to compare against (None = initial state)
+            keys: Top-level sensor keys to compare (see has_changed)
 
         Returns:
             Dictionary of changed fields with old/new values
@@ -252,22 +254,28 @@ class AgentState:
 
         changes = {}
 
-        if self.model != other.model:
+        if (keys is None or "model" in keys) and self.model != other.model:
             changes["model"] = {"old": other.model, "new": self.model}
 
-        if self.workspace.name != other.workspace.name:
-            changes["workspace"] = {"old": other.workspace.name, "new": self.workspace.name}
-
-        if self.workspace.path != other.workspace.path:
-            changes["workspace_path"] = {"old": other.workspace.path, "new": self.workspace.path}
-
-        if self.workspace.git.branch != other.workspace.git.branch:
-            changes["branch"] = {"old": other.workspace.git.branch, "new": self.workspace.git.branch}
-
-        if self.context_window.usage_pct != other.context_window.usage_pct:
-            changes["context_usage"] = {
-                "old": other.context_window.usage_pct,
-                "new": self.context_window.usage_pct
-            }
+        if keys is None or "workspace" in keys:
+            if self.workspace.name != other.workspace.name:
+                changes["workspace"] = {"old": other.workspace.name, "new": self.workspace.name}
+
+            if self.workspace.path != other.workspace.path:
+                changes["workspace_path"] = {
+                    "old": other.workspace.path, "new": self.workspace.path
+                }
+
+            if self.workspace.git.branch != other.workspace.git.branch:
+                changes["branch"] = {
+                    "old": other.workspace.git.branch, "new": self.workspace.git.branch
+                }
+
+        if keys is None or "context_window" in keys:
+            if self.context_window.usage_pct != other.context_window.usage_pct:
+                changes["context_usage"] = {
+                    "old": other.context_window.usage_pct,
+                    "new": self.context_window.usage_pct
+                }
 
         return changes
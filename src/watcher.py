@@ -0,0 +1,387 @@
+"""
+Workspace Change Watcher
+
+Notices git and workspace changes as they happen instead of on the next
+poll. The watcher observes directories, not files: git updates ``HEAD`` and
+refs by renaming a ``.lock`` file over them, which replaces the inode a
+file watch would be attached to.
+
+- ``.git`` itself, filtered to ``HEAD`` and ``packed-refs`` (group "git")
+- every directory below ``.git/refs/heads`` (group "git")
+- the workspace directory, non-recursively (group "workspace")
+
+Two backends share the same interface:
+
+- InotifyWatcher: Linux inotify through ctypes; events are debounced so a
+  checkout that rewrites many refs produces one notification
+- StatWatcher: stdlib fallback that compares directory and file stat()
+  results every ``poll_interval`` seconds (no process is spawned)
+
+Example:
+    >>> watcher = create_watcher(watch_targets(Path(".")), lambda groups: print(groups))
+    >>> watcher.start()
+    >>> # git checkout -b feature  ->  {'git'}
+    >>> watcher.stop()
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable, List, Set, FrozenSet, NamedTuple, Tuple
+
+from .sensors import find_git_dir
+
+
+logger = logging.getLogger(__name__)
+
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+
+# struct inotify_event header: wd, mask, cookie, len
+_EVENT = struct.Struct("iIII")
+
+
+class WatchTarget(NamedTuple):
+    """A directory to watch and the state group its changes affect"""
+
+    path: Path
+    group: str
+    # Entry names that matter (None = any entry)
+    names: Optional[FrozenSet[str]] = None
+
+
+def watch_targets(cwd: Path, workspace_path: Optional[str] = None) -> List[WatchTarget]:
+    """
+    Directories whose changes affect the sensor state
+
+    Args:
+        cwd: Directory the sensor runs in (the git directory is found from it)
+        workspace_path: Workspace directory (defaults to cwd)
+
+    Returns:
+        List of WatchTarget
+    """
+    workspace = Path(workspace_path) if workspace_path else Path(cwd)
+    targets = [WatchTarget(workspace, "workspace")]
+
+    git_dir = find_git_dir(Path(cwd))
+    if git_dir is not None:
+        targets.append(WatchTarget(git_dir, "git", frozenset({"HEAD", "packed-refs"})))
+        heads = git_dir / "refs" / "heads"
+        for root, _, _ in os.walk(heads):
+            targets.append(WatchTarget(Path(root), "git"))
+
+    return targets
+
+
+class ChangeWatcher:
+    """
+    Base class of change watchers
+
+    Runs a background thread that calls ``callback`` with the set of groups
+    ("git", "workspace") that changed.
+    """
+
+    backend = "base"
+
+    def __init__(
+        self,
+        targets: List[WatchTarget],
+        callback: Callable[[Set[str]], None],
+        debounce: float = 0.05
+    ):
+        """
+        Initialize ChangeWatcher
+
+        Args:
+            targets: Directories to watch
+            callback: Called from the watcher thread with the changed groups
+            debounce: Quiet period in seconds before a burst of changes is
+                reported
+        """
+        self._targets = list(targets)
+        self._callback = callback
+        self._debounce = debounce
+        self._thread: Optional[threading.Thread] = None
+        self._pending: Set[str] = set()
+        self._stats = {"events": 0, "notifications": 0}
+
+    def start(self) -> None:
+        """Start watching"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, daemon=True, name=f"ChangeWatcher-{self.backend}"
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching and wait for the watcher thread"""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._signal_stop()
+            thread.join()
+        self._close()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get watcher statistics
+
+        Returns:
+            Dictionary with backend, watched directory count, raw events
+            and notifications delivered to the callback
+        """
+        return {"backend": self.backend, "targets": len(self._targets), **self._stats}
+
+    def _flush(self) -> None:
+        """Report pending groups to the callback"""
+        if not self._pending:
+            return
+        groups, self._pending = self._pending, set()
+        self._stats["notifications"] += 1
+        try:
+            self._callback(groups)
+        except Exception as e:
+            logger.error(f"Change watcher callback failed: {e}")
+
+    def _run(self) -> None:
+        raise NotImplementedError
+
+    def _signal_stop(self) -> None:
+        raise NotImplementedError
+
+    def _close(self) -> None:
+        """Release backend resources (after the thread has exited)"""
+
+
+def _load_libc() -> Optional[ctypes.CDLL]:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return libc
+
+
+_libc = _load_libc()
+
+
+class InotifyWatcher(ChangeWatcher):
+    """Change watcher backed by Linux inotify"""
+
+    backend = "inotify"
+
+    @staticmethod
+    def available() -> bool:
+        """Whether inotify can be used on this system"""
+        return _libc is not None
+
+    def __init__(
+        self,
+        targets: List[WatchTarget],
+        callback: Callable[[Set[str]], None],
+        debounce: float = 0.05
+    ):
+        """
+        Initialize InotifyWatcher
+
+        Args:
+            targets: Directories to watch
+            callback: Called from the watcher thread with the changed groups
+            debounce: Quiet period in seconds before a burst of changes is
+                reported
+
+        Raises:
+            OSError: If inotify is unavailable or the instance limit is reached
+        """
+        super().__init__(targets, callback, debounce)
+        if _libc is None:
+            raise OSError("inotify is not available")
+
+        self._fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 failed: {os.strerror(errno)}")
+
+        self._wake_r, self._wake_w = os.pipe()
+        self._watches: Dict[int, WatchTarget] = {}
+        for target in self._targets:
+            self._add_watch(target)
+
+    def _add_watch(self, target: WatchTarget) -> None:
+        wd = _libc.inotify_add_watch(self._fd, os.fsencode(str(target.path)), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            logger.debug(f"Cannot watch {target.path}: {os.strerror(errno)}")
+            return
+        self._watches[wd] = target
+
+    def _signal_stop(self) -> None:
+        os.write(self._wake_w, b"x")
+
+    def _close(self) -> None:
+        if self._fd < 0:
+            return
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            os.close(fd)
+        self._fd = -1
+
+    def _run(self) -> None:
+        poller = select.poll()
+        poller.register(self._fd, select.POLLIN)
+        poller.register(self._wake_r, select.POLLIN)
+
+        while True:
+            timeout = self._debounce * 1000 if self._pending else None
+            ready = poller.poll(timeout)
+            if not ready:
+                self._flush()
+                continue
+            if any(fd == self._wake_r for fd, _ in ready):
+                return
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                continue
+            self._handle(data)
+
+    def _handle(self, data: bytes) -> None:
+        """Map raw inotify events to pending groups"""
+        for wd, mask, name in _parse_events(data):
+            self._stats["events"] += 1
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped: assume everything changed
+                self._pending.update(target.group for target in self._targets)
+                continue
+
+            target = self._watches.get(wd)
+            if target is None:
+                continue
+            if mask & IN_IGNORED:
+                del self._watches[wd]
+                continue
+            if target.names is not None and name not in target.names:
+                continue
+
+            self._pending.add(target.group)
+
+            # New branch namespace directory (e.g. refs/heads/feature/)
+            if mask & IN_CREATE and mask & IN_ISDIR and target.group == "git" and target.names is None:
+                self._add_watch(WatchTarget(target.path / name, target.group))
+
+
+def _parse_events(data: bytes) -> List[Tuple[int, int, str]]:
+    """Split a read() buffer into (wd, mask, name) tuples"""
+    events = []
+    offset = 0
+    while offset + _EVENT.size <= len(data):
+        wd, mask, _, length = _EVENT.unpack_from(data, offset)
+        offset += _EVENT.size
+        name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "surrogateescape")
+        offset += length
+        events.append((wd, mask, name))
+    return events
+
+
+class StatWatcher(ChangeWatcher):
+    """Change watcher that polls stat() of the watched directories"""
+
+    backend = "stat"
+
+    def __init__(
+        self,
+        targets: List[WatchTarget],
+        callback: Callable[[Set[str]], None],
+        poll_interval: float = 1.0
+    ):
+        """
+        Initialize StatWatcher
+
+        Args:
+            targets: Directories to watch
+            callback: Called from the watcher thread with the changed groups
+            poll_interval: Seconds between stat() scans
+        """
+        super().__init__(targets, callback, debounce=0.0)
+        self._poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._snapshots = [self._snapshot(target) for target in self._targets]
+
+    @staticmethod
+    def _snapshot(target: WatchTarget) -> Tuple[Any, ...]:
+        paths = [target.path] + [target.path / name for name in sorted(target.names or ())]
+        result = []
+        for path in paths:
+            try:
+                st = path.stat()
+                result.append((st.st_ino, st.st_mtime_ns, st.st_size))
+            except OSError:
+                result.append(None)
+        return tuple(result)
+
+    def _signal_stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._poll_interval):
+            for index, target in enumerate(self._targets):
+                snapshot = self._snapshot(target)
+                if snapshot != self._snapshots[index]:
+                    self._snapshots[index] = snapshot
+                    self._stats["events"] += 1
+                    self._pending.add(target.group)
+            self._flush()
+
+
+def create_watcher(
+    targets: List[WatchTarget],
+    callback: Callable[[Set[str]], None],
+    debounce: float = 0.05,
+    poll_interval: float = 1.0
+) -> ChangeWatcher:
+    """
+    Create the best available change watcher
+
+    Args:
+        targets: Directories to watch
+        callback: Called from the watcher thread with the changed groups
+        debounce: Quiet period for the inotify backend
+        poll_interval: Scan interval for the stat() fallback
+
+    Returns:
+        InotifyWatcher where supported, otherwise StatWatcher
+    """
+    if InotifyWatcher.available():
+        try:
+            return InotifyWatcher(targets, callback, debounce=debounce)
+        except OSError as e:
+            logger.warning(f"inotify unavailable ({e}), falling back to stat() polling")
+    return StatWatcher(targets, callback, poll_interval=poll_interval)
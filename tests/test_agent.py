@@ -16,6 +16,7 @@ from pathlib import Path
 from src.agent import ContextAgent, SensorError
 from src.state import AgentState
 from src.events import EventType, StateChangeEvent
+from src.scheduler import PollScheduler
 
 
 class TestContextAgentInitialization:
@@ -729,6 +730,24 @@ class TestPollingFunctionality:
 
         assert not agent.is_running()
 
+    @patch.object(ContextAgent, '_execute_sensor')
+    def test_is_running_with_scheduler(self, mock_execute):
+        """Test is_running reports a poll scheduled on a PollScheduler"""
+        mock_execute.return_value = (
+            "[Claude] test",
+            '{"version": "1.0.0", "model": "Claude", "workspace": {"path": "/test", "name": "test", "git": {"is_repo": false, "branch": ""}}, "context_window": {"max_tokens": 200000, "tokens_used": 0, "usage_pct": 0}}'
+        )
+
+        with PollScheduler(workers=1) as scheduler:
+            agent = ContextAgent(scheduler=scheduler)
+            agent.start(polling_interval=1.0)
+
+            assert agent.is_running()
+
+            agent.stop()
+
+            assert not agent.is_running()
+
     @patch.object(ContextAgent, '_execute_sensor')
     def test_polling_executes_repeatedly(self, mock_execute):
         """Test that polling executes sensor at regular intervals"""
@@ -952,3 +971,285 @@ class TestPollingFunctionality:
         assert event.metadata["threshold"] == 90
         assert event.old_value == 85
         assert event.new_value == 92
+
+
+SENSOR_OUTPUT = (
+    "[Claude] 📁 test",
+    json.dumps({
+        "version": "1.0.0",
+        "model": "Claude",
+        "workspace": {"path": "/test", "name": "test", "git": {"is_repo": False, "branch": ""}},
+        "context_window": {"max_tokens": 200000, "tokens_used": 0, "usage_pct": 0}
+    })
+)
+
+
+class TestSingleFlight:
+    """Test coalescing of concurrent refreshes"""
+
+    def _run_concurrently(self, agent, count, input_data=None):
+        """Call get_state from several threads at once"""
+        results = []
+        errors = []
+        barrier = threading.Barrier(count)
+
+        def worker(index):
+            barrier.wait()
+            try:
+                data = input_data(index) if callable(input_data) else input_data
+                results.append(agent.get_state(input_data=data))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return results, errors
+
+    @patch.object(ContextAgent, '_execute_sensor')
+    def test_concurrent_refreshes_share_one_execution(self, mock_execute):
+        """Test concurrent callers with the same input share one sensor run"""
+        def slow_sensor(*args, **kwargs):
+            time.sleep(0.2)
+            return SENSOR_OUTPUT
+
+        mock_execute.side_effect = slow_sensor
+
+        agent = ContextAgent()
+        handler = Mock()
+        agent.on(EventType.STATE_UPDATED, handler)
+
+        results, errors = self._run_concurrently(agent, 8)
+
+        assert not errors
+        assert mock_execute.call_count == 1
+        assert all(state is results[0] for state in results)
+        handler.assert_called_once()
+
+        stats = agent.get_stats()
+        assert stats["refresh_requests"] == 8
+        assert stats["sensor_executions"] == 1
+        assert stats["coalesced_refreshes"] == 7
+
+    @patch.object(ContextAgent, '_execute_sensor')
+    def test_different_inputs_are_not_coalesced(self, mock_execute):
+        """Test refreshes with different input run separately"""
+        def slow_sensor(*args, **kwargs):
+            time.sleep(0.1)
+            return SENSOR_OUTPUT
+
+        mock_execute.side_effect = slow_sensor
+
+        agent = ContextAgent()
+        _, errors = self._run_concurrently(agent, 3, lambda i: {"model": f"model-{i}"})
+
+        assert not errors
+        assert mock_execute.call_count == 3
+        assert agent.get_stats()["coalesced_refreshes"] == 0
+
+    @patch.object(ContextAgent, '_execute_sensor')
+    def test_error_is_shared_with_waiting_callers(self, mock_execute):
+        """Test sensor failures propagate to every coalesced caller"""
+        def failing_sensor(*args, **kwargs):
+            time.sleep(0.2)
+            raise SensorError("Sensor failed")
+
+        mock_execute.side_effect = failing_sensor
+
+        agent = ContextAgent()
+        results, errors = self._run_concurrently(agent, 4)
+
+        assert not results
+        assert len(errors) == 4
+        assert all(isinstance(e, SensorError) for e in errors)
+        assert mock_execute.call_count == 1
+
+    @patch.object(ContextAgent, '_execute_sensor')
+    def test_sequential_refreshes_are_not_coalesced(self, mock_execute):
+        """Test completed executions are not reused by later refreshes"""
+        mock_execute.return_value = SENSOR_OUTPUT
+
+        agent = ContextAgent()
+        agent.get_state()
+        agent.get_state()
+
+        assert mock_execute.call_count == 2
+        assert agent.get_stats()["coalesced_refreshes"] == 0
+
+
+class TestStalenessBoundedReads:
+    """Test max_age bounded state reads"""
+
+    @patch.object(ContextAgent, '_execute_sensor')
+    def test_fresh_state_is_reused(self, mock_execute):
+        """Test reads within max_age do not run the sensor"""
+        mock_execute.return_value = SENSOR_OUTPUT
+
+        agent = ContextAgent()
+        first = agent.get_state()
+        second = agent.get_state(max_age=60)
+
+        assert second is first
+        assert mock_execute.call_count == 1
+
+    @patch.object(ContextAgent, '_execute_sensor')
+    def test_stale_state_is_refreshed(self, mock_execute):
+        """Test reads older than max_age run the sensor"""
+        mock_execute.return_value = SENSOR_OUTPUT
+
+        agent = ContextAgent()
+        agent.get_state()
+        time.sleep(0.05)
+        agent.get_state(max_age=0.01)
+
+        assert mock_execute.call_count == 2
+
+    @patch.object(ContextAgent, '_execute_sensor')
+    def test_different_input_is_refreshed(self, mock_execute):
+        """Test cached state is only reused for the same input"""
+        mock_execute.return_value = SENSOR_OUTPUT
+
+        agent = ContextAgent()
+        agent.get_state(input_data={"model": "a"})
+        agent.get_state(input_data={"model": "b"}, max_age=60)
+
+        assert mock_execute.call_count == 2
+
+    @patch.object(ContextAgent, '_execute_sensor')
+    def test_min_refresh_interval_is_default_max_age(self, mock_execute):
+        """Test min_refresh_interval bounds refreshes without explicit max_age"""
+        mock_execute.return_value = SENSOR_OUTPUT
+
+        agent = ContextAgent(min_refresh_interval=60)
+        for _ in range(5):
+            agent.get_display_string()
+
+        assert mock_execute.call_count == 1
+
+        agent.get_state(max_age=0)
+        assert mock_execute.call_count == 2
+
+    @patch.object(ContextAgent, '_execute_sensor')
+    def test_state_age(self, mock_execute):
+        """Test state age is measured from the last refresh"""
+        mock_execute.return_value = SENSOR_OUTPUT
+
+        agent = ContextAgent()
+        assert agent.get_state_age() is None
+        assert agent.last_refreshed_at is None
+
+        before = time.monotonic()
+        agent.get_state()
+
+        assert agent.last_refreshed_at >= before
+        assert 0 <= agent.get_state_age() < 1.0
+
+
+class TestUnchangedOutputShortCircuit:
+    """Test byte-identical sensor output skips parsing"""
+
+    @patch.object(ContextAgent, '_parse_sensor_output', autospec=True)
+    @patch.object(ContextAgent, '_execute_sensor')
+    def test_identical_output_is_not_parsed(self, mock_execute, mock_parse):
+        """Test identical output reuses the current state"""
+        mock_execute.return_value = SENSOR_OUTPUT
+        mock_parse.side_effect = lambda agent, stdout, stderr: AgentState.from_sensor_output(
+            json.loads(stderr), stdout
+        )
+
+        agent = ContextAgent()
+        first = agent.get_state()
+        confirmed_at = agent.last_refreshed_at
+        second = agent.get_state()
+
+        assert second is first
+        assert mock_parse.call_count == 1
+        assert mock_execute.call_count == 2
+        assert agent.last_refreshed_at >= confirmed_at
+        assert agent.get_stats()["unchanged_outputs"] == 1
+
+    @patch.object(ContextAgent, '_execute_sensor')
+    def test_changed_output_is_parsed(self, mock_execute):
+        """Test any output change produces a new state and events"""
+        changed = (SENSOR_OUTPUT[0] + " | 📊 10%", SENSOR_OUTPUT[1])
+        mock_execute.side_effect = [SENSOR_OUTPUT, changed]
+
+        agent = ContextAgent()
+        first = agent.get_state()
+        second = agent.get_state()
+
+        assert second is not first
+        assert second.display.endswith("10%")
+        assert agent.get_stats()["unchanged_outputs"] == 0
+
+    @patch.object(ContextAgent, '_execute_sensor')
+    def test_identical_output_emits_no_events(self, mock_execute):
+        """Test no change events are emitted for identical output"""
+        mock_execute.return_value = SENSOR_OUTPUT
+        events = []
+
+        agent = ContextAgent()
+        agent.get_state()
+        agent.on(EventType.STATE_UPDATED, events.append)
+        agent.get_state()
+
+        assert events == []
+
+
+class TestBatchStates:
+    """Test get_states batch evaluation"""
+
+    @patch.object(ContextAgent, '_execute_sensor_batch')
+    def test_states_in_input_order(self, mock_batch):
+        """Test each batch result maps to one state in order"""
+        other = (
+            "[GPT-4] 📁 workspace",
+            SENSOR_OUTPUT[1].replace('"model": "Claude"', '"model": "GPT-4"')
+        )
+        mock_batch.return_value = [SENSOR_OUTPUT, other]
+
+        agent = ContextAgent()
+        states = agent.get_states([{"model": "Claude"}, {"model": "GPT-4"}])
+
+        assert [state.model for state in states] == ["Claude", "GPT-4"]
+        assert mock_batch.call_count == 1
+        assert agent.get_stats()["batched_inputs"] == 2
+
+    @patch.object(ContextAgent, '_execute_sensor_batch')
+    def test_failed_input_raises(self, mock_batch):
+        """Test a failed input raises unless return_exceptions is set"""
+        mock_batch.return_value = [SENSOR_OUTPUT, SensorError("Sensor failed")]
+
+        agent = ContextAgent()
+
+        with pytest.raises(SensorError):
+            agent.get_states([{}, {}])
+
+        states = agent.get_states([{}, {}], return_exceptions=True)
+        assert isinstance(states[0], AgentState)
+        assert isinstance(states[1], SensorError)
+
+    @patch.object(ContextAgent, '_execute_sensor_batch')
+    def test_batch_does_not_touch_current_state(self, mock_batch):
+        """Test batch results do not replace the agent's own state"""
+        mock_batch.return_value = [SENSOR_OUTPUT]
+
+        agent = ContextAgent()
+        agent.get_states([{}])
+
+        assert agent._current_state is None
+
+    def test_real_sensor_batch(self):
+        """Test batches through the bundled sensor script"""
+        agent = ContextAgent()
+
+        states = agent.get_states([
+            {"model": "a", "context_window": {"max_tokens": 100, "tokens_used": 10}},
+            {"model": "b"},
+        ])
+
+        assert [state.model for state in states] == ["a", "b"]
+        assert states[0].context_window.usage_pct == 10
@@ -0,0 +1,167 @@
+"""
+Unit Tests for the Asyncio Sensor Runner
+
+Runs the same scenarios through ContextAgent (thread-based) and
+AsyncSensorRunner (asyncio-based) to check both produce identical
+states and errors.
+"""
+
+import pytest
+import asyncio
+import os
+import sys
+import textwrap
+import time
+
+from src.agent import ContextAgent
+from src.async_sensor import AsyncSensorRunner
+from src.sensors import SensorError
+
+
+def write_script(path, body: str):
+    """Write an executable Python sensor script"""
+    path.write_text(f"#!{sys.executable}\n" + textwrap.dedent(body))
+    path.chmod(0o755)
+    return path
+
+
+class ThreadRunner:
+    """Adapter running the sensor through ContextAgent"""
+
+    def __init__(self, sensor_path=None, sensor_timeout=5.0):
+        self.agent = ContextAgent(sensor_path=sensor_path, sensor_timeout=sensor_timeout)
+
+    def get_state(self, input_data=None):
+        try:
+            return self.agent._refresh_state(input_data, ContextAgent._input_key(input_data))
+        finally:
+            self.agent.close()
+
+
+class AsyncRunner:
+    """Adapter running the sensor through AsyncSensorRunner"""
+
+    def __init__(self, sensor_path=None, sensor_timeout=5.0):
+        self.runner = AsyncSensorRunner(sensor_path=sensor_path, sensor_timeout=sensor_timeout)
+
+    def get_state(self, input_data=None):
+        return asyncio.run(self.runner.get_state(input_data))
+
+
+@pytest.fixture(params=[ThreadRunner, AsyncRunner], ids=["thread", "async"])
+def runner_cls(request):
+    """Both sensor runners"""
+    return request.param
+
+
+@pytest.mark.sensor
+class TestRunnerEquivalence:
+    """Scenarios shared by both runners"""
+
+    def test_real_sensor_state(self, runner_cls):
+        """Test the bundled sensor produces the same state"""
+        input_data = {"model": "Claude", "context_window": {"max_tokens": 200000, "tokens_used": 50000}}
+
+        state = runner_cls().get_state(input_data)
+        expected = ContextAgent().get_state(input_data)
+
+        assert state.to_dict() | {"last_updated": None} == expected.to_dict() | {"last_updated": None}
+
+    def test_non_zero_exit(self, runner_cls, tmp_path):
+        """Test non-zero exit codes raise SensorError"""
+        script = write_script(tmp_path / "fail.py", """
+            import sys
+            sys.stderr.write("broken")
+            sys.exit(2)
+        """)
+
+        with pytest.raises(SensorError, match="Sensor failed with exit code 2: broken"):
+            runner_cls(sensor_path=str(script)).get_state()
+
+    def test_timeout(self, runner_cls, tmp_path):
+        """Test slow sensors time out"""
+        script = write_script(tmp_path / "slow.py", """
+            import time
+            time.sleep(5)
+        """)
+
+        with pytest.raises(SensorError, match="timed out after 0.2s"):
+            runner_cls(sensor_path=str(script), sensor_timeout=0.2).get_state()
+
+    def test_invalid_json_gives_partial_state(self, runner_cls, tmp_path):
+        """Test malformed JSON yields a partial state"""
+        script = write_script(tmp_path / "garbage.py", """
+            import sys
+            print("[Model] display")
+            sys.stderr.write("not json")
+        """)
+
+        state = runner_cls(sensor_path=str(script)).get_state()
+
+        assert state.display == "[Model] display"
+        assert state.workspace.path == ""
+
+    def test_missing_script(self, runner_cls, tmp_path):
+        """Test missing scripts are rejected at construction"""
+        with pytest.raises(FileNotFoundError):
+            runner_cls(sensor_path=str(tmp_path / "missing.sh"))
+
+
+@pytest.mark.sensor
+class TestAsyncSensorRunner:
+    """Asyncio-specific behavior"""
+
+    def test_concurrent_executions_share_one_loop(self, tmp_path):
+        """Test executions run concurrently on one event loop"""
+        script = write_script(tmp_path / "sleepy.py", """
+            import json, sys, time
+            request = json.load(sys.stdin)
+            time.sleep(0.3)
+            print("[" + request["model"] + "]")
+            sys.stderr.write(json.dumps({"model": request["model"]}))
+        """)
+        runner = AsyncSensorRunner(sensor_path=str(script))
+
+        start = time.monotonic()
+        states = asyncio.run(runner.get_states([{"model": f"m{i}"} for i in range(5)]))
+        elapsed = time.monotonic() - start
+
+        assert [state.model for state in states] == [f"m{i}" for i in range(5)]
+        assert elapsed < 1.2
+
+    def test_max_concurrency(self, tmp_path):
+        """Test max_concurrency bounds simultaneous processes"""
+        script = write_script(tmp_path / "sleepy.py", """
+            import time
+            time.sleep(0.2)
+        """)
+        runner = AsyncSensorRunner(sensor_path=str(script), max_concurrency=1)
+
+        start = time.monotonic()
+        asyncio.run(runner.get_states([{}, {}, {}]))
+
+        assert time.monotonic() - start >= 0.6
+
+    def test_cancellation_kills_process(self, tmp_path):
+        """Test cancelled executions do not leave the sensor running"""
+        pid_file = tmp_path / "pid"
+        script = write_script(tmp_path / "slow.py", f"""
+            import os, time
+            open({str(pid_file)!r}, "w").write(str(os.getpid()))
+            time.sleep(5)
+        """)
+        runner = AsyncSensorRunner(sensor_path=str(script))
+
+        async def cancel_soon():
+            task = asyncio.ensure_future(runner.execute())
+            while not pid_file.exists() or not pid_file.read_text():
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_soon())
+
+        pid = int(pid_file.read_text())
+        with pytest.raises(ProcessLookupError):
+            os.kill(pid, 0)
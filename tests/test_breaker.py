@@ -0,0 +1,229 @@
+"""
+Unit Tests for the Sensor Circuit Breaker
+
+Tests the breaker state machine, exponential backoff and its use by the
+ContextAgent poll loop.
+"""
+
+import pytest
+from unittest.mock import patch
+
+from src.agent import ContextAgent, SensorError
+from src.breaker import CircuitBreaker, BreakerState
+from src.events import EventType
+
+
+SENSOR_OUTPUT = (
+    "[Claude] 📁 workspace",
+    '{"version": "1.0.0", "model": "Claude", "workspace": {"path": "/tmp", "name": "workspace", '
+    '"git": {"is_repo": false, "branch": ""}}, "context_window": {"max_tokens": 200000, '
+    '"tokens_used": 0, "usage_pct": 0}}'
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_breaker(**kwargs):
+    clock = FakeClock()
+    kwargs.setdefault("jitter", 0.0)
+    breaker = CircuitBreaker(clock=clock, rng=lambda: 0.5, **kwargs)
+    return breaker, clock
+
+
+class TestCircuitBreaker:
+    """Test breaker state transitions and backoff"""
+
+    def test_invalid_threshold(self):
+        """Test threshold must be positive"""
+        with pytest.raises(ValueError):
+            CircuitBreaker(failure_threshold=0)
+
+    def test_opens_after_threshold(self):
+        """Test the circuit opens after N consecutive failures"""
+        breaker, _ = make_breaker(failure_threshold=3)
+
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state is BreakerState.CLOSED
+        assert breaker.allow()
+
+        breaker.record_failure()
+        assert breaker.state is BreakerState.OPEN
+        assert not breaker.allow()
+        assert breaker.remaining() == pytest.approx(10.0)
+
+    def test_success_resets_failure_count(self):
+        """Test a success in between failures keeps the circuit closed"""
+        breaker, _ = make_breaker(failure_threshold=2)
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state is BreakerState.CLOSED
+        assert breaker.consecutive_failures == 1
+
+    def test_half_open_probe_success_closes(self):
+        """Test a successful probe after the delay closes the circuit"""
+        breaker, clock = make_breaker(failure_threshold=1)
+        breaker.record_failure()
+
+        clock.now += 10.0
+        assert breaker.allow()
+        assert breaker.state is BreakerState.HALF_OPEN
+
+        breaker.record_success()
+        assert breaker.state is BreakerState.CLOSED
+        assert breaker.remaining() == 0.0
+
+    def test_half_open_admits_single_probe(self):
+        """Test only one caller probes until the probe's outcome is recorded"""
+        breaker, clock = make_breaker(failure_threshold=1)
+        breaker.record_failure()
+
+        clock.now += 10.0
+        assert breaker.allow()
+        assert not breaker.allow()
+        assert not breaker.allow()
+
+        breaker.record_failure()
+        assert breaker.state is BreakerState.OPEN
+
+        clock.now += breaker.remaining()
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.allow()
+
+    def test_backoff_grows_and_caps(self):
+        """Test failed probes double the delay up to max_delay"""
+        breaker, clock = make_breaker(failure_threshold=1, base_delay=10.0, max_delay=35.0)
+        delays = []
+
+        breaker.record_failure()
+        for _ in range(4):
+            delays.append(breaker.remaining())
+            clock.now += breaker.remaining()
+            assert breaker.allow()
+            breaker.record_failure()
+
+        assert delays == pytest.approx([10.0, 20.0, 35.0, 35.0])
+
+    def test_jitter_spreads_delay(self):
+        """Test jitter scales the delay within ±jitter"""
+        low = CircuitBreaker(failure_threshold=1, jitter=0.2, clock=FakeClock(), rng=lambda: 0.0)
+        high = CircuitBreaker(failure_threshold=1, jitter=0.2, clock=FakeClock(), rng=lambda: 0.999)
+
+        low.record_failure()
+        high.record_failure()
+
+        assert low.remaining() == pytest.approx(8.0)
+        assert high.remaining() == pytest.approx(12.0, rel=0.01)
+
+    def test_transition_callback(self):
+        """Test transitions are reported to the callback"""
+        calls = []
+        breaker, clock = make_breaker(
+            failure_threshold=1,
+            on_transition=lambda old, new, info: calls.append((old, new, info))
+        )
+
+        breaker.record_failure()
+        clock.now += 10.0
+        breaker.allow()
+        breaker.record_success()
+
+        assert [(old, new) for old, new, _ in calls] == [
+            (BreakerState.CLOSED, BreakerState.OPEN),
+            (BreakerState.OPEN, BreakerState.HALF_OPEN),
+            (BreakerState.HALF_OPEN, BreakerState.CLOSED),
+        ]
+        assert calls[0][2]["retry_in"] == pytest.approx(10.0)
+        assert calls[0][2]["consecutive_failures"] == 1
+
+    def test_snapshot(self):
+        """Test snapshot reports state and retry delay"""
+        breaker, _ = make_breaker(failure_threshold=1)
+        breaker.record_failure()
+
+        snapshot = breaker.snapshot()
+        assert snapshot["state"] == "open"
+        assert snapshot["consecutive_failures"] == 1
+        assert snapshot["retry_in"] == pytest.approx(10.0)
+
+
+class TestAgentCircuitBreaker:
+    """Test circuit breaker integration in ContextAgent"""
+
+    def test_breaker_disabled(self):
+        """Test threshold 0 disables the breaker"""
+        agent = ContextAgent(breaker_failure_threshold=0)
+
+        assert agent._breaker is None
+        assert "breaker" not in agent.get_stats()
+        assert agent._next_poll_delay(5.0) == 5.0
+
+    def test_poll_skipped_while_open(self):
+        """Test polls are skipped once the circuit opens"""
+        agent = ContextAgent(breaker_failure_threshold=2, breaker_base_delay=60.0)
+
+        with patch.object(agent, '_execute_sensor', side_effect=SensorError("boom")) as mock_exec:
+            for _ in range(5):
+                agent._poll_once()
+
+        assert mock_exec.call_count == 2
+        assert agent.get_stats()["breaker"]["state"] == "open"
+        assert agent._next_poll_delay(5.0) > 5.0
+
+    def test_success_closes_after_probe(self):
+        """Test a successful half-open probe resumes normal polling"""
+        agent = ContextAgent(breaker_failure_threshold=1)
+
+        with patch.object(agent, '_execute_sensor', side_effect=SensorError("boom")):
+            agent._poll_once()
+        assert agent._breaker.state is BreakerState.OPEN
+
+        agent._breaker._open_until = 0.0
+        with patch.object(agent, '_execute_sensor', return_value=SENSOR_OUTPUT):
+            agent._poll_once()
+
+        assert agent._breaker.state is BreakerState.CLOSED
+        assert agent._next_poll_delay(5.0) == 5.0
+
+    def test_probe_bypasses_result_cache(self):
+        """Test a half-open probe runs the sensor instead of reusing a cached result"""
+        agent = ContextAgent(breaker_failure_threshold=1, result_cache_size=8)
+
+        with patch.object(agent, '_execute_sensor', return_value=SENSOR_OUTPUT):
+            agent._poll_once()
+        agent._breaker.record_failure()
+        assert agent._breaker.state is BreakerState.OPEN
+
+        agent._breaker._open_until = 0.0
+        with patch.object(agent, '_execute_sensor', return_value=SENSOR_OUTPUT) as mock_exec:
+            agent._poll_once()
+
+        assert mock_exec.call_count == 1
+        assert agent._breaker.state is BreakerState.CLOSED
+
+    def test_transition_events_emitted(self):
+        """Test breaker transitions are emitted as events"""
+        agent = ContextAgent(breaker_failure_threshold=1)
+        events = []
+        agent.on(EventType.SENSOR_CIRCUIT_CHANGED, events.append)
+
+        with patch.object(agent, '_execute_sensor', side_effect=SensorError("boom")):
+            agent._poll_once()
+
+        assert len(events) == 1
+        assert events[0].old_value == "closed"
+        assert events[0].new_value == "open"
+        assert events[0].metadata["consecutive_failures"] == 1
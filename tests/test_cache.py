@@ -0,0 +1,146 @@
+"""
+Unit Tests for the Sensor Result Cache
+
+Tests LRU eviction, hit/miss statistics, filesystem fingerprints and
+the agent's use of the cache to skip unchanged sensor runs.
+"""
+
+import pytest
+import os
+import subprocess
+from unittest.mock import patch
+
+from src.agent import ContextAgent
+from src.cache import SensorResultCache, sensor_fingerprint, stat_fingerprint
+from src.sensors import NativeSensor
+
+
+SENSOR_OUTPUT = (
+    "[Claude] 📁 workspace",
+    '{"version": "1.0.0", "model": "Claude", "workspace": {"path": "/tmp", "name": "workspace", '
+    '"git": {"is_repo": false, "branch": ""}}, "context_window": {"max_tokens": 200000, '
+    '"tokens_used": 0, "usage_pct": 0}}'
+)
+
+
+class TestSensorResultCache:
+    """Test the LRU cache itself"""
+
+    def test_hit_and_miss_statistics(self):
+        """Test lookups are counted"""
+        cache = SensorResultCache(max_entries=4)
+
+        assert cache.get("a") is None
+        cache.put("a", ("out", "err"))
+        assert cache.get("a") == ("out", "err")
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["size"] == 1
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted"""
+        cache = SensorResultCache(max_entries=2)
+        cache.put("a", ("a", ""))
+        cache.put("b", ("b", ""))
+        cache.get("a")
+        cache.put("c", ("c", ""))
+
+        assert cache.get("b") is None
+        assert cache.get("a") == ("a", "")
+        assert len(cache) == 2
+        assert cache.stats()["evictions"] == 1
+
+    def test_invalid_size(self):
+        """Test non-positive sizes are rejected"""
+        with pytest.raises(ValueError, match="max_entries"):
+            SensorResultCache(max_entries=0)
+
+
+class TestFingerprints:
+    """Test filesystem fingerprints"""
+
+    def test_missing_path(self, tmp_path):
+        """Test missing paths fingerprint as None"""
+        assert stat_fingerprint(tmp_path / "missing") is None
+
+    def test_branch_switch_changes_fingerprint(self, temp_git_repo):
+        """Test checking out another branch invalidates the fingerprint"""
+        before = sensor_fingerprint(temp_git_repo)
+        assert sensor_fingerprint(temp_git_repo) == before
+
+        subprocess.run(
+            ["git", "checkout", "-b", "other"],
+            cwd=temp_git_repo, check=True, capture_output=True
+        )
+
+        assert sensor_fingerprint(temp_git_repo) != before
+
+    def test_workspace_change_changes_fingerprint(self, temp_non_repo):
+        """Test workspace directory changes invalidate the fingerprint"""
+        before = sensor_fingerprint(temp_non_repo)
+        (temp_non_repo / "new_file").write_text("x")
+        os.utime(temp_non_repo, ns=(0, 0))
+
+        assert sensor_fingerprint(temp_non_repo) != before
+
+
+class TestAgentResultCache:
+    """Test the agent's result cache integration"""
+
+    @patch.object(ContextAgent, '_execute_sensor')
+    def test_disabled_by_default(self, mock_execute):
+        """Test every refresh runs the sensor without a cache"""
+        mock_execute.return_value = SENSOR_OUTPUT
+
+        agent = ContextAgent()
+        agent.get_state()
+        agent.get_state()
+
+        assert mock_execute.call_count == 2
+        assert "result_cache" not in agent.get_stats()
+
+    @patch.object(ContextAgent, '_execute_sensor')
+    def test_unchanged_poll_skips_sensor(self, mock_execute):
+        """Test repeated refreshes with unchanged inputs hit the cache"""
+        mock_execute.return_value = SENSOR_OUTPUT
+
+        agent = ContextAgent(result_cache_size=8)
+        first = agent.get_state()
+        second = agent.get_state()
+
+        assert mock_execute.call_count == 1
+        assert second.display == first.display
+
+        stats = agent.get_stats()
+        assert stats["sensor_executions"] == 1
+        assert stats["result_cache"]["hits"] == 1
+        assert stats["result_cache"]["misses"] == 1
+
+    @patch.object(ContextAgent, '_execute_sensor')
+    def test_different_input_misses(self, mock_execute):
+        """Test inputs are part of the cache key"""
+        mock_execute.return_value = SENSOR_OUTPUT
+
+        agent = ContextAgent(result_cache_size=8)
+        agent.get_state(input_data={"model": "a"})
+        agent.get_state(input_data={"model": "b"})
+        agent.get_state(input_data={"model": "a"})
+
+        assert mock_execute.call_count == 2
+
+    def test_git_change_invalidates(self, temp_git_repo):
+        """Test a branch switch is picked up despite the cache"""
+        agent = ContextAgent(sensor=NativeSensor(cwd=str(temp_git_repo)), result_cache_size=8)
+
+        assert agent.get_state().workspace.git.branch in ("main", "master")
+
+        subprocess.run(
+            ["git", "checkout", "-b", "feature/cache"],
+            cwd=temp_git_repo, check=True, capture_output=True
+        )
+
+        assert agent.get_state().workspace.git.branch == "feature/cache"
+        assert agent.get_stats()["result_cache"]["hits"] == 0
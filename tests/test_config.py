@@ -232,6 +232,86 @@ class TestConfigurationValidation:
         with pytest.raises(ConfigurationError, match="sensor_timeout must be > 0"):
             AgentConfig(sensor_timeout=-1)
 
+    def test_invalid_sensor_backend(self):
+        """Should reject unknown sensor backends"""
+        with pytest.raises(ConfigurationError, match="sensor_backend must be one of"):
+            AgentConfig(sensor_backend="python")
+
+        assert AgentConfig(sensor_backend="native").sensor_backend == "native"
+
+    def test_invalid_min_refresh_interval(self):
+        """Should reject negative minimum refresh intervals"""
+        with pytest.raises(ConfigurationError, match="min_refresh_interval must be >= 0"):
+            AgentConfig(min_refresh_interval=-1)
+
+    def test_invalid_adaptive_timeout_settings(self):
+        """Should reject adaptive timeout bounds outside (0, sensor_timeout]"""
+        with pytest.raises(ConfigurationError, match="min_sensor_timeout"):
+            AgentConfig(sensor_timeout=1.0, min_sensor_timeout=2.0)
+
+        with pytest.raises(ConfigurationError, match="adaptive_timeout_factor"):
+            AgentConfig(adaptive_timeout_factor=0.5)
+
+    def test_invalid_breaker_settings(self):
+        """Should reject negative thresholds and inverted backoff bounds"""
+        with pytest.raises(ConfigurationError, match="breaker_failure_threshold"):
+            AgentConfig(breaker_failure_threshold=-1)
+
+        with pytest.raises(ConfigurationError, match="breaker_base_delay"):
+            AgentConfig(breaker_base_delay=60.0, breaker_max_delay=30.0)
+
+    def test_invalid_sensor_priority_settings(self):
+        """Should reject out-of-range niceness, unknown I/O classes and negative quotas"""
+        with pytest.raises(ConfigurationError, match="sensor_nice"):
+            AgentConfig(sensor_nice=20)
+
+        with pytest.raises(ConfigurationError, match="sensor_io_class"):
+            AgentConfig(sensor_io_class="realtime")
+
+        with pytest.raises(ConfigurationError, match="sensor_cpu_quota"):
+            AgentConfig(sensor_cpu_quota=-0.1)
+
+    def test_invalid_polling_interval_bounds(self):
+        """Should reject non-positive or inverted adaptive polling bounds"""
+        with pytest.raises(ConfigurationError, match="min_polling_interval must be > 0"):
+            AgentConfig(min_polling_interval=0)
+
+        with pytest.raises(ConfigurationError, match="max_polling_interval"):
+            AgentConfig(min_polling_interval=10.0, max_polling_interval=5.0)
+
+        with pytest.raises(ConfigurationError, match="watch_polling_interval must be > 0"):
+            AgentConfig(watch_polling_interval=0)
+
+        with pytest.raises(ConfigurationError, match="missed_poll_policy"):
+            AgentConfig(missed_poll_policy="drop")
+
+        with pytest.raises(ConfigurationError, match="idle_timeout must be >= 0"):
+            AgentConfig(idle_timeout=-1)
+
+    def test_invalid_poll_coordination(self):
+        """Should reject out-of-range jitter and lock slot counts"""
+        with pytest.raises(ConfigurationError, match="poll_jitter"):
+            AgentConfig(poll_jitter=1.0)
+
+        with pytest.raises(ConfigurationError, match="sensor_lock_slots must be >= 1"):
+            AgentConfig(sensor_lock_slots=0)
+
+    def test_invalid_pressure_limits(self):
+        """Should reject pressure limits outside [0, 100) and stretches below 1"""
+        with pytest.raises(ConfigurationError, match="pressure_cpu_limit"):
+            AgentConfig(pressure_cpu_limit=100)
+
+        with pytest.raises(ConfigurationError, match="pressure_io_limit"):
+            AgentConfig(pressure_io_limit=-1)
+
+        with pytest.raises(ConfigurationError, match="pressure_max_stretch must be >= 1"):
+            AgentConfig(pressure_max_stretch=0.5)
+
+    def test_invalid_result_cache_size(self):
+        """Should reject negative result cache sizes"""
+        with pytest.raises(ConfigurationError, match="result_cache_size must be >= 0"):
+            AgentConfig(result_cache_size=-1)
+
     def test_invalid_log_level(self):
         """Should reject invalid log levels"""
         with pytest.raises(ConfigurationError, match="log_level must be one of"):
@@ -0,0 +1,143 @@
+"""
+Unit Tests for Host-Wide Poll Coordination
+
+Tests poll phase offsets, the host-wide sensor lock and their use by
+ContextAgent.
+"""
+
+import threading
+import time
+
+import pytest
+from unittest.mock import patch
+
+from src.agent import ContextAgent
+from src.coordination import HostSensorLock, poll_phase
+
+
+SENSOR_OUTPUT = (
+    "[Claude] 📁 workspace",
+    '{"version": "1.0.0", "model": "Claude", "workspace": {"path": "/tmp", "name": "workspace", '
+    '"git": {"is_repo": false, "branch": ""}}, "context_window": {"max_tokens": 200000, '
+    '"tokens_used": 0, "usage_pct": 0}}'
+)
+
+
+class TestPollPhase:
+    """Test deterministic phase offsets"""
+
+    def test_deterministic_and_in_range(self):
+        """Test the same key always maps to the same offset within the interval"""
+        phase = poll_phase("/src/api", 5.0)
+
+        assert phase == poll_phase("/src/api", 5.0)
+        assert 0 <= phase < 5.0
+
+    def test_spreads_workspaces(self):
+        """Test many workspaces cover the interval roughly evenly"""
+        phases = [poll_phase(f"/src/project-{index}", 10.0) for index in range(1000)]
+        buckets = [0] * 10
+        for phase in phases:
+            buckets[int(phase)] += 1
+
+        assert min(buckets) > 50
+
+
+class TestHostSensorLock:
+    """Test the flock-based host-wide sensor lock"""
+
+    def test_invalid_slots(self, tmp_path):
+        """Test at least one slot is required"""
+        with pytest.raises(ValueError):
+            HostSensorLock(str(tmp_path / "sensors.lock"), slots=0)
+
+    def run_concurrently(self, lock, count=4):
+        active = []
+        peak = []
+        guard = threading.Lock()
+
+        @lock.wrap
+        def run():
+            with guard:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with guard:
+                active.pop()
+
+        threads = [threading.Thread(target=run) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return max(peak)
+
+    def test_serializes_runs(self, tmp_path):
+        """Test one slot admits one run at a time, across lock instances"""
+        path = str(tmp_path / "sensors.lock")
+        lock = HostSensorLock(path)
+
+        assert self.run_concurrently(lock) == 1
+        stats = lock.stats()
+        assert stats["acquisitions"] == 4
+        assert stats["contended"] >= 1
+        assert stats["avg_wait"] > 0
+
+        other = HostSensorLock(path)
+        with lock:
+            acquired = threading.Event()
+            thread = threading.Thread(target=lambda: (other.acquire(), acquired.set(), other.release()))
+            thread.start()
+            assert not acquired.wait(0.1)
+        thread.join(5.0)
+        assert acquired.is_set()
+
+    def test_slots_allow_parallel_runs(self, tmp_path):
+        """Test up to slots runs hold the lock at the same time"""
+        lock = HostSensorLock(str(tmp_path / "sensors.lock"), slots=2)
+
+        assert self.run_concurrently(lock) == 2
+
+
+class TestAgentCoordination:
+    """Test poll spreading and the host lock in ContextAgent"""
+
+    def test_sensor_runs_hold_host_lock(self, tmp_path):
+        """Test sensor execution goes through the host-wide lock"""
+        agent = ContextAgent(sensor_lock_path=str(tmp_path / "sensors.lock"), sensor_lock_slots=2)
+
+        with patch.object(agent._sensor, 'execute', return_value=SENSOR_OUTPUT):
+            agent.get_state()
+
+        stats = agent.get_stats()["host_lock"]
+        assert stats["slots"] == 2
+        assert stats["acquisitions"] == 1
+
+    def test_no_host_lock_by_default(self):
+        """Test the host lock is opt-in"""
+        assert "host_lock" not in ContextAgent().get_stats()
+
+    def test_invalid_jitter(self):
+        """Test poll_jitter must be a fraction below 1"""
+        with pytest.raises(ValueError):
+            ContextAgent(poll_jitter=1.5)
+
+    def test_first_poll_waits_for_phase(self):
+        """Test a phase-spread agent delays its first background poll"""
+        agent = ContextAgent(poll_phase_spread=True)
+        interval = 0.5
+        phase = poll_phase(agent._pool_key, interval)
+        started = []
+
+        with patch.object(agent, '_execute_sensor', return_value=SENSOR_OUTPUT) as mock_exec:
+            mock_exec.side_effect = lambda *args, **kwargs: started.append(time.monotonic()) or SENSOR_OUTPUT
+            agent.start(polling_interval=interval)
+            try:
+                deadline = time.monotonic() + 5.0
+                while len(started) < 2:
+                    assert time.monotonic() < deadline
+                    time.sleep(0.005)
+            finally:
+                agent.stop()
+
+        assert started[1] - started[0] >= phase - 0.05
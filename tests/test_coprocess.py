@@ -0,0 +1,262 @@
+"""
+Unit Tests for the Coprocess Sensor
+
+Tests the persistent sensor process, the line protocol handshake,
+restart-on-crash and per-request timeouts.
+"""
+
+import pytest
+import json
+import os
+import signal
+import sys
+import textwrap
+
+from src.agent import ContextAgent
+from src.coprocess import CoprocessSensor
+from src.protocol import (
+    FrameDecoder,
+    ProtocolError,
+    decode_message,
+    encode_message,
+    result_from_message,
+)
+from src.sensors import SubprocessSensor, SensorError
+
+
+def write_python_sensor(path, body: str):
+    """Write an executable Python coprocess sensor"""
+    path.write_text(f"#!{sys.executable}\n" + textwrap.dedent(body))
+    path.chmod(0o755)
+    return path
+
+
+ECHO_SENSOR = """
+import json, sys, time
+
+for line in sys.stdin:
+    message = json.loads(line)
+    if message["type"] == "hello":
+        reply = {"type": "hello", "protocol": message["protocol"], "version": "test"}
+    else:
+        request = message["input"]
+        if request.get("crash"):
+            sys.exit(3)
+        if request.get("sleep"):
+            time.sleep(request["sleep"])
+        if request.get("fail"):
+            reply = {"type": "error", "id": message["id"], "error": "boom"}
+        else:
+            reply = {
+                "type": "result",
+                "id": message["id"],
+                "display": "[Echo] " + str(request.get("model", "")),
+                "data": {"model": request.get("model", "Echo")},
+            }
+    sys.stdout.write(json.dumps(reply) + "\\n")
+    sys.stdout.flush()
+"""
+
+
+@pytest.fixture
+def echo_sensor(tmp_path):
+    """Custom coprocess sensor implemented in Python"""
+    sensor = CoprocessSensor(str(write_python_sensor(tmp_path / "echo_sensor.py", ECHO_SENSOR)), args=())
+    yield sensor
+    sensor.close()
+
+
+class TestProtocol:
+    """Test line protocol helpers"""
+
+    def test_encode_decode_roundtrip(self):
+        """Test messages survive encoding as a single line"""
+        line = encode_message({"type": "sense", "id": 1, "input": {"model": "a\nb"}})
+
+        assert line.endswith(b"\n")
+        assert line.count(b"\n") == 1
+        assert decode_message(line)["input"]["model"] == "a\nb"
+
+    def test_decode_rejects_invalid_messages(self):
+        """Test malformed lines raise ProtocolError"""
+        with pytest.raises(ProtocolError):
+            decode_message(b"not json")
+
+        with pytest.raises(ProtocolError):
+            decode_message(b'{"id": 1}')
+
+    @pytest.mark.parametrize("fields", [
+        {"display": 1},
+        {"display": None},
+        {"data": "{}"},
+        {"data": None},
+    ])
+    def test_malformed_result_raises_protocol_error(self, fields):
+        """Test result frames with a non-string display or non-object data are rejected"""
+        message = {"type": "result", "id": 1, "display": "[Claude]", "data": {}, **fields}
+
+        with pytest.raises(ProtocolError):
+            result_from_message(message)
+
+    def test_frame_decoder_handles_partial_chunks(self):
+        """Test frames split across reads are reassembled"""
+        data = encode_message({"type": "result", "id": 1}) + encode_message({"type": "result", "id": 2})
+        decoder = FrameDecoder()
+
+        frames = []
+        for i in range(0, len(data), 5):
+            frames.extend(decoder.feed(data[i:i + 5]))
+
+        assert [frame["id"] for frame in frames] == [1, 2]
+        assert decoder.close() == []
+
+    def test_frame_decoder_flushes_unterminated_frame(self):
+        """Test a final frame without newline is decoded at end of stream"""
+        decoder = FrameDecoder()
+
+        assert decoder.feed(b'{"type": "result", "id": 1}') == []
+        assert decoder.close() == [{"type": "result", "id": 1}]
+
+    def test_frame_decoder_rejects_garbage(self):
+        """Test invalid complete lines raise ProtocolError"""
+        with pytest.raises(ProtocolError):
+            FrameDecoder().feed(b"garbage\n")
+
+
+@pytest.mark.sensor
+class TestCoprocessWithBundledSensor:
+    """Test coprocess mode of scripts/context_sensor.sh"""
+
+    def test_matches_one_shot_sensor(self, sensor_script_path):
+        """Test coprocess output matches the one-shot script output"""
+        input_data = {"model": "Claude", "context_window": {"max_tokens": 200000, "tokens_used": 50000}}
+        coprocess = CoprocessSensor(str(sensor_script_path))
+
+        try:
+            stdout, stderr = coprocess.execute(input_data, timeout=5.0)
+        finally:
+            coprocess.close()
+
+        expected_stdout, expected_stderr = SubprocessSensor(str(sensor_script_path)).execute(input_data)
+
+        assert stdout == expected_stdout
+        assert stderr == json.loads(expected_stderr)
+
+    def test_process_is_reused(self, sensor_script_path):
+        """Test consecutive requests are served by the same process"""
+        coprocess = CoprocessSensor(str(sensor_script_path))
+
+        try:
+            coprocess.execute({}, timeout=5.0)
+            pid = coprocess.pid
+            coprocess.execute({"model": "GPT-4"}, timeout=5.0)
+
+            assert coprocess.pid == pid
+            assert coprocess.sensor_version == "1.0.0"
+        finally:
+            coprocess.close()
+
+        assert coprocess.pid is None
+
+    def test_failed_request_keeps_process(self, sensor_script_path):
+        """Test a request the script cannot compute returns an error frame"""
+        coprocess = CoprocessSensor(str(sensor_script_path))
+
+        try:
+            coprocess.execute({}, timeout=5.0)
+            pid = coprocess.pid
+
+            with pytest.raises(SensorError, match="Sensor failed"):
+                coprocess.execute({"context_window": {"tokens_used": "1.5"}}, timeout=5.0)
+
+            stdout, _ = coprocess.execute({"model": "GPT-4"}, timeout=5.0)
+
+            assert stdout.startswith("[GPT-4]")
+            assert coprocess.pid == pid
+        finally:
+            coprocess.close()
+
+    def test_agent_coprocess_backend(self):
+        """Test agent runs with the coprocess backend"""
+        with ContextAgent(sensor_backend="coprocess") as agent:
+            state = agent.get_state(input_data={"model": "Claude"})
+
+            assert isinstance(agent.sensor, CoprocessSensor)
+            assert state.model == "Claude"
+            assert state.workspace.path != ""
+
+
+class TestCoprocessLifecycle:
+    """Test restart, timeout and error handling"""
+
+    def test_custom_sensor_result(self, echo_sensor):
+        """Test custom sensors speaking the protocol are supported"""
+        stdout, stderr = echo_sensor.execute({"model": "X"}, timeout=5.0)
+
+        assert stdout == "[Echo] X"
+        assert stderr == {"model": "X"}
+
+    def test_error_response_raises(self, echo_sensor):
+        """Test error frames become SensorError without restarting"""
+        echo_sensor.execute({}, timeout=5.0)
+        pid = echo_sensor.pid
+
+        with pytest.raises(SensorError, match="boom"):
+            echo_sensor.execute({"fail": True}, timeout=5.0)
+
+        assert echo_sensor.pid == pid
+
+    def test_restart_after_killed(self, echo_sensor):
+        """Test a killed coprocess is restarted on the next request"""
+        echo_sensor.execute({}, timeout=5.0)
+        old_pid = echo_sensor.pid
+
+        os.kill(old_pid, signal.SIGKILL)
+
+        stdout, _ = echo_sensor.execute({"model": "again"}, timeout=5.0)
+
+        assert stdout == "[Echo] again"
+        assert echo_sensor.pid != old_pid
+        assert echo_sensor.restart_count == 1
+
+    def test_crash_during_request_is_retried_once(self, echo_sensor):
+        """Test a request that crashes the sensor fails after one restart"""
+        with pytest.raises(SensorError, match="exited unexpectedly"):
+            echo_sensor.execute({"crash": True}, timeout=5.0)
+
+        stdout, _ = echo_sensor.execute({"model": "ok"}, timeout=5.0)
+        assert stdout == "[Echo] ok"
+
+    def test_request_timeout_kills_process(self, echo_sensor):
+        """Test timed-out requests kill the coprocess"""
+        echo_sensor.execute({}, timeout=5.0)
+
+        with pytest.raises(SensorError, match="timed out"):
+            echo_sensor.execute({"sleep": 5}, timeout=0.2)
+
+        assert echo_sensor.pid is None
+
+        stdout, _ = echo_sensor.execute({"model": "fresh"}, timeout=5.0)
+        assert stdout == "[Echo] fresh"
+
+    def test_protocol_version_mismatch(self, tmp_path):
+        """Test sensors answering another protocol version are rejected"""
+        script = write_python_sensor(tmp_path / "old_sensor.py", """
+            import json, sys
+            for line in sys.stdin:
+                sys.stdout.write(json.dumps({"type": "hello", "protocol": 0}) + "\\n")
+                sys.stdout.flush()
+        """)
+        sensor = CoprocessSensor(str(script), args=())
+
+        with pytest.raises(ProtocolError, match="protocol version"):
+            sensor.execute({}, timeout=5.0)
+
+        assert sensor.pid is None
+
+    def test_missing_executable(self, tmp_path):
+        """Test missing sensor executables raise SensorError"""
+        sensor = CoprocessSensor(str(tmp_path / "missing.sh"))
+
+        with pytest.raises(SensorError, match="not found"):
+            sensor.execute({}, timeout=1.0)
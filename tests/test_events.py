@@ -25,11 +25,12 @@ class TestEventType:
         assert EventType.BRANCH_CHANGED.value == "branch_changed"
         assert EventType.CONTEXT_THRESHOLD.value == "context_threshold"
         assert EventType.STATE_UPDATED.value == "state_updated"
+        assert EventType.SENSOR_CIRCUIT_CHANGED.value == "sensor_circuit_changed"
 
     def test_event_type_count(self):
         """Test expected number of event types"""
         event_types = list(EventType)
-        assert len(event_types) == 5
+        assert len(event_types) == 6
 
     def test_event_type_unique_values(self):
         """Test all event type values are unique"""
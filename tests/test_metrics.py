@@ -0,0 +1,238 @@
+"""
+Unit Tests for Sensor Metrics
+
+Tests the streaming latency histogram, the adaptive sensor timeout and
+sensor child resource accounting.
+"""
+
+import subprocess
+import sys
+
+import pytest
+from unittest.mock import patch
+
+from src.agent import ContextAgent, SensorError
+from src.metrics import (
+    LatencyHistogram,
+    AdaptiveTimeout,
+    ResourceUsage,
+    ResourceAccounting,
+    can_reap_with_usage,
+    wait_child,
+)
+
+
+SENSOR_OUTPUT = (
+    "[Claude] 📁 workspace",
+    '{"version": "1.0.0", "model": "Claude", "workspace": {"path": "/tmp", "name": "workspace", '
+    '"git": {"is_repo": false, "branch": ""}}, "context_window": {"max_tokens": 200000, '
+    '"tokens_used": 0, "usage_pct": 0}}'
+)
+
+
+class TestLatencyHistogram:
+    """Test latency percentile estimation"""
+
+    def test_empty_histogram(self):
+        """Test percentiles are undefined without samples"""
+        histogram = LatencyHistogram()
+
+        assert histogram.percentile(99) is None
+        assert histogram.snapshot()["count"] == 0
+
+    def test_percentiles_are_accurate(self):
+        """Test percentiles are within one bucket of the true value"""
+        histogram = LatencyHistogram(growth=1.05)
+        for i in range(1, 1001):
+            histogram.record(i / 1000.0)
+
+        assert histogram.percentile(50) == pytest.approx(0.5, rel=0.05)
+        assert histogram.percentile(99) == pytest.approx(0.99, rel=0.05)
+        assert histogram.percentile(100) == pytest.approx(1.0)
+
+    def test_percentile_capped_at_max(self):
+        """Test estimates never exceed the largest observed latency"""
+        histogram = LatencyHistogram()
+        histogram.record(0.0213)
+
+        assert histogram.percentile(99) == 0.0213
+
+    def test_overflow_bucket(self):
+        """Test latencies above the range are reported via the maximum"""
+        histogram = LatencyHistogram(max_latency=1.0)
+        histogram.record(5.0)
+
+        assert histogram.percentile(50) == 5.0
+
+    def test_decay_follows_recent_latency(self):
+        """Test old samples lose weight after decay"""
+        histogram = LatencyHistogram(decay_after=100)
+        for _ in range(99):
+            histogram.record(1.0)
+        for _ in range(300):
+            histogram.record(0.01)
+
+        assert histogram.percentile(90) == pytest.approx(0.01, rel=0.1)
+        assert histogram.total == 399
+        assert histogram.count < 100
+
+    def test_invalid_growth(self):
+        """Test bucket growth must exceed 1"""
+        with pytest.raises(ValueError, match="growth"):
+            LatencyHistogram(growth=1.0)
+
+
+class TestAdaptiveTimeout:
+    """Test timeout derivation"""
+
+    def test_maximum_until_enough_samples(self):
+        """Test the configured maximum applies while warming up"""
+        histogram = LatencyHistogram()
+        timeout = AdaptiveTimeout(histogram, minimum=0.5, maximum=5.0, min_samples=10)
+
+        for _ in range(9):
+            histogram.record(0.02)
+
+        assert timeout.value == 5.0
+
+    def test_scaled_and_clamped(self):
+        """Test p99 × factor is clamped to [minimum, maximum]"""
+        histogram = LatencyHistogram()
+        timeout = AdaptiveTimeout(histogram, minimum=0.1, maximum=5.0, factor=3.0, min_samples=1)
+
+        histogram.record(0.2)
+        assert timeout.value == pytest.approx(0.6)
+
+        histogram.record(10.0)
+        assert timeout.value == 5.0
+
+        fast = LatencyHistogram()
+        fast.record(0.001)
+        assert AdaptiveTimeout(fast, minimum=0.1, maximum=5.0, min_samples=1).value == 0.1
+
+    def test_invalid_bounds(self):
+        """Test minimum may not exceed maximum"""
+        with pytest.raises(ValueError, match="minimum"):
+            AdaptiveTimeout(LatencyHistogram(), minimum=2.0, maximum=1.0)
+
+
+class TestAgentAdaptiveTimeout:
+    """Test the agent's effective sensor timeout"""
+
+    @patch.object(ContextAgent, '_execute_sensor')
+    def test_fixed_timeout_by_default(self, mock_execute):
+        """Test the configured timeout is used unless adaptive"""
+        mock_execute.return_value = SENSOR_OUTPUT
+
+        agent = ContextAgent(sensor_timeout=5.0)
+        for _ in range(20):
+            agent.get_state()
+
+        assert agent.sensor_timeout == 5.0
+        assert agent.get_stats()["latency"]["count"] == 20
+
+    @patch.object(ContextAgent, '_execute_sensor')
+    def test_adaptive_timeout_tightens(self, mock_execute):
+        """Test fast sensors get a tight timeout"""
+        mock_execute.return_value = SENSOR_OUTPUT
+
+        agent = ContextAgent(sensor_timeout=5.0, adaptive_timeout=True, min_sensor_timeout=0.25)
+        assert agent.sensor_timeout == 5.0
+
+        for _ in range(20):
+            agent.get_state()
+
+        assert agent.sensor_timeout == 0.25
+        assert agent.get_stats()["latency"]["timeout"] == 0.25
+
+    def test_effective_timeout_is_passed_to_sensor(self):
+        """Test sensor executions use the effective timeout"""
+        agent = ContextAgent(sensor_timeout=5.0, adaptive_timeout=True, min_sensor_timeout=0.25)
+
+        with patch.object(agent.sensor, "execute", return_value=SENSOR_OUTPUT) as mock_execute:
+            for _ in range(11):
+                agent.get_state()
+
+        assert mock_execute.call_args_list[0].kwargs["timeout"] == 5.0
+        assert mock_execute.call_args_list[-1].kwargs["timeout"] == 0.25
+
+    @patch.object(ContextAgent, '_execute_sensor')
+    def test_failed_runs_are_recorded(self, mock_execute):
+        """Test timed-out runs count towards latency"""
+        mock_execute.side_effect = SensorError("Sensor execution timed out after 0.5s")
+
+        agent = ContextAgent()
+        with pytest.raises(SensorError):
+            agent.get_state()
+
+        assert agent.get_stats()["latency"]["count"] == 1
+
+
+class TestResourceAccounting:
+    """Test sensor child CPU and memory accounting"""
+
+    def test_wait_child_captures_usage(self):
+        """Test rusage of a reaped child includes its waited-for children"""
+        process = subprocess.Popen(
+            ["sh", "-c", f"{sys.executable} -c 'sum(range(3000000))'; exit 3"],
+            stdout=subprocess.PIPE
+        )
+        process.stdout.read()
+        process.stdout.close()
+        usage = wait_child(process)
+
+        assert process.returncode == 3
+        assert process.poll() == 3
+        assert isinstance(usage, ResourceUsage)
+        assert usage.user_time + usage.system_time > 0.01
+        assert usage.max_rss_kb > 1000
+
+    def test_wait_child_timeout(self):
+        """Test a running child raises TimeoutExpired and can be reaped later"""
+        process = subprocess.Popen(["sleep", "5"])
+
+        with pytest.raises(subprocess.TimeoutExpired):
+            wait_child(process, timeout=0.05)
+        assert process.returncode is None
+
+        process.terminate()
+        assert isinstance(wait_child(process, timeout=5.0), ResourceUsage)
+        assert process.returncode < 0
+
+    def test_can_reap_ignores_non_popen(self):
+        """Test mocked processes are not reaped with wait4"""
+        assert not can_reap_with_usage(object())
+
+    def test_aggregates_per_workspace(self):
+        """Test totals and per-workspace counters"""
+        accounting = ResourceAccounting()
+        accounting.record(ResourceUsage(0.5, 0.1, 4000), "/ws/a")
+        accounting.record(ResourceUsage(0.25, 0.05, 9000), "/ws/a")
+        accounting.record(ResourceUsage(1.0, 0.0, 2000), "/ws/b")
+
+        snapshot = accounting.snapshot()
+        assert snapshot["executions"] == 3
+        assert snapshot["cpu_time"] == pytest.approx(1.9)
+        assert snapshot["max_rss_kb"] == 9000
+        assert snapshot["workspaces"]["/ws/a"]["executions"] == 2
+        assert snapshot["workspaces"]["/ws/a"]["user_time"] == pytest.approx(0.75)
+        assert snapshot["workspaces"]["/ws/b"]["max_rss_kb"] == 2000
+
+    @pytest.mark.sensor
+    def test_agent_reports_sensor_usage(self, temp_non_repo):
+        """Test subprocess sensor runs are accounted per workspace"""
+        agent = ContextAgent()
+        agent.get_state({"workspace_path": str(temp_non_repo)})
+        agent.get_state()
+
+        resources = agent.get_stats()["resources"]
+        assert resources["executions"] == 2
+        assert resources["max_rss_kb"] > 0
+        assert set(resources["workspaces"]) == {str(temp_non_repo), str(agent.sensor.cwd)}
+
+    def test_native_backend_has_no_child_usage(self):
+        """Test in-process backends report no child resources"""
+        agent = ContextAgent(sensor_backend="native")
+        agent.get_state()
+
+        assert "resources" not in agent.get_stats()
@@ -0,0 +1,393 @@
+"""
+Unit Tests for Poll Scheduling
+
+Tests the adaptive polling interval and its use by the ContextAgent poll
+loop.
+"""
+
+import json
+import time
+
+import pytest
+from unittest.mock import patch
+
+from src.agent import ContextAgent
+from src.events import EventType
+from src.polling import AdaptiveInterval, PollTimer, MAX_CATCH_UP
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def sensor_output(model="Claude", usage_pct=0):
+    data = {
+        "version": "1.0.0",
+        "model": model,
+        "workspace": {"path": "/tmp", "name": "workspace", "git": {"is_repo": False, "branch": ""}},
+        "context_window": {"max_tokens": 200000, "tokens_used": 0, "usage_pct": usage_pct},
+    }
+    return f"[{model}] 📁 workspace", json.dumps(data)
+
+
+class TestAdaptiveInterval:
+    """Test interval backoff and threshold caps"""
+
+    def test_invalid_bounds(self):
+        """Test minimum must be positive and not above maximum"""
+        with pytest.raises(ValueError):
+            AdaptiveInterval(minimum=0, maximum=10)
+        with pytest.raises(ValueError):
+            AdaptiveInterval(minimum=10, maximum=5)
+        with pytest.raises(ValueError):
+            AdaptiveInterval(minimum=1, maximum=5, backoff=0.5)
+
+    def test_backs_off_while_unchanged(self):
+        """Test unchanged polls grow the interval up to the maximum"""
+        interval = AdaptiveInterval(minimum=1.0, maximum=10.0)
+
+        values = [interval.observe(changed=False) for _ in range(6)]
+
+        assert values == [2.0, 4.0, 8.0, 10.0, 10.0, 10.0]
+        assert interval.value == 10.0
+
+    def test_change_resets_to_minimum(self):
+        """Test a detected change returns to the minimum interval"""
+        interval = AdaptiveInterval(minimum=1.0, maximum=60.0, initial=30.0)
+
+        assert interval.observe(changed=True) == 1.0
+        assert interval.snapshot()["changes"] == 1
+
+    def test_initial_is_clamped(self):
+        """Test the starting interval is clamped to the bounds"""
+        assert AdaptiveInterval(minimum=1.0, maximum=10.0, initial=50.0).value == 10.0
+        assert AdaptiveInterval(minimum=1.0, maximum=10.0).value == 1.0
+
+    def test_minimum_near_threshold(self):
+        """Test usage within the margin of the threshold pins the minimum"""
+        interval = AdaptiveInterval(minimum=1.0, maximum=60.0, initial=60.0, threshold=80)
+
+        assert interval.observe(changed=False, usage_pct=75) == 1.0
+        assert interval.observe(changed=False, usage_pct=75) == 1.0
+
+    def test_backs_off_above_threshold(self):
+        """Test an already crossed threshold does not pin the interval"""
+        interval = AdaptiveInterval(minimum=1.0, maximum=60.0, threshold=80)
+
+        assert interval.observe(changed=False, usage_pct=95) == 2.0
+
+    def test_rising_usage_caps_interval(self):
+        """Test the interval stays below half the projected time to the threshold"""
+        clock = FakeClock()
+        interval = AdaptiveInterval(minimum=1.0, maximum=600.0, initial=600.0, threshold=80, clock=clock)
+
+        interval.observe(changed=False, usage_pct=10)
+        clock.now += 10.0
+        # 10 points per 10s: 60 points left = 60s, polled within 30s
+        assert interval.observe(changed=True, usage_pct=20) == 1.0
+        clock.now += 1.0
+        assert interval.observe(changed=False, usage_pct=20) == pytest.approx(2.0)
+
+        for _ in range(10):
+            clock.now += interval.value
+            interval.observe(changed=False, usage_pct=20)
+
+        assert interval.value <= 30.0
+        assert interval.snapshot()["usage_rate"] == pytest.approx(1.0)
+
+    def test_reset(self):
+        """Test reset returns to the minimum"""
+        interval = AdaptiveInterval(minimum=1.0, maximum=10.0, initial=10.0)
+        interval.reset()
+        assert interval.value == 1.0
+
+
+class TestPollTimer:
+    """Test fixed-delay and fixed-rate due times"""
+
+    def test_invalid_policy(self):
+        """Test unknown missed-tick policies are rejected"""
+        with pytest.raises(ValueError):
+            PollTimer(fixed_rate=True, policy="drop")
+
+    def test_fixed_delay_counts_from_poll_end(self):
+        """Test fixed-delay mode always waits the full interval"""
+        clock = FakeClock()
+        timer = PollTimer(clock=clock)
+
+        clock.now += 3.0
+        assert timer.next_delay(5.0) == 5.0
+
+    def test_fixed_rate_absorbs_poll_duration(self):
+        """Test the sensor run time is subtracted from the wait"""
+        clock = FakeClock()
+        timer = PollTimer(fixed_rate=True, clock=clock)
+
+        for _ in range(3):
+            timer.poll_started()
+            clock.now += 1.5
+            delay = timer.next_delay(5.0)
+            assert delay == pytest.approx(3.5)
+            clock.now += delay
+
+        snapshot = timer.snapshot()
+        assert snapshot["mode"] == "fixed_rate"
+        assert snapshot["achieved_rate"] == pytest.approx(0.2)
+        assert snapshot["max_lag"] == 0.0
+
+    def test_early_poll_keeps_pending_tick(self):
+        """Test a poll before the due tick does not consume it"""
+        clock = FakeClock()
+        timer = PollTimer(fixed_rate=True, clock=clock)
+
+        assert timer.next_delay(10.0) == pytest.approx(10.0)
+        clock.now += 4.0
+        assert timer.next_delay(10.0) == pytest.approx(6.0)
+        clock.now += 6.0
+        assert timer.next_delay(10.0) == pytest.approx(10.0)
+        assert timer.snapshot()["skipped"] == 0
+
+    def test_skip_policy(self):
+        """Test an overrun waits for the next grid tick"""
+        clock = FakeClock()
+        timer = PollTimer(fixed_rate=True, policy="skip", clock=clock)
+
+        clock.now += 12.0
+        assert timer.next_delay(5.0) == pytest.approx(3.0)
+        assert timer.snapshot()["skipped"] == 2
+
+    def test_coalesce_policy(self):
+        """Test an overrun polls once immediately and stays on the grid"""
+        clock = FakeClock()
+        timer = PollTimer(fixed_rate=True, policy="coalesce", clock=clock)
+
+        clock.now += 12.0
+        assert timer.next_delay(5.0) == 0.0
+        timer.poll_started()
+        assert timer.next_delay(5.0) == pytest.approx(3.0)
+        assert timer.snapshot()["skipped"] == 1
+        assert timer.snapshot()["lag"] == pytest.approx(2.0)
+
+    def test_catch_up_policy(self):
+        """Test an overrun runs every missed tick back to back"""
+        clock = FakeClock()
+        timer = PollTimer(fixed_rate=True, policy="catch_up", clock=clock)
+
+        clock.now += 12.0
+        assert timer.next_delay(5.0) == 0.0
+        assert timer.next_delay(5.0) == 0.0
+        assert timer.next_delay(5.0) == pytest.approx(3.0)
+        assert timer.snapshot()["skipped"] == 0
+
+    def test_catch_up_is_bounded(self):
+        """Test catch_up drops ticks beyond MAX_CATCH_UP"""
+        clock = FakeClock()
+        timer = PollTimer(fixed_rate=True, policy="catch_up", clock=clock)
+
+        clock.now += 1000.0
+        timer.next_delay(1.0)
+
+        assert timer.snapshot()["skipped"] == 1000 - MAX_CATCH_UP
+
+    def test_defer_reanchors_grid(self):
+        """Test defer() moves the next due time"""
+        clock = FakeClock()
+        timer = PollTimer(fixed_rate=True, clock=clock)
+
+        timer.defer(60.0)
+        clock.now += 61.0
+        timer.poll_started()
+
+        assert timer.snapshot()["lag"] == pytest.approx(1.0)
+        assert timer.next_delay(5.0) == pytest.approx(4.0)
+
+    def test_invalid_jitter(self):
+        """Test jitter must be a fraction below 1"""
+        with pytest.raises(ValueError):
+            PollTimer(jitter=1.0)
+
+    def test_jitter_fixed_delay(self):
+        """Test jitter moves the delay by up to the fraction of the interval"""
+        clock = FakeClock()
+        timer = PollTimer(jitter=0.1, clock=clock, rng=lambda: 0.0)
+
+        assert timer.next_delay(10.0) == pytest.approx(9.0)
+
+    def test_jitter_keeps_fixed_rate_grid(self):
+        """Test jittered polls do not move the fixed-rate grid"""
+        clock = FakeClock()
+        values = iter([1.0, 0.0])
+        timer = PollTimer(fixed_rate=True, jitter=0.2, clock=clock, rng=lambda: next(values))
+
+        delay = timer.next_delay(10.0)
+        assert delay == pytest.approx(12.0)
+        clock.now += delay
+        timer.poll_started()
+
+        assert timer.snapshot()["lag"] == 0.0
+        assert timer.next_delay(10.0) == pytest.approx(6.0)
+
+
+class TestAgentAdaptivePolling:
+    """Test adaptive polling in ContextAgent"""
+
+    def test_disabled_by_default(self):
+        """Test the configured interval is used without adaptive polling"""
+        agent = ContextAgent(breaker_failure_threshold=0)
+
+        assert agent.polling_interval is None
+        assert agent._next_poll_delay(5.0) == 5.0
+        assert "polling" not in agent.get_stats()
+
+    def test_interval_follows_changes(self):
+        """Test stable polls back off and a change polls at the minimum again"""
+        agent = ContextAgent(
+            adaptive_polling=True, min_polling_interval=1.0, max_polling_interval=20.0
+        )
+
+        with patch.object(agent, '_execute_sensor', return_value=sensor_output()):
+            agent.start(polling_interval=5.0)
+            agent.stop()
+
+            for _ in range(3):
+                agent._poll_once()
+            assert agent.polling_interval == 20.0
+            assert agent._next_poll_delay(5.0) == 20.0
+
+        with patch.object(agent, '_execute_sensor', return_value=sensor_output(model="GPT-4")):
+            agent._poll_once()
+
+        assert agent.polling_interval == 1.0
+        stats = agent.get_stats()["polling"]
+        assert stats["interval"] == 1.0
+        assert stats["changes"] == 1
+
+    def test_polls_fast_near_threshold(self):
+        """Test usage close to the context threshold keeps the minimum interval"""
+        agent = ContextAgent(
+            context_threshold=80, adaptive_polling=True,
+            min_polling_interval=1.0, max_polling_interval=60.0
+        )
+
+        with patch.object(agent, '_execute_sensor', return_value=sensor_output(usage_pct=78)):
+            agent.start(polling_interval=30.0)
+            agent.stop()
+            for _ in range(3):
+                agent._poll_once()
+
+        assert agent.polling_interval == 1.0
+
+    def test_circuit_backoff_takes_precedence(self):
+        """Test an open circuit still delays polls beyond the adaptive interval"""
+        agent = ContextAgent(
+            adaptive_polling=True, breaker_failure_threshold=1, breaker_base_delay=120.0
+        )
+
+        with patch.object(agent, '_execute_sensor', return_value=sensor_output()):
+            agent.start(polling_interval=5.0)
+            agent.stop()
+
+        agent._breaker.record_failure()
+        assert agent._next_poll_delay(5.0) > 60.0
+
+
+class TestAgentFixedRatePolling:
+    """Test fixed-rate polling in ContextAgent"""
+
+    def test_invalid_policy(self):
+        """Test unknown missed-tick policies are rejected"""
+        with pytest.raises(ValueError, match="missed_poll_policy"):
+            ContextAgent(missed_poll_policy="drop")
+
+    def test_period_excludes_poll_time(self):
+        """Test polls keep the configured rate although each one is slow"""
+        agent = ContextAgent(fixed_rate_polling=True)
+
+        def slow_sensor(*args, **kwargs):
+            time.sleep(0.03)
+            return sensor_output()
+
+        with patch.object(agent, '_execute_sensor', side_effect=slow_sensor):
+            agent.start(polling_interval=0.05)
+            time.sleep(0.5)
+            agent.stop()
+
+        polling = agent.get_stats()["polling"]
+        assert polling["mode"] == "fixed_rate"
+        assert polling["interval"] == 0.05
+        # Fixed delay would give 1 / (0.05 + 0.03) = 12.5 polls/s
+        assert polling["achieved_rate"] > 15.0
+        assert polling["polls"] >= 6
+
+
+class TestAgentIdleSuspension:
+    """Test demand-driven polling in ContextAgent"""
+
+    def wait_until(self, predicate, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            assert time.monotonic() < deadline, "condition not reached"
+            time.sleep(0.005)
+
+    def test_disabled_by_default(self):
+        """Test polling never suspends without an idle timeout"""
+        agent = ContextAgent()
+        agent._last_read -= 3600
+
+        assert not agent._suspend_if_idle()
+
+    def test_suspends_without_readers_and_resumes_on_read(self):
+        """Test polling pauses when unread and a read resumes it at once"""
+        agent = ContextAgent(enable_events=False, idle_timeout=0.1)
+
+        with patch.object(agent, '_execute_sensor', return_value=sensor_output()) as mock_exec:
+            agent.start(polling_interval=0.01)
+            try:
+                self.wait_until(lambda: agent.is_suspended)
+                calls = mock_exec.call_count
+                time.sleep(0.1)
+                assert mock_exec.call_count == calls
+
+                agent.get_display_header()
+                assert not agent.is_suspended
+                self.wait_until(lambda: mock_exec.call_count > calls)
+            finally:
+                agent.stop()
+
+        polling = agent.get_stats()["polling"]
+        assert polling["suspensions"] >= 1
+
+    def test_subscribers_keep_polling(self):
+        """Test registered event handlers count as consumers"""
+        agent = ContextAgent(idle_timeout=0.05)
+        agent.on(EventType.BRANCH_CHANGED, lambda event: None)
+        agent._last_read -= 3600
+
+        assert not agent._suspend_if_idle()
+
+    def test_subscription_resumes_polling(self):
+        """Test on() resumes a suspended agent"""
+        agent = ContextAgent(idle_timeout=0.05)
+        agent._last_read -= 3600
+        assert agent._suspend_if_idle()
+
+        agent.on(EventType.BRANCH_CHANGED, lambda event: None)
+
+        assert not agent.is_suspended
+        assert agent._wake_event.is_set()
+
+    def test_poller_reads_do_not_count(self):
+        """Test the poll loop's own get_state calls keep the agent idle"""
+        agent = ContextAgent(enable_events=False, idle_timeout=60.0)
+        agent._last_read -= 3600
+
+        with patch.object(agent, '_execute_sensor', return_value=sensor_output()):
+            agent._poll_once()
+
+        assert agent._suspend_if_idle()
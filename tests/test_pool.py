@@ -0,0 +1,210 @@
+"""
+Unit Tests for the Shared Sensor Pool
+
+Tests concurrency caps, per-key limits, round-robin fairness and the
+ContextAgent integration.
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.agent import ContextAgent, SensorError
+from src.pool import SensorPool
+from src.sensors import Sensor
+
+
+SENSOR_OUTPUT = (
+    "[Claude] 📁 workspace",
+    '{"version": "1.0.0", "model": "Claude", "workspace": {"path": "/tmp", "name": "workspace", '
+    '"git": {"is_repo": false, "branch": ""}}, "context_window": {"max_tokens": 200000, '
+    '"tokens_used": 0, "usage_pct": 0}}'
+)
+
+
+class ConcurrencyProbe:
+    """Callable that records the peak number of concurrent calls"""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.order = []
+
+    def __call__(self, label):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.order.append(label)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return label
+
+
+class StaticSensor(Sensor):
+    """Sensor returning fixed output"""
+
+    name = "static"
+
+    def __init__(self, cwd="/tmp"):
+        self._cwd = cwd
+        self.threads = []
+
+    @property
+    def cwd(self):
+        return self._cwd
+
+    def execute(self, input_data=None, timeout=5.0):
+        self.threads.append(threading.current_thread().name)
+        return SENSOR_OUTPUT
+
+
+class TestSensorPool:
+    """Test pool scheduling"""
+
+    def test_invalid_arguments(self):
+        """Test worker and per-key limits must be positive"""
+        with pytest.raises(ValueError):
+            SensorPool(max_workers=0)
+        with pytest.raises(ValueError):
+            SensorPool(per_key_limit=0)
+
+    def test_run_returns_result_and_raises(self):
+        """Test results and exceptions propagate to the caller"""
+        with SensorPool(max_workers=2) as pool:
+            assert pool.run("a", lambda x: x * 2, 21) == 42
+
+            def fail():
+                raise SensorError("boom")
+
+            with pytest.raises(SensorError, match="boom"):
+                pool.run("a", fail)
+
+    def test_total_concurrency_is_capped(self):
+        """Test no more than max_workers tasks run at once"""
+        probe = ConcurrencyProbe()
+        with SensorPool(max_workers=3, per_key_limit=10) as pool:
+            futures = [pool.submit(f"ws{i}", probe, i) for i in range(12)]
+            assert sorted(f.result() for f in futures) == list(range(12))
+
+        assert probe.peak == 3
+        assert pool.stats()["workers"] == 3
+
+    def test_per_key_limit(self):
+        """Test tasks of one key run one at a time"""
+        probe = ConcurrencyProbe()
+        with SensorPool(max_workers=4, per_key_limit=1) as pool:
+            futures = [pool.submit("ws", probe, i) for i in range(5)]
+            for future in futures:
+                future.result()
+
+        assert probe.peak == 1
+
+    def test_round_robin_across_keys(self):
+        """Test a busy key does not starve other keys"""
+        probe = ConcurrencyProbe(delay=0.0)
+        gate = threading.Event()
+
+        with SensorPool(max_workers=1, per_key_limit=1) as pool:
+            blocker = pool.submit("block", gate.wait)
+            futures = [pool.submit("busy", probe, f"busy{i}") for i in range(3)]
+            futures.append(pool.submit("quiet", probe, "quiet"))
+            gate.set()
+            blocker.result()
+            for future in futures:
+                future.result()
+
+        assert probe.order.index("quiet") == 1
+
+    def test_stats(self):
+        """Test queue depth and completion metrics"""
+        gate = threading.Event()
+        pool = SensorPool(max_workers=1)
+        try:
+            futures = [
+                pool.submit("a", gate.wait),
+                pool.submit("a", lambda: None),
+                pool.submit("b", lambda: None),
+            ]
+            time.sleep(0.05)
+
+            stats = pool.stats()
+            assert stats["in_flight"] == 1
+            assert stats["queued"] == 2
+            assert stats["keys"]["a"] == {"queued": 1, "in_flight": 1, "completed": 0}
+
+            gate.set()
+            for future in futures:
+                future.result()
+        finally:
+            gate.set()
+            pool.shutdown()
+
+        stats = pool.stats()
+        assert stats["completed"] == 3
+        assert stats["max_queue_depth"] >= 2
+        assert stats["keys"] == {}
+
+    def test_shutdown_rejects_and_cancels(self):
+        """Test shutdown cancels queued work and rejects new work"""
+        gate = threading.Event()
+        pool = SensorPool(max_workers=1)
+        running = pool.submit("a", gate.wait)
+        queued = pool.submit("a", lambda: None)
+        time.sleep(0.05)
+
+        threading.Timer(0.05, gate.set).start()
+        pool.shutdown()
+
+        assert running.result() is True
+        assert queued.cancelled()
+        with pytest.raises(RuntimeError):
+            pool.submit("a", lambda: None)
+
+
+class TestAgentWithPool:
+    """Test ContextAgent sensor runs on a shared pool"""
+
+    def test_sensor_runs_on_pool(self):
+        """Test agents execute their sensor on pool workers"""
+        sensor = StaticSensor()
+        with SensorPool(max_workers=2, name="TestPool") as pool:
+            agent = ContextAgent(sensor=sensor, pool=pool)
+            state = agent.get_state()
+
+            assert state.model == "Claude"
+            assert sensor.threads[0].startswith("TestPool")
+            assert agent.get_stats()["pool"]["completed"] == 1
+            assert agent.get_stats()["pool"]["keys"] == {}
+
+    def test_agents_share_cap(self):
+        """Test many agents together stay within the pool cap"""
+        probe = ConcurrencyProbe()
+
+        class SlowSensor(StaticSensor):
+            def execute(self, input_data=None, timeout=5.0):
+                probe(self._cwd)
+                return SENSOR_OUTPUT
+
+        with SensorPool(max_workers=2) as pool:
+            agents = [ContextAgent(sensor=SlowSensor(f"/ws{i}"), pool=pool) for i in range(6)]
+            threads = [threading.Thread(target=agent.get_state) for agent in agents]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert probe.peak == 2
+        assert len(probe.order) == 6
+
+    def test_without_pool(self):
+        """Test the default runs the sensor on the calling thread"""
+        sensor = StaticSensor()
+        agent = ContextAgent(sensor=sensor)
+        agent.get_state()
+
+        assert sensor.threads == [threading.current_thread().name]
+        assert "pool" not in agent.get_stats()
@@ -0,0 +1,251 @@
+"""
+Unit Tests for Host Load Pressure
+
+Tests PSI and load average parsing, the pressure stretch factor and its use
+by the ContextAgent poll schedule.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+
+import pytest
+from unittest.mock import patch
+
+from src.agent import ContextAgent
+from src.agent_with_zerodb import ContextAgentWithZeroDB
+from src.config import AgentConfig
+from src.pressure import PressureMonitor, read_psi, read_load
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def write_psi(root, resource, avg10):
+    (root / "pressure").mkdir(exist_ok=True)
+    (root / "pressure" / resource).write_text(
+        f"some avg10={avg10:.2f} avg60=0.00 avg300=0.00 total=0\n"
+        "full avg10=0.00 avg60=0.00 avg300=0.00 total=0\n"
+    )
+
+
+def sensor_output(usage_pct=0):
+    data = {
+        "version": "1.0.0",
+        "model": "Claude",
+        "workspace": {"path": "/tmp", "name": "workspace", "git": {"is_repo": False, "branch": ""}},
+        "context_window": {"max_tokens": 200000, "tokens_used": 0, "usage_pct": usage_pct},
+    }
+    return "[Claude] 📁 workspace", json.dumps(data)
+
+
+class TestReadings:
+    """Test /proc parsing"""
+
+    def test_read_psi(self, tmp_path):
+        """Test the some avg10 value is read"""
+        write_psi(tmp_path, "cpu", 12.5)
+
+        assert read_psi("cpu", str(tmp_path)) == 12.5
+        assert read_psi("io", str(tmp_path)) is None
+
+    def test_read_load_per_cpu(self, tmp_path):
+        """Test the load average is scaled to the CPU count and capped"""
+        cpus = os.cpu_count() or 1
+        (tmp_path / "loadavg").write_text(f"{cpus * 0.5:.2f} 0.10 0.10 1/100 1234\n")
+        assert read_load(str(tmp_path)) == pytest.approx(50.0, abs=1.0)
+
+        (tmp_path / "loadavg").write_text(f"{cpus * 3} 0.10 0.10 1/100 1234\n")
+        assert read_load(str(tmp_path)) == 100.0
+
+
+class TestPressureMonitor:
+    """Test the stretch factor"""
+
+    def test_invalid_limits(self):
+        """Test limits and stretch are validated"""
+        with pytest.raises(ValueError):
+            PressureMonitor(cpu_limit=100)
+        with pytest.raises(ValueError):
+            PressureMonitor(max_stretch=0.5)
+
+    def test_no_stretch_below_limits(self, tmp_path):
+        """Test pressure below the limits leaves intervals alone"""
+        write_psi(tmp_path, "cpu", 30.0)
+        write_psi(tmp_path, "io", 10.0)
+        monitor = PressureMonitor(proc_root=str(tmp_path))
+
+        assert monitor.stretch() == 1.0
+        assert not monitor.under_pressure
+        assert monitor.snapshot()["source"] == "psi"
+
+    def test_stretch_follows_worst_resource(self, tmp_path):
+        """Test the stretch rises linearly above the limit of either resource"""
+        write_psi(tmp_path, "cpu", 10.0)
+        write_psi(tmp_path, "io", 70.0)
+        monitor = PressureMonitor(
+            cpu_limit=40.0, io_limit=40.0, max_stretch=4.0, proc_root=str(tmp_path)
+        )
+
+        assert monitor.stretch() == pytest.approx(2.5)
+        assert monitor.under_pressure
+
+    def test_readings_are_cached(self, tmp_path):
+        """Test /proc is read at most once per sample_interval"""
+        clock = FakeClock()
+        write_psi(tmp_path, "cpu", 100.0)
+        monitor = PressureMonitor(sample_interval=1.0, proc_root=str(tmp_path), clock=clock)
+        assert monitor.stretch() == 4.0
+
+        write_psi(tmp_path, "cpu", 0.0)
+        assert monitor.stretch() == 4.0
+        clock.now += 1.0
+        assert monitor.stretch() == 1.0
+        assert monitor.snapshot()["samples"] == 2
+
+    def test_load_average_fallback(self, tmp_path):
+        """Test the load average stands in for missing PSI"""
+        cpus = os.cpu_count() or 1
+        (tmp_path / "loadavg").write_text(f"{cpus * 2} 0.10 0.10 1/100 1234\n")
+        monitor = PressureMonitor(proc_root=str(tmp_path))
+
+        assert monitor.stretch() == 4.0
+        snapshot = monitor.snapshot()
+        assert snapshot["source"] == "loadavg"
+        assert snapshot["io"] is None
+
+    def test_unavailable(self, tmp_path):
+        """Test a host without PSI or loadavg is never under pressure"""
+        monitor = PressureMonitor(proc_root=str(tmp_path))
+
+        assert monitor.stretch() == 1.0
+        assert monitor.snapshot()["source"] is None
+
+
+class TestAgentPressureThrottling:
+    """Test pressure throttling in ContextAgent"""
+
+    def test_disabled_by_default(self):
+        """Test throttling is opt-in"""
+        agent = ContextAgent()
+
+        assert not agent.under_pressure
+        assert "pressure" not in agent.get_stats()
+
+    def test_stretches_poll_interval(self):
+        """Test polls are spaced out under pressure"""
+        agent = ContextAgent(pressure_throttling=True, pressure_max_stretch=4.0)
+
+        with patch.object(agent._pressure, 'stretch', return_value=3.0), \
+             patch.object(agent, '_execute_sensor', return_value=sensor_output(usage_pct=20)):
+            agent.get_state()
+            assert agent._next_poll_delay(5.0) == pytest.approx(15.0)
+            assert agent.under_pressure
+
+    def test_threshold_checks_keep_rate(self):
+        """Test polls close to the context threshold are not stretched"""
+        agent = ContextAgent(pressure_throttling=True, context_threshold=80)
+
+        with patch.object(agent._pressure, 'stretch', return_value=3.0), \
+             patch.object(agent, '_execute_sensor', return_value=sensor_output(usage_pct=75)):
+            agent.get_state()
+            assert agent._next_poll_delay(5.0) == pytest.approx(5.0)
+
+    def test_stats(self):
+        """Test pressure readings are reported"""
+        agent = ContextAgent(pressure_throttling=True, pressure_cpu_limit=50.0)
+
+        stats = agent.get_stats()["pressure"]
+        assert stats["cpu_limit"] == 50.0
+        assert stats["stretch"] >= 1.0
+
+
+class FakePersistence:
+    """ZeroDB persistence stand-in recording completed writes"""
+
+    def __init__(self):
+        self.states = []
+        self.events = []
+
+    def is_available(self):
+        return True
+
+    def get_status(self):
+        return {"enabled": True, "initialized": True}
+
+    async def store_state(self, state):
+        await asyncio.sleep(0.05)
+        self.states.append(state)
+
+    async def log_event(self, event):
+        await asyncio.sleep(0.05)
+        self.events.append(event)
+
+    async def close(self):
+        pass
+
+
+class TestZeroDBDeferral:
+    """Test ZeroDB writes deferred under host pressure"""
+
+    @pytest.fixture
+    def agent(self):
+        agent = ContextAgentWithZeroDB(config=AgentConfig(pressure_throttling=True))
+        agent._zerodb_persistence = FakePersistence()
+        loop = agent._zerodb_loop = asyncio.new_event_loop()
+
+        def run_loop():
+            try:
+                loop.run_forever()
+            finally:
+                loop.close()
+
+        agent._zerodb_thread = threading.Thread(target=run_loop, daemon=True)
+        agent._zerodb_thread.start()
+        agent._register_zerodb_event_handlers()
+        yield agent
+        agent.shutdown()
+
+    def test_backlog_flushed_when_pressure_clears(self, agent):
+        """Test deferred writes go out on the next read even if the state is unchanged"""
+        persistence = agent._zerodb_persistence
+
+        with patch.object(agent._pressure, 'stretch', return_value=2.0), \
+             patch.object(agent, '_execute_sensor', return_value=sensor_output(usage_pct=10)):
+            agent.get_state()
+        assert agent.get_zerodb_status()["state_deferred"]
+        assert agent.get_zerodb_status()["deferred_events"] > 0
+
+        with patch.object(agent._pressure, 'stretch', return_value=1.0), \
+             patch.object(agent, '_execute_sensor', return_value=sensor_output(usage_pct=10)):
+            agent.get_state()
+
+        status = agent.get_zerodb_status()
+        assert not status["state_deferred"]
+        assert status["deferred_events"] == 0
+        time.sleep(0.3)
+        assert len(persistence.states) == 1
+        assert persistence.events
+
+    def test_shutdown_waits_for_deferred_writes(self, agent):
+        """Test shutdown completes deferred writes before stopping the loop"""
+        persistence = agent._zerodb_persistence
+
+        with patch.object(agent._pressure, 'stretch', return_value=2.0), \
+             patch.object(agent, '_execute_sensor', return_value=sensor_output(usage_pct=10)):
+            agent.get_state()
+
+        with patch.object(agent._pressure, 'stretch', return_value=1.0):
+            agent.shutdown()
+
+        assert len(persistence.states) == 1
+        assert len(persistence.events) == 1
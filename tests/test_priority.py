@@ -0,0 +1,214 @@
+"""
+Unit Tests for Sensor Process Priority
+
+Tests the nice/ionice/cgroup command wrappers and their use by the
+process-based sensor backends.
+"""
+
+import errno
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.agent import ContextAgent
+from src.priority import SensorPriority, SensorCgroup, own_cgroup_dir
+from src.sensors import SubprocessSensor, SensorError
+
+
+requires_ionice = pytest.mark.skipif(
+    shutil.which("ionice") is None or not sys.platform.startswith("linux"),
+    reason="ionice not available"
+)
+
+
+@pytest.fixture
+def priority_script(tmp_path):
+    """Sensor script reporting its niceness on STDOUT"""
+    script = tmp_path / "priority_sensor.sh"
+    script.write_text("#!/bin/sh\ncat > /dev/null\necho \"nice=$(nice)\"\necho '{}' >&2\n")
+    script.chmod(0o755)
+    return script
+
+
+@pytest.fixture
+def cgroup_parent(tmp_path):
+    """Directory laid out like a delegated cgroup whose children get cpu.max"""
+    parent = tmp_path / "parent"
+    (parent / "context-sensors").mkdir(parents=True)
+    (parent / "cgroup.controllers").write_text("cpu memory pids\n")
+    (parent / "context-sensors" / "cpu.max").write_text("max 100000\n")
+    return parent
+
+
+class TestSensorPriority:
+    """Test the command prefix"""
+
+    def test_default_has_no_prefix(self):
+        """Test default settings leave the command unchanged"""
+        assert SensorPriority().wrap(["sensor.sh"]) == ["sensor.sh"]
+        assert SensorPriority.from_settings() is None
+
+    def test_nice_prefix(self):
+        """Test niceness is applied with nice"""
+        args = SensorPriority(nice=10).wrap(["sensor.sh", "--batch"])
+
+        assert args[1:] == ["-n", "10", "sensor.sh", "--batch"]
+        assert args[0].endswith("nice")
+
+    @requires_ionice
+    def test_ionice_prefix(self):
+        """Test I/O classes map to ionice arguments"""
+        assert SensorPriority(io_class="idle").prefix[1:] == ["-c", "3"]
+        assert SensorPriority(io_class="best-effort", io_level=6).prefix[1:] == ["-c", "2", "-n", "6"]
+
+    def test_missing_tool_is_skipped(self, monkeypatch, caplog):
+        """Test a missing nice binary is logged and skipped"""
+        monkeypatch.setattr(shutil, "which", lambda name: None)
+
+        assert SensorPriority(nice=5).prefix == []
+        assert "nice not found" in caplog.text
+
+    @pytest.mark.parametrize("kwargs", [{"nice": 20}, {"nice": -1}, {"io_class": "rt"}, {"io_level": 8}])
+    def test_invalid_settings(self, kwargs):
+        """Test out-of-range settings are rejected"""
+        with pytest.raises(ValueError):
+            SensorPriority(**kwargs)
+
+    def test_wrapped_sensor_runs_niced(self, priority_script):
+        """Test the sensor process runs with the configured niceness"""
+        sensor = SubprocessSensor(str(priority_script), priority=SensorPriority(nice=7))
+
+        stdout, _ = sensor.execute({})
+        base = subprocess.run(["nice"], capture_output=True, text=True).stdout.strip()
+        assert stdout == f"nice={min(int(base) + 7, 19)}"
+
+    @requires_ionice
+    def test_wrapped_sensor_runs_io_idle(self, tmp_path):
+        """Test the sensor process runs in the idle I/O class"""
+        script = tmp_path / "io_sensor.sh"
+        script.write_text("#!/bin/sh\ncat > /dev/null\nionice -p $$\necho '{}' >&2\n")
+        script.chmod(0o755)
+        sensor = SubprocessSensor(str(script), priority=SensorPriority(io_class="idle"))
+
+        assert sensor.execute({})[0] == "idle"
+
+    def test_agent_applies_settings(self, priority_script):
+        """Test agent settings reach the sensor backend"""
+        agent = ContextAgent(sensor_path=str(priority_script), sensor_nice=3)
+
+        stdout, _ = agent._execute_sensor({})
+        assert stdout.startswith("nice=")
+        assert agent.sensor._priority.nice == 3
+
+    def test_missing_script_not_masked(self, tmp_path):
+        """Test a missing script is reported as such behind the wrappers"""
+        sensor = SubprocessSensor(str(tmp_path / "missing.sh"), priority=SensorPriority(nice=3))
+
+        with pytest.raises(SensorError, match="Sensor script not found"):
+            sensor.execute({})
+
+
+class TestSensorCgroup:
+    """Test cgroup v2 discovery and setup"""
+
+    def test_own_cgroup_dir(self, tmp_path):
+        """Test the cgroup2 mount and membership are combined"""
+        mountinfo = tmp_path / "mountinfo"
+        mountinfo.write_text(
+            "22 1 0:20 / /sys/fs/cgroup/memory rw - cgroup cgroup rw,memory\n"
+            "35 1 0:30 / /sys/fs/cgroup rw,nosuid - cgroup2 cgroup2 rw\n"
+        )
+        cgroup = tmp_path / "cgroup"
+        cgroup.write_text("4:memory:/x\n0::/user.slice/agent.scope\n")
+
+        assert own_cgroup_dir(str(mountinfo), str(cgroup)) == \
+            Path("/sys/fs/cgroup/user.slice/agent.scope")
+
+    def test_no_cgroup2(self, tmp_path):
+        """Test hosts without cgroup v2 are detected"""
+        mountinfo = tmp_path / "mountinfo"
+        mountinfo.write_text("22 1 0:20 / /sys/fs/cgroup/cpu rw - cgroup cgroup rw,cpu\n")
+        cgroup = tmp_path / "cgroup"
+        cgroup.write_text("1:cpu:/\n")
+
+        assert own_cgroup_dir(str(mountinfo), str(cgroup)) is None
+
+    def test_create_writes_cpu_max(self, cgroup_parent):
+        """Test the cpu controller is enabled and the quota written as cpu.max"""
+        cgroup = SensorCgroup.create(0.25, parent=cgroup_parent)
+
+        assert cgroup.path == cgroup_parent / "context-sensors"
+        assert (cgroup_parent / "cgroup.subtree_control").read_text() == "+cpu\n"
+        assert (cgroup.path / "cpu.max").read_text() == "25000 100000\n"
+        assert cgroup.procs_file == cgroup.path / "cgroup.procs"
+
+    def test_cpu_controller_not_delegated(self, cgroup_parent, caplog):
+        """Test a parent without the cpu controller disables the quota"""
+        (cgroup_parent / "cgroup.controllers").write_text("memory pids\n")
+
+        assert SensorCgroup.create(0.5, parent=cgroup_parent) is None
+        assert "cpu controller not delegated" in caplog.text
+
+    def test_failed_setup_removes_cgroup(self, tmp_path, caplog):
+        """Test a cgroup created without cpu.max is removed again"""
+        (tmp_path / "cgroup.controllers").write_text("cpu\n")
+
+        assert SensorCgroup.create(0.5, parent=tmp_path) is None
+        assert not (tmp_path / "context-sensors").exists()
+        assert "cpu controller not enabled" in caplog.text
+
+    def test_failed_setup_restores_agent_cgroup(self, tmp_path, monkeypatch, caplog):
+        """Test the agent moved to a leaf cgroup is moved back when setup fails"""
+        parent = tmp_path / "parent"
+        parent.mkdir()
+        (parent / "cgroup.controllers").write_text("cpu\n")
+        (parent / "cgroup.procs").write_text("")
+        attempts = []
+        removed = []
+
+        def enable_cpu(path):
+            attempts.append(path)
+            if len(attempts) == 1:
+                raise OSError(errno.EBUSY, "Device or resource busy")
+
+        monkeypatch.setattr("src.priority.own_cgroup_dir", lambda: parent)
+        monkeypatch.setattr("src.priority._enable_cpu", enable_cpu)
+        # The fake cgroup directories hold regular files; record removals only
+        monkeypatch.setattr(Path, "rmdir", lambda path: removed.append(path))
+
+        assert SensorCgroup.create(0.5) is None
+        assert len(attempts) == 2
+        assert (parent / "cgroup.procs").read_text() == f"{os.getpid()}\n"
+        assert removed == [parent / "context-sensors", parent / "agent"]
+        assert "CPU quota disabled" in caplog.text
+
+    def test_create_failure_disables(self, tmp_path, caplog):
+        """Test an unwritable cgroup disables the quota"""
+        assert SensorCgroup.create(0.5, parent=tmp_path / "missing") is None
+        assert "CPU quota disabled" in caplog.text
+
+    def test_cgroup_join_prefix(self, cgroup_parent, priority_script):
+        """Test the sensor writes its own PID to cgroup.procs before starting"""
+        cgroup = SensorCgroup.create(0.5, parent=cgroup_parent)
+        sensor = SubprocessSensor(str(priority_script), priority=SensorPriority(cgroup=cgroup))
+
+        stdout, _ = sensor.execute({})
+
+        assert stdout.startswith("nice=")
+        assert int(cgroup.procs_file.read_text()) > 0
+
+    def test_failed_join_is_reported(self, tmp_path, priority_script):
+        """Test a sensor that cannot join its cgroup fails instead of running unthrottled"""
+        cgroup = SensorCgroup(tmp_path)
+        cgroup.procs_file.mkdir()
+        sensor = SubprocessSensor(str(priority_script), priority=SensorPriority(cgroup=cgroup))
+
+        with pytest.raises(SensorError, match="Cannot join sensor cgroup"):
+            sensor.execute({})
+
+        with pytest.raises(OSError):
+            cgroup.probe()
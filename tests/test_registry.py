@@ -0,0 +1,234 @@
+"""
+Unit Tests for the Per-Field Sensor Registry
+
+Tests group refresh cadences, budget backoff and output parity with the
+native sensor backend.
+"""
+
+import pytest
+
+from src.agent import ContextAgent, SensorError
+from src.events import EventType
+from src.registry import (
+    SensorRegistry,
+    FieldSensor,
+    GitFieldSensor,
+    ContextWindowFieldSensor,
+)
+from src.sensors import NativeSensor, create_sensor
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingGitSensor(GitFieldSensor):
+    """Git field sensor that counts collections"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = 0
+
+    def collect(self, data, cwd):
+        self.calls += 1
+        return super().collect(data, cwd)
+
+
+@pytest.fixture
+def git_workspace(tmp_path):
+    """Workspace with a minimal git repository on branch main"""
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+    return tmp_path
+
+
+class TestSensorRegistry:
+    """Test registry output and refresh cadence"""
+
+    @pytest.mark.parametrize("input_data", [
+        None,
+        {"model": "claude-opus", "context_window": {"max_tokens": 1000, "tokens_used": 250}},
+        {"workspace_path": "/tmp"},
+    ])
+    def test_matches_native_sensor(self, git_workspace, input_data):
+        """Test merged output is identical to the native backend"""
+        registry = SensorRegistry(cwd=str(git_workspace))
+        native = NativeSensor(cwd=str(git_workspace))
+
+        assert registry.execute(input_data) == native.sense(input_data)
+
+    def test_slow_group_is_cached(self, git_workspace):
+        """Test the git group is only recollected after its interval"""
+        clock = FakeClock()
+        git = CountingGitSensor(interval=30.0)
+        registry = SensorRegistry(cwd=str(git_workspace), sensors=[git], clock=clock)
+
+        registry.execute({"context_window": {"tokens_used": 1}})
+        (git_workspace / ".git" / "HEAD").write_text("ref: refs/heads/feature\n")
+        clock.now += 10.0
+        display, data = registry.execute({"context_window": {"tokens_used": 2}})
+
+        assert git.calls == 1
+        assert data["workspace"]["git"]["branch"] == "main"
+        assert data["context_window"]["tokens_used"] == 2
+        assert registry.last_refreshed == ("model", "context_window")
+
+        clock.now += 30.0
+        display, data = registry.execute()
+        assert git.calls == 2
+        assert data["workspace"]["git"]["branch"] == "feature"
+        assert "🌿 feature" in display
+
+    def test_input_change_refreshes_group(self, tmp_path):
+        """Test a changed input key refreshes its group despite the interval"""
+        clock = FakeClock()
+        registry = SensorRegistry(
+            cwd=str(tmp_path),
+            sensors=[ContextWindowFieldSensor(interval=60.0)],
+            clock=clock
+        )
+
+        registry.execute({"context_window": {"tokens_used": 10}})
+        registry.execute({"context_window": {"tokens_used": 10}})
+        _, data = registry.execute({"context_window": {"tokens_used": 20}})
+
+        assert data["context_window"]["tokens_used"] == 20
+        assert registry.stats()["context_window"]["runs"] == 2
+        assert registry.stats()["context_window"]["hits"] == 1
+
+    def test_invalidate(self, git_workspace):
+        """Test invalidate forces a refresh"""
+        git = CountingGitSensor(interval=300.0)
+        registry = SensorRegistry(cwd=str(git_workspace), sensors=[git])
+
+        registry.execute()
+        registry.invalidate("git")
+        registry.execute()
+
+        assert git.calls == 2
+
+    def test_budget_overrun_backs_off(self, tmp_path):
+        """Test runs over budget double the effective interval"""
+        clock = FakeClock()
+
+        class SlowSensor(FieldSensor):
+            group = "git"
+            path = ("workspace", "git")
+
+            def collect(self, data, cwd):
+                clock.now += 2.0
+                return {"is_repo": False, "branch": ""}
+
+        registry = SensorRegistry(
+            cwd=str(tmp_path),
+            sensors=[SlowSensor(interval=5.0, budget=1.0, max_backoff=4)],
+            clock=clock
+        )
+
+        registry.execute()
+        assert registry.stats()["git"]["interval"] == 10.0
+        clock.now += 10.0
+        registry.execute()
+        clock.now += 20.0
+        registry.execute()
+
+        stats = registry.stats()["git"]
+        assert stats["interval"] == 20.0
+        assert stats["over_budget"] == 3
+        assert stats["last_duration"] == pytest.approx(2.0)
+
+    def test_invalid_input_raises(self, tmp_path):
+        """Test invalid context window values raise SensorError"""
+        registry = SensorRegistry(cwd=str(tmp_path))
+
+        with pytest.raises(SensorError, match="tokens_used"):
+            registry.execute({"context_window": {"tokens_used": "many"}})
+
+    def test_registry_backend(self, tmp_path):
+        """Test the registry is available as a sensor backend"""
+        sensor = create_sensor("registry", str(tmp_path / "context_sensor.sh"))
+
+        assert isinstance(sensor, SensorRegistry)
+        assert sensor.cwd == tmp_path
+
+    def test_symlinked_cwd_matches_native_sensor(self, git_workspace, tmp_path_factory):
+        """Test a symlinked workspace is reported like the native backend does"""
+        link = tmp_path_factory.mktemp("links") / "workspace"
+        link.symlink_to(git_workspace)
+
+        registry = SensorRegistry(cwd=str(link))
+        native = NativeSensor(cwd=str(link))
+
+        assert registry.cwd == native.cwd == link
+        assert registry.execute() == native.sense()
+
+    def test_document_reports_refreshed_keys(self, git_workspace):
+        """Test documents list the top-level keys recollected since the previous one"""
+        clock = FakeClock()
+        registry = SensorRegistry(cwd=str(git_workspace), clock=clock)
+
+        _, first = registry.execute({"context_window": {"tokens_used": 1}})
+        clock.now += 1.0
+        _, second = registry.execute({"context_window": {"tokens_used": 2}})
+
+        assert second.refreshed_since(first) == {"model", "context_window"}
+        assert second.refreshed_since(None) is None
+        assert first.refreshed_since(second) is None
+
+
+class TestAgentWithRegistry:
+    """Test ContextAgent on the registry backend"""
+
+    def test_unchanged_groups_short_circuit(self, git_workspace):
+        """Test polls with no refreshed group reuse the previous state"""
+        registry = SensorRegistry(cwd=str(git_workspace))
+        agent = ContextAgent(sensor=registry)
+
+        first = agent.get_state({"context_window": {"tokens_used": 100}})
+        second = agent.get_state({"context_window": {"tokens_used": 100}})
+        third = agent.get_state({"context_window": {"tokens_used": 500}})
+
+        assert second is first
+        assert third.context_window.tokens_used == 500
+        assert third.workspace.git.branch == "main"
+        assert agent.get_stats()["unchanged_outputs"] == 1
+
+    def test_only_refreshed_groups_are_rebuilt(self, git_workspace):
+        """Test groups served from the registry cache keep their state objects"""
+        registry = SensorRegistry(cwd=str(git_workspace))
+        agent = ContextAgent(sensor=registry)
+        updates = []
+        agent.on_change(EventType.STATE_UPDATED, updates.append)
+
+        first = agent.get_state({"context_window": {"tokens_used": 100}})
+        second = agent.get_state({"context_window": {"tokens_used": 50000}})
+
+        assert second.workspace is first.workspace
+        assert second.context_window.usage_pct == 25
+        assert second.display.endswith("25%")
+        assert list(updates[-1].metadata["changes"]) == ["context_usage"]
+
+    def test_failed_run_does_not_mark_groups_fresh(self, git_workspace):
+        """Test groups collected before a failing group are refreshed again"""
+        clock = FakeClock()
+        registry = SensorRegistry(cwd=str(git_workspace), clock=clock)
+        agent = ContextAgent(sensor=registry)
+        branches = []
+        agent.on_change(EventType.BRANCH_CHANGED, lambda event: branches.append(event.new_value))
+
+        agent.get_state({"context_window": {"tokens_used": 1}})
+        (git_workspace / ".git" / "HEAD").write_text("ref: refs/heads/other\n")
+        clock.now += 60.0
+        agent.get_state({"context_window": {"tokens_used": "abc"}})
+        state = agent.get_state({"context_window": {"tokens_used": 2}})
+
+        assert registry.last_refreshed == ("model", "workspace", "git", "context_window")
+        assert state.workspace.git.branch == "other"
+        assert "🌿 other" in state.display
+        assert branches == ["other"]
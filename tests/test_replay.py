@@ -0,0 +1,193 @@
+"""
+Unit Tests for Sensor Record and Replay
+
+Tests trace recording, replay ordering and timing, and driving a
+ContextAgent from a replayed trace.
+"""
+
+import gzip
+import json
+import time
+
+import pytest
+
+from src.agent import ContextAgent
+from src.replay import RecordingSensor, ReplaySensor, read_trace
+from src.sensors import Sensor, NativeSensor, SensorError
+
+
+class ScriptedSensor(Sensor):
+    """Sensor returning scripted outputs and errors"""
+
+    name = "scripted"
+
+    def __init__(self, results, cwd="/tmp"):
+        self._results = list(results)
+        self._cwd = cwd
+        self.closed = False
+
+    @property
+    def cwd(self):
+        return self._cwd
+
+    def execute(self, input_data=None, timeout=None):
+        result = self._results.pop(0)
+        if isinstance(result, SensorError):
+            raise result
+        return result
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def trace_path(tmp_path):
+    return str(tmp_path / "trace.ndjson")
+
+
+class TestRecordingSensor:
+    """Test trace recording"""
+
+    def test_records_outputs_and_errors(self, trace_path):
+        """Test outputs and errors are written with their inputs"""
+        inner = ScriptedSensor([("display", '{"model": "a"}'), SensorError("boom")])
+        recorder = RecordingSensor(inner, trace_path)
+
+        assert recorder.execute({"model": "a"}) == ("display", '{"model": "a"}')
+        with pytest.raises(SensorError, match="boom"):
+            recorder.execute({"model": "b"})
+        recorder.close()
+
+        header, records = read_trace(trace_path)
+        assert header["sensor"] == "scripted"
+        assert header["cwd"] == "/tmp"
+        assert records[0]["input"] == {"model": "a"}
+        assert records[0]["stdout"] == "display"
+        assert records[1]["error"] == "boom"
+        assert all(record["duration"] >= 0 for record in records)
+        assert inner.closed
+
+    def test_gzip_trace(self, tmp_path):
+        """Test .gz traces are compressed"""
+        path = tmp_path / "trace.ndjson.gz"
+        recorder = RecordingSensor(NativeSensor(cwd=str(tmp_path)), str(path))
+        recorder.execute({"model": "claude"})
+        recorder.close()
+
+        with gzip.open(path, "rt") as f:
+            assert json.loads(f.readline())["format"] == "context-sensor-trace"
+        assert len(read_trace(str(path))[1]) == 1
+
+    def test_append(self, trace_path):
+        """Test appending keeps a single header"""
+        for _ in range(2):
+            recorder = RecordingSensor(ScriptedSensor([("d", "{}")]), trace_path, append=True)
+            recorder.execute()
+            recorder.close()
+
+        _, records = read_trace(trace_path)
+        assert len(records) == 2
+
+    def test_batch_records_each_input(self, trace_path, tmp_path):
+        """Test batch executions record one entry per input"""
+        recorder = RecordingSensor(NativeSensor(cwd=str(tmp_path)), trace_path)
+        results = recorder.execute_batch([{"model": "a"}, {"context_window": {"tokens_used": "x"}}])
+        recorder.close()
+
+        _, records = read_trace(trace_path)
+        assert isinstance(results[1], SensorError)
+        assert [("error" in record) for record in records] == [False, True]
+
+    def test_invalid_trace(self, trace_path):
+        """Test non-trace files are rejected"""
+        with open(trace_path, "w") as f:
+            f.write('{"something": "else"}\n')
+
+        with pytest.raises(SensorError, match="Unsupported"):
+            ReplaySensor(trace_path)
+
+
+class TestReplaySensor:
+    """Test trace replay"""
+
+    @pytest.fixture
+    def recorded(self, trace_path):
+        recorder = RecordingSensor(
+            ScriptedSensor([("one", "{}"), SensorError("failed"), ("two", "{}")]), trace_path
+        )
+        for _ in range(3):
+            try:
+                recorder.execute()
+            except SensorError:
+                pass
+        recorder.close()
+        return trace_path
+
+    def test_replays_in_order(self, recorded):
+        """Test records and errors are replayed in order"""
+        sensor = ReplaySensor(recorded, speed=None)
+
+        assert sensor.execute() == ("one", "{}")
+        with pytest.raises(SensorError, match="failed"):
+            sensor.execute()
+        assert sensor.execute() == ("two", "{}")
+        with pytest.raises(SensorError, match="exhausted"):
+            sensor.execute()
+
+    def test_loop_and_rewind(self, recorded):
+        """Test looping restarts the trace"""
+        sensor = ReplaySensor(recorded, speed=None, loop=True)
+        for _ in range(3):
+            try:
+                sensor.execute()
+            except SensorError:
+                pass
+
+        assert sensor.execute() == ("one", "{}")
+        sensor.rewind()
+        assert sensor.position == 0
+
+    def test_speed_scales_duration(self, trace_path):
+        """Test recorded durations are replayed at the requested speed"""
+        with open(trace_path, "w") as f:
+            f.write('{"format": "context-sensor-trace", "version": 1, "sensor": "x", "cwd": "/"}\n')
+            f.write('{"at": 0, "input": null, "stdout": "d", "stderr": "{}", "duration": 0.2}\n')
+            f.write('{"at": 1, "input": null, "stdout": "d", "stderr": "{}", "duration": 0.2}\n')
+
+        sensor = ReplaySensor(trace_path, speed=4.0)
+        started = time.monotonic()
+        sensor.execute()
+        assert 0.04 <= time.monotonic() - started < 0.2
+
+        with pytest.raises(SensorError, match="timed out"):
+            ReplaySensor(trace_path, speed=1.0).execute(timeout=0.01)
+
+    def test_invalid_speed(self, recorded):
+        """Test speed must be positive"""
+        with pytest.raises(ValueError):
+            ReplaySensor(recorded, speed=0)
+
+
+class TestAgentRecordReplay:
+    """Test recording from and replaying into a ContextAgent"""
+
+    def test_record_path_and_replay(self, tmp_path):
+        """Test a recorded agent session replays to identical states"""
+        path = str(tmp_path / "session.ndjson.gz")
+        inputs = [
+            {"model": "claude", "context_window": {"tokens_used": tokens}}
+            for tokens in (0, 1000, 1000, 50000)
+        ]
+
+        agent = ContextAgent(sensor_backend="native", record_path=path)
+        recorded = [agent.get_state(input_data).to_dict() for input_data in inputs]
+        agent.close()
+
+        replay = ContextAgent(sensor=ReplaySensor(path, speed=None))
+        replayed = [replay.get_state().to_dict() for _ in inputs]
+
+        def strip(states):
+            return [{k: v for k, v in s.items() if k != "last_updated"} for s in states]
+
+        assert strip(replayed) == strip(recorded)
+        assert replay.get_stats()["unchanged_outputs"] == 1
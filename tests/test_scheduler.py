@@ -0,0 +1,202 @@
+"""
+Unit Tests for the Shared Poll Scheduler
+
+Tests callback scheduling, wake-up and cancellation, and ContextAgent
+polling on a shared scheduler.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from unittest.mock import patch
+
+from src.agent import ContextAgent
+from src.scheduler import PollScheduler, shared_scheduler, shared_event_loop
+
+
+SENSOR_OUTPUT = (
+    "[Claude] 📁 workspace",
+    '{"version": "1.0.0", "model": "Claude", "workspace": {"path": "/tmp", "name": "workspace", '
+    '"git": {"is_repo": false, "branch": ""}}, "context_window": {"max_tokens": 200000, '
+    '"tokens_used": 0, "usage_pct": 0}}'
+)
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = PollScheduler(workers=1)
+    yield scheduler
+    scheduler.shutdown()
+
+
+class TestPollScheduler:
+    """Test the timer heap and its worker threads"""
+
+    def test_invalid_workers(self):
+        """Test at least one worker is required"""
+        with pytest.raises(ValueError):
+            PollScheduler(workers=0)
+
+    def test_callback_reschedules_itself(self, scheduler):
+        """Test a callback runs again after the delay it returns, until None"""
+        calls = []
+
+        def poll():
+            calls.append(time.monotonic())
+            return 0.01 if len(calls) < 3 else None
+
+        job = scheduler.schedule(poll)
+        wait_until(lambda: job.cancelled)
+
+        assert len(calls) == 3
+        assert scheduler.stats()["jobs"] == 0
+        assert scheduler.stats()["runs"] == 3
+
+    def test_many_jobs_one_thread(self, scheduler):
+        """Test callbacks with different intervals share one worker thread"""
+        threads = set()
+        counts = {"fast": 0, "slow": 0}
+
+        def make(name, interval):
+            def poll():
+                threads.add(threading.current_thread().name)
+                counts[name] += 1
+                return interval
+            return poll
+
+        jobs = [scheduler.schedule(make("fast", 0.01)), scheduler.schedule(make("slow", 0.2))]
+        time.sleep(0.3)
+        for job in jobs:
+            job.cancel()
+
+        assert len(threads) == 1
+        assert counts["fast"] > 3 * counts["slow"] >= 3
+
+    def test_wake_runs_early(self, scheduler):
+        """Test wake() runs a callback long before its due time"""
+        ran = threading.Event()
+        job = scheduler.schedule(ran.set, delay=60.0)
+
+        job.wake()
+
+        assert ran.wait(5.0)
+        job.cancel()
+
+    def test_cancel_waits_for_running_callback(self, scheduler):
+        """Test cancel() returns only after a running callback finished"""
+        started = threading.Event()
+        finished = threading.Event()
+
+        def poll():
+            started.set()
+            time.sleep(0.1)
+            finished.set()
+            return 0.0
+
+        job = scheduler.schedule(poll)
+        assert started.wait(5.0)
+        job.cancel()
+
+        assert finished.is_set()
+        runs = job.runs
+        time.sleep(0.05)
+        assert job.runs == runs
+
+    def test_failing_callback_keeps_schedule(self, scheduler):
+        """Test an exception is logged and the callback keeps its last delay"""
+        calls = []
+
+        def poll():
+            calls.append(1)
+            raise RuntimeError("boom")
+
+        job = scheduler.schedule(poll)
+        wait_until(lambda: len(calls) >= 3)
+        job.cancel()
+
+        assert scheduler.stats()["errors"] >= 3
+
+    def test_schedule_after_shutdown(self):
+        """Test scheduling on a shut down scheduler fails"""
+        scheduler = PollScheduler()
+        scheduler.shutdown()
+
+        with pytest.raises(RuntimeError):
+            scheduler.schedule(lambda: None)
+
+    def test_shared_instances(self):
+        """Test the process-wide scheduler and event loop are singletons"""
+        assert shared_scheduler() is shared_scheduler()
+
+        loop = shared_event_loop()
+        assert loop is shared_event_loop()
+
+        async def answer():
+            return 42
+
+        assert asyncio.run_coroutine_threadsafe(answer(), loop).result(timeout=5.0) == 42
+
+
+class TestAgentScheduler:
+    """Test ContextAgent polling on a shared scheduler"""
+
+    def test_agents_share_scheduler_threads(self, scheduler):
+        """Test started agents poll without their own poller threads"""
+        agents = [ContextAgent(scheduler=scheduler) for _ in range(3)]
+        patches = [patch.object(agent, '_execute_sensor', return_value=SENSOR_OUTPUT) for agent in agents]
+        mocks = [p.start() for p in patches]
+
+        try:
+            for agent in agents:
+                agent.start(polling_interval=0.01)
+
+            wait_until(lambda: all(mock.call_count >= 3 for mock in mocks))
+            assert all(agent._poll_thread is None for agent in agents)
+            assert agents[0].get_stats()["scheduler"]["jobs"] == 3
+        finally:
+            for agent in agents:
+                agent.stop()
+            for p in patches:
+                p.stop()
+
+        assert scheduler.stats()["jobs"] == 0
+        counts = [mock.call_count for mock in mocks]
+        time.sleep(0.05)
+        assert [mock.call_count for mock in mocks] == counts
+
+    def test_workspace_change_wakes_scheduled_poll(self, scheduler):
+        """Test a watcher notification runs the scheduled poll right away"""
+        agent = ContextAgent(scheduler=scheduler)
+
+        with patch.object(agent, '_execute_sensor', return_value=SENSOR_OUTPUT) as mock_exec:
+            agent.start(polling_interval=60.0)
+            try:
+                assert mock_exec.call_count == 1
+                agent._on_workspace_change({"git"})
+                wait_until(lambda: mock_exec.call_count == 2)
+            finally:
+                agent.stop()
+
+    def test_suspended_agent_resumes_on_read(self, scheduler):
+        """Test an idle agent stops polling on the scheduler until it is read"""
+        agent = ContextAgent(scheduler=scheduler, enable_events=False, idle_timeout=0.05)
+
+        with patch.object(agent, '_execute_sensor', return_value=SENSOR_OUTPUT) as mock_exec:
+            agent.start(polling_interval=0.01)
+            try:
+                wait_until(lambda: agent.is_suspended)
+                calls = mock_exec.call_count
+
+                agent.get_state_dict()
+                wait_until(lambda: mock_exec.call_count > calls)
+            finally:
+                agent.stop()
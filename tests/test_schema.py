@@ -0,0 +1,164 @@
+"""
+Unit Tests for the Schema-Compiled State Decoder
+
+Tests type coercion, clamping, field-level errors and partial states.
+"""
+
+import pytest
+
+from src.schema import (
+    AGENT_STATE_SCHEMA,
+    Field,
+    Record,
+    compile_decoder,
+    decode_agent_state,
+)
+from src.state import AgentState, WorkspaceInfo, GitInfo, ContextWindowInfo
+
+
+class TestDecodeAgentState:
+    """Test decoding of sensor JSON into AgentState"""
+
+    def test_valid_document(self, valid_sensor_json):
+        """Test a complete document decodes without errors"""
+        state, errors = decode_agent_state(valid_sensor_json, "  [Claude] 📁 project  ")
+
+        assert errors == []
+        assert state.model == "Claude"
+        assert state.workspace == WorkspaceInfo(
+            path="/Users/test/project", name="project", git=GitInfo(is_repo=True, branch="main")
+        )
+        assert state.context_window == ContextWindowInfo(
+            max_tokens=200000, tokens_used=25000, usage_pct=13
+        )
+        assert state.display == "[Claude] 📁 project"
+        assert state.sensor_version == "1.0.0"
+        assert state.agent_type == "context"
+        assert state.last_updated
+
+    def test_matches_dataclass_construction(self, valid_sensor_json):
+        """Test decoded objects behave like normally constructed ones"""
+        state, _ = decode_agent_state(valid_sensor_json, "display")
+        expected = AgentState(
+            model="Claude",
+            workspace=WorkspaceInfo(
+                path="/Users/test/project", name="project", git=GitInfo(is_repo=True, branch="main")
+            ),
+            context_window=ContextWindowInfo(max_tokens=200000, tokens_used=25000, usage_pct=13),
+            display="display",
+            last_updated=state.last_updated,
+        )
+
+        assert state == expected
+        assert hash(state) == hash(expected)
+        assert state.to_dict() == expected.to_dict()
+
+    def test_missing_and_null_fields_use_defaults(self):
+        """Test missing or null fields take defaults without errors"""
+        state, errors = decode_agent_state({"model": None, "workspace": {"git": None}}, "")
+
+        assert errors == []
+        assert state.model == "Claude"
+        assert state.workspace.git == GitInfo()
+        assert state.context_window == ContextWindowInfo()
+
+    @pytest.mark.parametrize("value, expected", [
+        ("50000", 50000),
+        (" 7 ", 7),
+        (12.0, 12),
+        (13.5, 13),
+        ("13.5", 13),
+    ])
+    def test_int_coercion(self, value, expected):
+        """Test numeric strings and finite floats are coerced"""
+        state, errors = decode_agent_state({"context_window": {"tokens_used": value}}, "")
+
+        assert errors == []
+        assert state.context_window.tokens_used == expected
+
+    @pytest.mark.parametrize("value", ["lots", "nan", float("inf"), True, [], {}])
+    def test_invalid_int_reports_error(self, value):
+        """Test invalid ints fall back to the default with a field error"""
+        state, errors = decode_agent_state(
+            {"model": "GPT-4", "context_window": {"tokens_used": value}}, ""
+        )
+
+        assert state.context_window.tokens_used == 0
+        assert state.model == "GPT-4"
+        assert [error.path for error in errors] == ["context_window.tokens_used"]
+        assert errors[0].value == value
+
+    def test_fractional_usage_pct_is_kept(self):
+        """Test a fractional usage_pct is coerced instead of reset to 0"""
+        state, errors = decode_agent_state({"context_window": {"usage_pct": 85.7}}, "")
+
+        assert errors == []
+        assert state.context_window.usage_pct == 85
+
+    def test_bool_and_str_coercion(self):
+        """Test string booleans and numeric strings are coerced"""
+        state, errors = decode_agent_state({
+            "model": 4,
+            "workspace": {"git": {"is_repo": "true", "branch": 123}},
+        }, "")
+
+        assert errors == []
+        assert state.model == "4"
+        assert state.workspace.git == GitInfo(is_repo=True, branch="123")
+
+    def test_invalid_nested_object(self):
+        """Test a non-object where an object is expected is reported"""
+        state, errors = decode_agent_state({"workspace": "oops", "version": "2.0.0"}, "")
+
+        assert state.workspace == WorkspaceInfo()
+        assert state.sensor_version == "2.0.0"
+        assert [str(error) for error in errors] == ["workspace: expected object (got 'oops')"]
+
+    def test_non_object_document(self):
+        """Test a non-object document yields a default state"""
+        state, errors = decode_agent_state(["not", "an", "object"], "display")
+
+        assert state.model == "Claude"
+        assert state.display == "display"
+        assert errors[0].path == ""
+
+    def test_values_are_clamped(self):
+        """Test the same clamping as ContextWindowInfo.__post_init__"""
+        state, errors = decode_agent_state(
+            {"context_window": {"max_tokens": -5, "tokens_used": -1, "usage_pct": 150}}, ""
+        )
+
+        assert errors == []
+        assert state.context_window == ContextWindowInfo(max_tokens=-5, tokens_used=-1, usage_pct=150)
+        assert state.context_window.usage_pct == 100
+
+    def test_from_sensor_output_uses_decoder(self):
+        """Test AgentState.from_sensor_output returns partial state on bad types"""
+        state = AgentState.from_sensor_output(
+            {"model": "Claude", "context_window": {"tokens_used": "lots", "usage_pct": 5}}, "x"
+        )
+
+        assert state.context_window.tokens_used == 0
+        assert state.context_window.usage_pct == 5
+
+
+class TestCompileDecoder:
+    """Test compiling custom schemas"""
+
+    def test_custom_schema(self):
+        """Test schemas compile for any frozen dataclass"""
+        decode = compile_decoder(Record(None, GitInfo, (
+            Field("repo", bool, False, attr="is_repo"),
+            Field("branch", str, "main"),
+        )))
+
+        git, errors = decode({"repo": True})
+
+        assert git == GitInfo(is_repo=True, branch="main")
+        assert errors == []
+
+    def test_schema_covers_state_fields(self):
+        """Test the schema decodes every sensor-derived AgentState field"""
+        attrs = {member.attr or member.key for member in AGENT_STATE_SCHEMA.fields}
+
+        assert attrs == {"model", "workspace", "context_window", "sensor_version"}
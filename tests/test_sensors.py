@@ -0,0 +1,361 @@
+"""
+Unit Tests for Sensor Backends
+
+Tests the pluggable sensor interface, the native in-process sensor and
+its equivalence with the bundled sensor script.
+"""
+
+import pytest
+import json
+import shutil
+import subprocess
+import sys
+import textwrap
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from src.agent import ContextAgent
+from src.sensors import (
+    NativeSensor,
+    SubprocessSensor,
+    SensorError,
+    create_sensor,
+    find_git_dir,
+    read_git_branch,
+)
+
+
+SENSOR_INPUTS = [
+    {},
+    {"model": "claude-sonnet-4"},
+    {"model": "GPT-4", "context_window": {"max_tokens": 200000, "tokens_used": 50000}},
+    {"context_window": {"max_tokens": 0, "tokens_used": 10}},
+    {"context_window": {"max_tokens": 1000, "tokens_used": 999}},
+    {"model": None, "workspace_path": "/nonexistent/path"},
+]
+
+
+@pytest.fixture
+def copied_sensor_script(sensor_script_path, temp_non_repo):
+    """Sensor script copied into a directory outside any git repository"""
+    script = temp_non_repo / "context_sensor.sh"
+    shutil.copy(sensor_script_path, script)
+    script.chmod(0o755)
+    return script
+
+
+@pytest.mark.sensor
+class TestNativeSensorEquivalence:
+    """Native sensor must produce the same output as the sensor script"""
+
+    @pytest.mark.parametrize("input_data", SENSOR_INPUTS)
+    def test_matches_script_in_repo(self, sensor_script_path, input_data):
+        """Test native output matches the script inside a git repository"""
+        script_stdout, script_stderr = SubprocessSensor(str(sensor_script_path)).execute(
+            input_data, timeout=5.0
+        )
+        native_stdout, native_stderr = NativeSensor(
+            cwd=str(sensor_script_path.parent)
+        ).execute(input_data)
+
+        assert native_stdout == script_stdout
+        assert json.loads(native_stderr) == json.loads(script_stderr)
+
+    @pytest.mark.parametrize("input_data", SENSOR_INPUTS)
+    def test_matches_script_outside_repo(self, copied_sensor_script, input_data):
+        """Test native output matches the script outside a git repository"""
+        script_stdout, script_stderr = SubprocessSensor(str(copied_sensor_script)).execute(
+            input_data, timeout=5.0
+        )
+        native_stdout, native_stderr = NativeSensor(
+            cwd=str(copied_sensor_script.parent)
+        ).execute(input_data)
+
+        assert native_stdout == script_stdout
+        assert json.loads(native_stderr) == json.loads(script_stderr)
+
+    def test_workspace_path_input(self, sensor_script_path, temp_git_repo):
+        """Test explicit workspace_path is reported like the script does"""
+        input_data = {"workspace_path": str(temp_git_repo)}
+
+        script_stdout, _ = SubprocessSensor(str(sensor_script_path)).execute(input_data)
+        native_stdout, native_stderr = NativeSensor(
+            cwd=str(sensor_script_path.parent)
+        ).execute(input_data)
+
+        assert native_stdout == script_stdout
+        assert json.loads(native_stderr)["workspace"]["name"] == "test_repo"
+
+
+@pytest.mark.sensor
+class TestNativeSensor:
+    """Test native sensor behavior"""
+
+    def test_git_branch_detection(self, temp_git_repo):
+        """Test branch is read from .git/HEAD"""
+        subprocess.run(
+            ["git", "checkout", "-b", "feature/native"],
+            cwd=temp_git_repo, check=True, capture_output=True
+        )
+
+        display, data = NativeSensor(cwd=str(temp_git_repo)).sense({})
+
+        assert data["workspace"]["git"] == {"is_repo": True, "branch": "feature/native"}
+        assert "🌿 feature/native" in display
+
+    def test_git_detection_from_subdirectory(self, temp_git_repo):
+        """Test repository is found from a nested directory"""
+        nested = temp_git_repo / "a" / "b"
+        nested.mkdir(parents=True)
+
+        assert find_git_dir(nested) == temp_git_repo / ".git"
+
+    def test_detached_head(self, temp_git_repo):
+        """Test detached HEAD reports a repository without branch"""
+        subprocess.run(
+            ["git", "checkout", "--detach"],
+            cwd=temp_git_repo, check=True, capture_output=True
+        )
+
+        _, data = NativeSensor(cwd=str(temp_git_repo)).sense({})
+
+        assert data["workspace"]["git"] == {"is_repo": True, "branch": ""}
+
+    def test_gitdir_file(self, tmp_path, temp_git_repo):
+        """Test `.git` pointer files (worktrees, submodules) are followed"""
+        worktree = tmp_path / "worktree"
+        subprocess.run(
+            ["git", "worktree", "add", "-b", "wt-branch", str(worktree)],
+            cwd=temp_git_repo, check=True, capture_output=True
+        )
+
+        git_dir = find_git_dir(worktree)
+
+        assert git_dir is not None
+        assert read_git_branch(git_dir) == "wt-branch"
+
+    def test_non_repo(self, temp_non_repo):
+        """Test directories outside repositories report no git info"""
+        display, data = NativeSensor(cwd=str(temp_non_repo)).sense({})
+
+        assert data["workspace"]["git"] == {"is_repo": False, "branch": ""}
+        assert display == "[Claude] 📁 non_repo"
+
+    def test_invalid_token_count_raises(self, temp_non_repo):
+        """Test non-integer token counts fail like the script does"""
+        sensor = NativeSensor(cwd=str(temp_non_repo))
+
+        with pytest.raises(SensorError, match="tokens_used"):
+            sensor.execute({"context_window": {"tokens_used": "lots"}})
+
+    def test_special_characters_are_valid_json(self, temp_non_repo):
+        """Test values needing escaping still produce valid JSON"""
+        _, stderr = NativeSensor(cwd=str(temp_non_repo)).execute({"model": 'say "hi"'})
+
+        assert json.loads(stderr)["model"] == 'say "hi"'
+
+
+class TestSensorSelection:
+    """Test sensor backend selection"""
+
+    def test_create_sensor_backends(self, sensor_script_path):
+        """Test backends are created by name"""
+        assert isinstance(create_sensor("subprocess", str(sensor_script_path)), SubprocessSensor)
+
+        native = create_sensor("native", str(sensor_script_path))
+        assert isinstance(native, NativeSensor)
+        assert native.cwd == sensor_script_path.parent
+
+    def test_create_sensor_unknown_backend(self, sensor_script_path):
+        """Test unknown backend names are rejected"""
+        with pytest.raises(ValueError, match="Unknown sensor backend"):
+            create_sensor("python", str(sensor_script_path))
+
+    def test_agent_with_native_backend(self):
+        """Test agent produces state through the native backend"""
+        agent = ContextAgent(sensor_backend="native")
+
+        state = agent.get_state(input_data={
+            "model": "Claude",
+            "context_window": {"max_tokens": 200000, "tokens_used": 50000}
+        })
+
+        assert isinstance(agent.sensor, NativeSensor)
+        assert state.context_window.usage_pct == 25
+        assert state.display.endswith("| 📊 25%")
+
+    def test_agent_with_custom_sensor(self, temp_non_repo):
+        """Test agent accepts a custom sensor instance"""
+        sensor = NativeSensor(cwd=str(temp_non_repo))
+        agent = ContextAgent(sensor=sensor)
+
+        state = agent.get_state()
+
+        assert agent.sensor is sensor
+        assert state.workspace.name == "non_repo"
+
+
+@pytest.mark.sensor
+class TestBatchExecution:
+    """Test evaluating many inputs per sensor invocation"""
+
+    def test_batch_matches_single_runs(self, sensor_script_path):
+        """Test batch results match one-shot runs input by input"""
+        sensor = SubprocessSensor(str(sensor_script_path))
+
+        results = sensor.execute_batch(SENSOR_INPUTS[:5], timeout=5.0)
+
+        assert len(results) == 5
+        for input_data, (stdout, stderr) in zip(SENSOR_INPUTS[:5], results):
+            expected_stdout, expected_stderr = sensor.execute(input_data, timeout=5.0)
+            assert stdout == expected_stdout
+            assert stderr == json.loads(expected_stderr)
+
+    def test_batch_uses_one_process(self, sensor_script_path):
+        """Test a batch spawns the sensor once"""
+        sensor = SubprocessSensor(str(sensor_script_path))
+
+        with patch("subprocess.Popen", wraps=subprocess.Popen) as mock_popen:
+            sensor.execute_batch([{"model": "a"}, {"model": "b"}, {"model": "c"}], timeout=5.0)
+
+        assert mock_popen.call_count == 1
+        assert mock_popen.call_args[0][0][1:] == ["--batch"]
+
+    def test_batch_failed_input_is_isolated(self, sensor_script_path):
+        """Test one failing input does not fail the batch"""
+        sensor = SubprocessSensor(str(sensor_script_path))
+
+        results = sensor.execute_batch([
+            {"model": "a"},
+            {"context_window": {"tokens_used": "lots"}},
+            {"model": "c"},
+        ], timeout=5.0)
+
+        assert results[0][0].startswith("[a]")
+        assert isinstance(results[1], SensorError)
+        assert results[2][0].startswith("[c]")
+
+    def test_default_batch_runs_each_input(self, temp_non_repo):
+        """Test backends without a batch mode evaluate inputs one by one"""
+        sensor = NativeSensor(cwd=str(temp_non_repo))
+
+        results = sensor.execute_batch([{"model": "a"}, {"context_window": {"tokens_used": "x"}}])
+
+        assert results[0][0] == "[a] 📁 non_repo"
+        assert isinstance(results[1], SensorError)
+
+    def test_empty_batch(self, sensor_script_path):
+        """Test empty batches do not spawn the sensor"""
+        assert SubprocessSensor(str(sensor_script_path)).execute_batch([]) == []
+
+
+@pytest.mark.sensor
+class TestFramedOutput:
+    """Test the single-stream framed output mode"""
+
+    @pytest.mark.parametrize("input_data", SENSOR_INPUTS[:5])
+    def test_framed_matches_legacy_output(self, sensor_script_path, input_data):
+        """Test framed mode yields the same display and data"""
+        legacy_stdout, legacy_stderr = SubprocessSensor(str(sensor_script_path)).execute(
+            input_data, timeout=5.0
+        )
+        framed_stdout, framed_stderr = SubprocessSensor(
+            str(sensor_script_path), framed=True
+        ).execute(input_data, timeout=5.0)
+
+        assert framed_stdout == legacy_stdout
+        assert framed_stderr == json.loads(legacy_stderr)
+
+    def test_control_characters_in_workspace_name(self, sensor_script_path, tmp_path):
+        """Test a tab in the workspace name still produces valid JSON frames"""
+        workspace = tmp_path / "my\tworkspace"
+        workspace.mkdir()
+        input_data = {"model": 'say "hi"\nthere', "workspace_path": str(workspace)}
+        sensor = SubprocessSensor(str(sensor_script_path), framed=True)
+
+        _, data = sensor.execute(input_data, timeout=5.0)
+        [(_, batch_data)] = sensor.execute_batch([input_data], timeout=5.0)
+        _, legacy_data = SubprocessSensor(str(sensor_script_path)).execute(
+            input_data, timeout=5.0
+        )
+
+        assert data["workspace"]["name"] == "my\tworkspace"
+        assert data["model"] == 'say "hi"\nthere'
+        assert batch_data == data
+        assert json.loads(legacy_data) == data
+
+    def test_stderr_is_diagnostics_only(self, tmp_path):
+        """Test framed sensors may log freely on STDERR"""
+        script = tmp_path / "framed.py"
+        script.write_text(f"#!{sys.executable}\n" + textwrap.dedent("""
+            import json, sys
+            sys.stderr.write("warming up\\n")
+            sys.stdout.write(json.dumps({"type": "result", "id": 1, "display": "[X]", "data": {"model": "X"}}))
+            sys.stderr.write("done\\n")
+        """))
+        script.chmod(0o755)
+
+        stdout, stderr = SubprocessSensor(str(script), framed=True).execute({})
+
+        assert stdout == "[X]"
+        assert stderr == {"model": "X"}
+
+    def test_frame_decoded_from_chunks(self, tmp_path):
+        """Test a frame written in pieces is decoded as the pieces arrive"""
+        script = tmp_path / "framed.py"
+        script.write_text(f"#!{sys.executable}\n" + textwrap.dedent("""
+            import json, sys, time
+            frame = json.dumps({"type": "result", "id": 1, "display": "[X]", "data": {"model": "X"}})
+            for start in range(0, len(frame), 7):
+                sys.stdout.write(frame[start:start + 7])
+                sys.stdout.flush()
+                time.sleep(0.005)
+            sys.stdout.write("\\n")
+        """))
+        script.chmod(0o755)
+        chunks = []
+
+        sensor = SubprocessSensor(str(script), framed=True)
+        frames = sensor._run_framed([str(script)], b"{}", 5.0)
+        sensor._run([str(script)], b"{}", 5.0, text=False, on_stdout=chunks.append)
+
+        assert frames == [{"type": "result", "id": 1, "display": "[X]", "data": {"model": "X"}}]
+        assert len(chunks) > 1
+
+    def test_framed_timeout(self, tmp_path):
+        """Test a framed sensor that does not finish in time is killed"""
+        script = tmp_path / "slow.py"
+        script.write_text(f"#!{sys.executable}\nimport time\ntime.sleep(10)\n")
+        script.chmod(0o755)
+
+        started = time.monotonic()
+        with pytest.raises(SensorError, match="timed out"):
+            SubprocessSensor(str(script), framed=True).execute({}, timeout=0.2)
+        assert time.monotonic() - started < 5.0
+
+    def test_unsupported_protocol_version(self, tmp_path, sensor_script_path):
+        """Test the script rejects protocol versions it does not speak"""
+        result = subprocess.run(
+            [str(sensor_script_path), "--framed", "99"],
+            input="{}", capture_output=True, text=True, cwd=tmp_path
+        )
+
+        assert json.loads(result.stdout) == {
+            "type": "error", "id": 1, "error": "Unsupported protocol version: 99"
+        }
+
+    def test_failed_input_raises(self, sensor_script_path):
+        """Test error frames raise SensorError"""
+        sensor = SubprocessSensor(str(sensor_script_path), framed=True)
+
+        with pytest.raises(SensorError, match="Sensor failed"):
+            sensor.execute({"context_window": {"tokens_used": "lots"}}, timeout=5.0)
+
+    def test_agent_with_framed_backend(self):
+        """Test the agent runs with the framed backend"""
+        with ContextAgent(sensor_backend="framed") as agent:
+            state = agent.get_state(input_data={"model": "Claude"})
+
+        assert agent.sensor.name == "framed"
+        assert state.model == "Claude"
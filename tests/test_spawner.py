@@ -0,0 +1,135 @@
+"""
+Unit Tests for the Sensor Spawner Helper
+
+Tests running commands through the pre-started helper process and the
+SubprocessSensor and ContextAgent integration.
+"""
+
+import os
+import signal
+import subprocess
+import threading
+
+import pytest
+
+from src.agent import ContextAgent
+from src.sensors import SubprocessSensor, SensorError
+from src.spawner import SensorSpawner
+
+
+@pytest.fixture
+def spawner():
+    """Spawner helper stopped after the test"""
+    spawner = SensorSpawner()
+    yield spawner
+    spawner.close()
+
+
+class TestSensorSpawner:
+    """Test commands launched by the helper"""
+
+    def test_run_passes_stdin_and_output(self, spawner, tmp_path):
+        """Test stdin, stdout, stderr and cwd are forwarded"""
+        returncode, stdout, stderr, usage = spawner.run(
+            ["sh", "-c", "cat; pwd; echo oops >&2"], b"hello\n", str(tmp_path), timeout=5.0
+        )
+
+        assert returncode == 0
+        assert stdout == f"hello\n{tmp_path}\n".encode()
+        assert stderr == b"oops\n"
+        assert usage.max_rss_kb > 0
+
+    def test_helper_is_separate_process(self, spawner, tmp_path):
+        """Test commands are children of the helper, not the agent"""
+        _, stdout, _, _ = spawner.run(["sh", "-c", "echo $PPID"], b"", str(tmp_path))
+
+        assert int(stdout) == spawner.pid
+        assert spawner.pid != os.getpid()
+
+    def test_nonzero_exit(self, spawner, tmp_path):
+        """Test exit codes are returned"""
+        returncode, _, _, _ = spawner.run(["sh", "-c", "exit 3"], b"", str(tmp_path))
+
+        assert returncode == 3
+
+    def test_missing_program(self, spawner, tmp_path):
+        """Test start failures raise the matching OSError"""
+        with pytest.raises(FileNotFoundError):
+            spawner.run([str(tmp_path / "missing")], b"", str(tmp_path))
+
+    def test_timeout_kills_command(self, spawner, tmp_path):
+        """Test timed-out commands raise TimeoutExpired"""
+        with pytest.raises(subprocess.TimeoutExpired):
+            spawner.run(["sleep", "5"], b"", str(tmp_path), timeout=0.2)
+
+    def test_concurrent_requests(self, spawner, tmp_path):
+        """Test requests from several threads get their own responses"""
+        results = {}
+
+        def run(i):
+            results[i] = spawner.run(["sh", "-c", f"echo {i}"], b"", str(tmp_path))[1]
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == {i: f"{i}\n".encode() for i in range(8)}
+
+    def test_restarts_after_helper_exit(self, spawner, tmp_path):
+        """Test a dead helper is restarted on the next request"""
+        spawner.start()
+        first_pid = spawner.pid
+        os.kill(first_pid, signal.SIGKILL)
+        spawner._process.wait()
+
+        _, stdout, _, _ = spawner.run(["echo", "ok"], b"", str(tmp_path))
+
+        assert stdout == b"ok\n"
+        assert spawner.pid != first_pid
+
+    def test_closed_spawner_rejects(self, tmp_path):
+        """Test requests after close() fail"""
+        spawner = SensorSpawner()
+        spawner.close()
+
+        with pytest.raises(SensorError, match="closed"):
+            spawner.run(["true"], b"", str(tmp_path))
+
+
+@pytest.mark.sensor
+class TestSensorWithSpawner:
+    """Test the sensor script launched through the helper"""
+
+    @pytest.mark.parametrize("framed", [False, True])
+    def test_matches_direct_execution(self, spawner, sensor_script_path, framed):
+        """Test output is identical to spawning the script directly"""
+        input_data = {"model": "claude-sonnet-4", "context_window": {"tokens_used": 5000}}
+        direct = SubprocessSensor(str(sensor_script_path), framed=framed)
+        spawned = SubprocessSensor(str(sensor_script_path), framed=framed, spawner=spawner)
+
+        assert spawned.execute(input_data) == direct.execute(input_data)
+        assert spawned.usage.snapshot()["executions"] == 1
+
+    def test_timeout_raises_sensor_error(self, spawner, tmp_path):
+        """Test timeouts surface as SensorError"""
+        script = tmp_path / "slow.sh"
+        script.write_text("#!/bin/sh\nexec sleep 5\n")
+        script.chmod(0o755)
+        sensor = SubprocessSensor(str(script), spawner=spawner)
+
+        with pytest.raises(SensorError, match="timed out"):
+            sensor.execute(timeout=0.2)
+
+    def test_agent_use_spawner(self):
+        """Test the agent owns and closes its spawner"""
+        agent = ContextAgent(use_spawner=True)
+        state = agent.get_state({"model": "claude-sonnet-4"})
+        spawner = agent._spawner
+
+        assert state.model == "claude-sonnet-4"
+        assert spawner.pid is not None
+
+        agent.close()
+        assert spawner.pid is None
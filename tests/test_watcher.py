@@ -0,0 +1,217 @@
+"""
+Unit Tests for the Workspace Change Watcher
+
+Tests watch target discovery, the inotify and stat() backends, and the
+ContextAgent wake-up on changes.
+"""
+
+import json
+import os
+import threading
+import time
+
+import pytest
+from unittest.mock import patch
+
+from src.agent import ContextAgent
+from src.events import EventType
+from src.registry import SensorRegistry
+from src.watcher import (
+    InotifyWatcher, StatWatcher, create_watcher, watch_targets, _parse_events, _EVENT
+)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    git_dir = tmp_path / ".git"
+    (git_dir / "refs" / "heads" / "feature").mkdir(parents=True)
+    (git_dir / "HEAD").write_text("ref: refs/heads/main\n")
+    (git_dir / "refs" / "heads" / "main").write_text("0" * 40 + "\n")
+    return tmp_path
+
+
+class Collector:
+    """Watcher callback that records changed groups"""
+
+    def __init__(self):
+        self.groups = []
+        self.event = threading.Event()
+
+    def __call__(self, groups):
+        self.groups.append(groups)
+        self.event.set()
+
+    def wait(self, timeout=5.0):
+        assert self.event.wait(timeout), "no change reported"
+        self.event.clear()
+        return self.groups[-1]
+
+
+def checkout(repo, branch):
+    """Update HEAD the way git does (write a lock file, rename it over HEAD)"""
+    lock = repo / ".git" / "HEAD.lock"
+    lock.write_text(f"ref: refs/heads/{branch}\n")
+    os.replace(lock, repo / ".git" / "HEAD")
+
+
+class TestWatchTargets:
+    """Test discovery of watched directories"""
+
+    def test_git_repository(self, repo):
+        """Test .git, every refs/heads directory and the workspace are watched"""
+        targets = watch_targets(repo)
+        by_path = {target.path: target for target in targets}
+
+        assert by_path[repo].group == "workspace"
+        assert by_path[repo / ".git"].names == {"HEAD", "packed-refs"}
+        assert by_path[repo / ".git" / "refs" / "heads"].group == "git"
+        assert repo / ".git" / "refs" / "heads" / "feature" in by_path
+
+    def test_not_a_repository(self, tmp_path):
+        """Test only the workspace is watched outside a repository"""
+        workspace = tmp_path / "plain"
+        workspace.mkdir()
+
+        targets = watch_targets(workspace)
+
+        assert [target.group for target in targets] == ["workspace"]
+
+    def test_parse_events(self):
+        """Test raw inotify buffers are split into events"""
+        data = _EVENT.pack(1, 0x80, 0, 16) + b"HEAD".ljust(16, b"\0") + _EVENT.pack(2, 0x100, 0, 0)
+
+        assert _parse_events(data) == [(1, 0x80, "HEAD"), (2, 0x100, "")]
+
+
+@pytest.mark.skipif(not InotifyWatcher.available(), reason="inotify not available")
+class TestInotifyWatcher:
+    """Test the inotify backend"""
+
+    def test_head_rename_reported(self, repo):
+        """Test a checkout is reported as a git change"""
+        collector = Collector()
+        watcher = InotifyWatcher(watch_targets(repo), collector)
+        watcher.start()
+        try:
+            checkout(repo, "feature")
+            assert collector.wait() == {"git"}
+        finally:
+            watcher.stop()
+
+        assert watcher.stats()["backend"] == "inotify"
+        assert watcher.stats()["notifications"] == 1
+
+    def test_burst_is_debounced(self, repo):
+        """Test many ref updates in quick succession produce one notification"""
+        collector = Collector()
+        watcher = InotifyWatcher(watch_targets(repo), collector, debounce=0.2)
+        watcher.start()
+        try:
+            for index in range(5):
+                (repo / ".git" / "refs" / "heads" / f"branch-{index}").write_text("0" * 40)
+            assert collector.wait() == {"git"}
+            time.sleep(0.3)
+        finally:
+            watcher.stop()
+
+        assert len(collector.groups) == 1
+        assert watcher.stats()["events"] >= 5
+
+    def test_ignored_names_and_new_directories(self, repo):
+        """Test unrelated .git files are ignored and new ref directories are watched"""
+        collector = Collector()
+        watcher = InotifyWatcher(watch_targets(repo), collector)
+        watcher.start()
+        try:
+            (repo / ".git" / "index").write_text("")
+            (repo / ".git" / "refs" / "heads" / "fix").mkdir()
+            assert collector.wait() == {"git"}
+
+            (repo / ".git" / "refs" / "heads" / "fix" / "bug").write_text("0" * 40)
+            assert collector.wait() == {"git"}
+
+            (repo / "README.md").write_text("")
+            assert collector.wait() == {"workspace"}
+        finally:
+            watcher.stop()
+
+    def test_stop_without_start(self, repo):
+        """Test a watcher that never started releases its descriptors"""
+        watcher = InotifyWatcher(watch_targets(repo), Collector())
+        watcher.stop()
+        watcher.stop()
+
+
+class TestStatWatcher:
+    """Test the stat() fallback backend"""
+
+    def test_head_rename_reported(self, repo):
+        """Test a checkout is noticed by the next scan"""
+        collector = Collector()
+        watcher = StatWatcher(watch_targets(repo), collector, poll_interval=0.05)
+        watcher.start()
+        try:
+            checkout(repo, "feature")
+            assert "git" in collector.wait()
+        finally:
+            watcher.stop()
+
+        assert watcher.stats()["backend"] == "stat"
+
+    def test_fallback_when_inotify_unavailable(self, repo):
+        """Test create_watcher falls back to stat() scans"""
+        with patch.object(InotifyWatcher, "available", return_value=False):
+            watcher = create_watcher(watch_targets(repo), Collector())
+
+        assert isinstance(watcher, StatWatcher)
+
+
+def sensor_output(branch):
+    data = {
+        "version": "1.0.0",
+        "model": "Claude",
+        "workspace": {"path": "/tmp", "name": "workspace", "git": {"is_repo": True, "branch": branch}},
+        "context_window": {"max_tokens": 200000, "tokens_used": 0, "usage_pct": 0},
+    }
+    return "[Claude] 📁 workspace", json.dumps(data)
+
+
+class TestAgentWatcher:
+    """Test ContextAgent polling on workspace changes"""
+
+    def test_change_wakes_poller(self):
+        """Test a watcher notification polls immediately instead of after the interval"""
+        agent = ContextAgent(watch_workspace=True, watch_polling_interval=600.0)
+
+        changed = threading.Event()
+        agent.on(EventType.BRANCH_CHANGED, lambda event: changed.set())
+
+        with patch.object(agent, '_execute_sensor', return_value=sensor_output("main")) as mock_exec:
+            agent.start(polling_interval=5.0)
+            try:
+                assert agent._next_poll_delay(5.0) == 600.0
+                assert "watcher" in agent.get_stats()
+
+                # Initial state plus the poll loop's first iteration
+                deadline = time.monotonic() + 5.0
+                while mock_exec.call_count < 2 and time.monotonic() < deadline:
+                    time.sleep(0.01)
+
+                mock_exec.return_value = sensor_output("feature")
+                agent._on_workspace_change({"git"})
+                assert changed.wait(5.0)
+            finally:
+                agent.stop()
+
+        assert agent._watcher is None
+        assert "watcher" not in agent.get_stats()
+
+    def test_registry_groups_invalidated(self):
+        """Test only the changed field groups of a registry sensor are refreshed"""
+        registry = SensorRegistry()
+        agent = ContextAgent(sensor=registry, watch_workspace=True)
+
+        with patch.object(registry, "invalidate") as invalidate:
+            agent._on_workspace_change({"git"})
+
+        invalidate.assert_called_once_with("git")